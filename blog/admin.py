@@ -1,36 +1,170 @@
 import re
 
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db.models.functions import Length, Substr
+from django.forms.models import BaseInlineFormSet
+from django.http import QueryDict
 
+from .admin_changelist import AdminEscalavel, FiltroArtigo, FiltroAutor, FiltroTag
 from .models import Artigo, Comentario, Tag
+from .services.busca_service import (
+    busca_disponivel,
+    expressao_fts,
+    filtrar_por_busca,
+)
+from .services.moderacao_service import (
+    aprovar_comentarios,
+    despublicar_artigos,
+    publicar_artigos,
+    rejeitar_comentarios,
+)
+
+# Parâmetro da query string com a página de comentários do inline
+PARAMETRO_PAGINA_COMENTARIOS = "pagina_comentarios"
+
+TAMANHO_PAGINA_COMENTARIOS_INLINE = 20
+
+TAMANHO_PREVIA = 100
+
+# Trecho do HTML lido do banco para montar a prévia; sobra espaço para as tags
+TAMANHO_INICIO_TEXTO = 3 * TAMANHO_PREVIA
+
+
+class AutocompleteSelecionadoCarregado(AutocompleteSelect):
+    # O AutocompleteSelect busca no banco a opção selecionada a cada
+    # renderização: uma query por linha do inline. Quando o objeto já veio
+    # com a linha (select_related), a opção é montada a partir dele
+    selecionado = None
+
+    def optgroups(self, name, value, attr=None):
+        selecionado = self.selecionado
+        if selecionado is None or set(value) - {""} != {str(selecionado.pk)}:
+            return super().optgroups(name, value, attr)
+
+        opcoes = []
+        if not self.is_required:
+            opcoes.append(self.create_option(name, "", "", False, 0))
+        opcoes.append(
+            self.create_option(
+                name,
+                selecionado.pk,
+                self.choices.field.label_from_instance(selecionado),
+                {str(selecionado.pk)},
+                len(opcoes),
+            )
+        )
+        return [(None, opcoes, 0)]
+
+
+class ComentarioInlineFormSet(BaseInlineFormSet):
+    # Só uma página de comentários vira formulário; a página vem da query
+    # string (ver ComentarioInline.get_formset)
+    numero_pagina = None
+    parametros = QueryDict()
+
+    def get_queryset(self):
+        if not hasattr(self, "pagina"):
+            paginador = Paginator(
+                super().get_queryset(), TAMANHO_PAGINA_COMENTARIOS_INLINE
+            )
+            self.pagina = paginador.get_page(self.numero_pagina)
+            # O artigo de cada linha é o do formulário: sem uma query por linha
+            # no __str__ do comentário
+            for comentario in self.pagina.object_list:
+                comentario.artigo = self.instance
+        return self.pagina.object_list
+
+    def _construct_form(self, i, **kwargs):
+        form = super()._construct_form(i, **kwargs)
+        # O widget de cada formulário é uma cópia: recebe o autor da sua linha
+        widget = form.fields["autor"].widget
+        widget = getattr(widget, "widget", widget)
+        if isinstance(widget, AutocompleteSelecionadoCarregado) and (
+            form.instance.autor_id
+        ):
+            widget.selecionado = form.instance.autor
+        return form
+
+    def _existing_object(self, pk):
+        # Comentários novos entre o GET e o POST deslocam a página: o que não
+        # está mais nela é buscado entre todos os do artigo
+        objeto = super()._existing_object(pk)
+        if objeto is None:
+            objeto = self.queryset.filter(pk=pk).first()
+        return objeto
+
+    @property
+    def url_pagina_anterior(self):
+        return self._url_da_pagina(self.pagina.previous_page_number())
+
+    @property
+    def url_proxima_pagina(self):
+        return self._url_da_pagina(self.pagina.next_page_number())
+
+    def _url_da_pagina(self, numero):
+        parametros = self.parametros.copy()
+        parametros[PARAMETRO_PAGINA_COMENTARIOS] = numero
+        return f"?{parametros.urlencode()}"
 
 
 class ComentarioInline(admin.TabularInline):
     model = Comentario
+    formset = ComentarioInlineFormSet
+    template = "admin/blog/edit_inline/tabular_paginado.html"
     extra = 0
     fields = ["autor", "preview_texto", "aprovado", "data_criacao"]
     readonly_fields = ["data_criacao", "preview_texto"]
+    autocomplete_fields = ["autor"]
     show_change_link = True
     can_delete = True
     verbose_name = "Comentário"
     verbose_name_plural = "Comentários"
 
     def preview_texto(self, obj):
-        if obj.pk and obj.texto:
-            # Remove tags HTML para preview
-            texto_limpo = re.sub(r"<[^>]+>", "", str(obj.texto))
-            return texto_limpo[:100] + "..." if len(texto_limpo) > 100 else texto_limpo
+        inicio = getattr(obj, "inicio_texto", None)
+        if obj.pk and inicio:
+            # Remove tags HTML para preview, inclusive uma cortada no fim
+            texto_limpo = re.sub(r"<[^>]*(>|$)", "", inicio)
+            if len(texto_limpo) > TAMANHO_PREVIA or (
+                obj.tamanho_texto > TAMANHO_INICIO_TEXTO
+            ):
+                return texto_limpo[:TAMANHO_PREVIA] + "..."
+            return texto_limpo
         return "-"
 
     preview_texto.short_description = "Texto"
 
     def get_queryset(self, request):
+        # A prévia vem do banco junto com a página; o texto completo não
         qs = super().get_queryset(request)
-        return qs.order_by("-data_criacao")
+        return (
+            qs.select_related("autor")
+            .defer("texto")
+            .annotate(
+                inicio_texto=Substr("texto", 1, TAMANHO_INICIO_TEXTO),
+                tamanho_texto=Length("texto"),
+            )
+            .order_by("-data_criacao", "-id")
+        )
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == "autor":
+            kwargs["widget"] = AutocompleteSelecionadoCarregado(
+                db_field, self.admin_site, using=kwargs.get("using")
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.numero_pagina = request.GET.get(PARAMETRO_PAGINA_COMENTARIOS)
+        formset.parametros = request.GET
+        return formset
 
 
 @admin.register(Artigo)
-class ArtigoAdmin(admin.ModelAdmin):
+class ArtigoAdmin(AdminEscalavel):
     class Media:
         css = {
             "all": ("blog/css/ckeditor-width.css",),
@@ -44,13 +178,51 @@ class ArtigoAdmin(admin.ModelAdmin):
         "data_criacao",
         "data_publicacao",
     ]
-    list_filter = ["publicado", "data_criacao", "data_publicacao", "autor", "tags"]
-    search_fields = ["titulo", "conteudo", "resumo", "tags__nome"]
+    list_filter = [
+        "publicado",
+        "data_criacao",
+        "data_publicacao",
+        FiltroAutor,
+        FiltroTag,
+    ]
+    # Conteúdo e resumo são buscados pelo índice FTS5 (get_search_results)
+    search_fields = ["titulo", "tags__nome"]
     prepopulated_fields = {"slug": ("titulo",)}
     readonly_fields = ["id", "data_criacao", "data_atualizacao"]
     date_hierarchy = "data_publicacao"
     list_editable = ["publicado"]
+    autocomplete_fields = ["autor", "tags"]
     inlines = [ComentarioInline]
+    actions = ["publicar", "despublicar"]
+    adiados_na_lista = ("conteudo", "resumo")
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("autor")
+            .prefetch_related("tags")
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        # Termos sem palavras (só pontuação) ficam com a busca padrão do admin
+        if expressao_fts(search_term) and busca_disponivel():
+            return filtrar_por_busca(queryset, search_term), False
+        return super().get_search_results(request, queryset, search_term)
+
+    @admin.action(description="Publicar artigos selecionados")
+    def publicar(self, request, queryset):
+        quantidade = publicar_artigos(queryset)
+        self.message_user(
+            request, f"{quantidade} artigo(s) publicado(s).", messages.SUCCESS
+        )
+
+    @admin.action(description="Despublicar artigos selecionados")
+    def despublicar(self, request, queryset):
+        quantidade = despublicar_artigos(queryset)
+        self.message_user(
+            request, f"{quantidade} artigo(s) despublicado(s).", messages.SUCCESS
+        )
 
     def mostrar_tags(self, obj):
         tags = obj.tags.all()
@@ -103,7 +275,7 @@ class ArtigoAdmin(admin.ModelAdmin):
 
 
 @admin.register(Comentario)
-class ComentarioAdmin(admin.ModelAdmin):
+class ComentarioAdmin(AdminEscalavel):
     class Media:
         css = {
             "all": ("blog/css/ckeditor-width.css",),
@@ -116,11 +288,14 @@ class ComentarioAdmin(admin.ModelAdmin):
         "data_criacao",
         "preview_texto",
     ]
-    list_filter = ["aprovado", "data_criacao", "artigo"]
+    list_filter = ["aprovado", "data_criacao", FiltroArtigo, FiltroAutor]
     search_fields = ["texto", "autor__username", "artigo__titulo"]
     readonly_fields = ["id", "data_criacao"]
     date_hierarchy = "data_criacao"
     list_editable = ["aprovado"]
+    actions = ["aprovar", "rejeitar"]
+    # O __str__ do artigo só usa o título
+    adiados_na_lista = ("artigo__conteudo", "artigo__resumo")
     fieldsets = (
         (
             "Informações Básicas",
@@ -161,6 +336,23 @@ class ComentarioAdmin(admin.ModelAdmin):
 
     preview_texto.short_description = "Prévia do Texto"
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("artigo", "autor")
+
+    @admin.action(description="Aprovar comentários selecionados")
+    def aprovar(self, request, queryset):
+        quantidade = aprovar_comentarios(queryset)
+        self.message_user(
+            request, f"{quantidade} comentário(s) aprovado(s).", messages.SUCCESS
+        )
+
+    @admin.action(description="Rejeitar comentários selecionados")
+    def rejeitar(self, request, queryset):
+        quantidade = rejeitar_comentarios(queryset)
+        self.message_user(
+            request, f"{quantidade} comentário(s) rejeitado(s).", messages.SUCCESS
+        )
+
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
@@ -0,0 +1,168 @@
+import hashlib
+
+from django import forms
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connection
+from django.utils.functional import cached_property
+
+# Acima disso a listagem não conta as linhas: usa a estimativa do banco
+# (tabela sem filtros) ou para de contar no limite (com filtros)
+LIMITE_CONTAGEM_EXATA = 10_000
+
+PREFIXO_CHAVE_DATAS = "blog:admin:datas:"
+
+TIMEOUT_HIERARQUIA_DATAS = 600
+
+
+def contagem_estimada(modelo) -> int | None:
+    # Estatísticas do planejador: atualizadas por ANALYZE, não pelas escritas
+    tabela = modelo._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [tabela],
+                )
+            elif connection.vendor == "sqlite":
+                # O primeiro número de stat é a quantidade de linhas do índice,
+                # a mesma da tabela
+                cursor.execute(
+                    "SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [tabela]
+                )
+            else:
+                return None
+            linha = cursor.fetchone()
+    except DatabaseError:
+        # sqlite_stat1 só existe depois do primeiro ANALYZE
+        return None
+    if linha is None:
+        return None
+    estimativa = int(str(linha[0]).split()[0])
+    return estimativa if estimativa >= 0 else None
+
+
+class PaginadorEstimado(Paginator):
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimativa = contagem_estimada(queryset.model)
+            # Uma estimativa baixa faria o changelist carregar tudo numa página
+            if estimativa is not None and estimativa >= LIMITE_CONTAGEM_EXATA:
+                return estimativa
+        # COUNT sobre um subselect com LIMIT: o custo para no limite
+        return queryset[:LIMITE_CONTAGEM_EXATA].count()
+
+
+class ChangeListEscalavel(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        adiados = self.model_admin.adiados_na_lista
+        return queryset.defer(*adiados) if adiados else queryset
+
+
+class FiltroAutocomplete(admin.SimpleListFilter):
+    # Filtro por FK/M2M com o widget de autocomplete do admin: a barra lateral
+    # não carrega todas as opções, só a selecionada
+    template = "admin/blog/filtro_autocomplete.html"
+
+    def __init__(self, request, params, model, model_admin):
+        self.campo = model._meta.get_field(self.parameter_name)
+        self.admin_site = model_admin.admin_site
+        super().__init__(request, params, model, model_admin)
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if self.value() is None:
+            return queryset
+        try:
+            return queryset.filter(**{self.parameter_name: self.value()})
+        except (ValueError, ValidationError) as erro:
+            raise IncorrectLookupParameters(erro) from erro
+
+    def choices(self, changelist):
+        campo_formulario = forms.ModelChoiceField(
+            queryset=self.campo.remote_field.model._default_manager.all(),
+            required=False,
+            widget=AutocompleteSelect(
+                self.campo, self.admin_site, attrs={"onchange": "this.form.submit()"}
+            ),
+        )
+        yield {
+            "campo": campo_formulario.widget.render(
+                self.parameter_name,
+                self.value(),
+                attrs={"id": f"filtro_{self.parameter_name}"},
+            ),
+            "parametros": [
+                (chave, valor)
+                for chave, valor in changelist.params.items()
+                if chave != self.parameter_name
+            ],
+            "limpar": changelist.get_query_string(remove=[self.parameter_name]),
+            "selecionado": self.value() is not None,
+        }
+
+
+class FiltroAutor(FiltroAutocomplete):
+    title = "autor"
+    parameter_name = "autor"
+
+
+class FiltroArtigo(FiltroAutocomplete):
+    title = "artigo"
+    parameter_name = "artigo"
+
+
+class FiltroTag(FiltroAutocomplete):
+    title = "tags"
+    parameter_name = "tags"
+
+
+class AdminEscalavel(admin.ModelAdmin):
+    # Changelist com custo limitado em tabelas grandes: contagem estimada,
+    # sem o COUNT(*) da tabela inteira e com a hierarquia de datas em cache
+    paginator = PaginadorEstimado
+    show_full_result_count = False
+    # Campos grandes que a listagem não mostra
+    adiados_na_lista: tuple[str, ...] = ()
+
+    def get_changelist(self, request, **kwargs):
+        return ChangeListEscalavel
+
+    @property
+    def media(self):
+        media = super().media
+        for filtro in self.list_filter:
+            if isinstance(filtro, type) and issubclass(filtro, FiltroAutocomplete):
+                campo = self.model._meta.get_field(filtro.parameter_name)
+                return media + AutocompleteSelect(campo, self.admin_site).media
+        return media
+
+
+def hierarquia_datas_em_cache(cl):
+    # Os DISTINCT de datas e o MIN/MAX varrem a tabela a cada acesso; a
+    # navegação por datas tolera ficar alguns minutos desatualizada
+    parametros = repr(sorted(cl.filter_params.items())).encode()
+    chave = (
+        f"{PREFIXO_CHAVE_DATAS}{cl.opts.label_lower}:"
+        f"{hashlib.md5(parametros).hexdigest()}"
+    )
+    contexto = cache.get(chave)
+    if contexto is None:
+        contexto = date_hierarchy(cl)
+        cache.set(chave, contexto, TIMEOUT_HIERARQUIA_DATAS)
+    return contexto
@@ -0,0 +1,85 @@
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.views import View
+
+from .dto import ArtigoDTO, PaginaArtigosDTO, PaginaComentariosDTO
+from .models import Artigo
+from .serializacao import CampoDesconhecido, codificador
+from .services.artigo_service import (
+    obter_artigo_dto_por_slug,
+    obter_pagina_artigos_dto,
+    obter_pagina_comentarios_dto,
+    obter_validadores_artigo,
+    obter_validadores_lista_artigos,
+)
+from .services.cache_artigo import cache_artigo_dto
+from .services.cursor import CursorInvalido
+from .views import condicional
+
+# API JSON para o app: os mesmos DTOs das páginas HTML, codificados direto
+# (blog/serializacao.py), sem template. ?campos=titulo,slug escolhe os campos
+# de cada artigo; ?cursor= pagina como a lista HTML
+
+
+def _campos(request: HttpRequest) -> list[str] | None:
+    valor = request.GET.get("campos")
+    if valor is None:
+        return None
+    return [campo.strip() for campo in valor.split(",") if campo.strip()]
+
+
+def _json(corpo: str) -> HttpResponse:
+    return HttpResponse(corpo, content_type="application/json")
+
+
+def _erro(mensagem: str, status: int) -> JsonResponse:
+    return JsonResponse({"erro": mensagem}, status=status)
+
+
+@condicional(obter_validadores_lista_artigos)
+class ArtigosApiView(View):
+    def get(self, request: HttpRequest) -> HttpResponse:
+        campos = _campos(request)
+        try:
+            codificar = codificador(
+                PaginaArtigosDTO,
+                aninhados=None if campos is None else {"artigos": campos},
+            )
+        except CampoDesconhecido as erro:
+            return _erro(f"Campos desconhecidos: {erro}", 400)
+        try:
+            pagina = obter_pagina_artigos_dto(request.GET.get("cursor"))
+        except CursorInvalido:
+            return _erro("Cursor inválido", 400)
+
+        return _json(codificar(pagina))
+
+
+@condicional(obter_validadores_artigo)
+class ArtigoApiView(View):
+    def get(self, request: HttpRequest, slug: str) -> HttpResponse:
+        try:
+            codificar = codificador(ArtigoDTO, _campos(request))
+        except CampoDesconhecido as erro:
+            return _erro(f"Campos desconhecidos: {erro}", 400)
+        try:
+            artigo_dto = cache_artigo_dto.obter_ou_carregar(
+                slug, obter_artigo_dto_por_slug
+            )
+        except Artigo.DoesNotExist:
+            return _erro("Artigo não encontrado", 404)
+
+        return _json(codificar(artigo_dto))
+
+
+@condicional(obter_validadores_artigo)
+class ComentariosApiView(View):
+    # Páginas seguintes dos comentários (proximo_cursor_comentarios do artigo)
+    def get(self, request: HttpRequest, slug: str) -> HttpResponse:
+        try:
+            pagina = obter_pagina_comentarios_dto(slug, request.GET.get("cursor"))
+        except Artigo.DoesNotExist:
+            return _erro("Artigo não encontrado", 404)
+        except CursorInvalido:
+            return _erro("Cursor inválido", 400)
+
+        return _json(codificador(PaginaComentariosDTO)(pagina))
@@ -0,0 +1,22 @@
+import os
+import tempfile
+from pathlib import Path
+
+
+def gravar_atomico(caminho: Path, conteudo: bytes) -> None:
+    # Arquivo temporário na mesma pasta e os.replace: quem lê o arquivo vê a
+    # versão antiga ou a nova, nunca uma escrita pela metade
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(
+        dir=caminho.parent, prefix=f".{caminho.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(descritor, "wb") as arquivo:
+            arquivo.write(conteudo)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.chmod(temporario, 0o644)
+        os.replace(temporario, caminho)
+    except BaseException:
+        os.unlink(temporario)
+        raise
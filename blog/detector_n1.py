@@ -0,0 +1,251 @@
+import linecache
+import logging
+import re
+import sys
+import warnings
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+ACOES = ("avisar", "log", "erro")
+
+# Frames destes arquivos são da instrumentação, não de quem fez a query
+_ARQUIVOS_IGNORADOS = {
+    str(Path(__file__).with_name(nome).resolve())
+    for nome in ("detector_n1.py", "metricas.py", "middleware.py", "perfilador.py")
+}
+
+_LISTA_IN = re.compile(r"\bIN \((?:%s|\?)(?:, (?:%s|\?))*\)")
+_TEXTO = re.compile(r"'(?:[^']|'')*'")
+_NUMERO = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?\b")
+_ESPACOS = re.compile(r"\s+")
+# Primeira condição do WHERE: a coluna que a query repetida filtra
+_FILTRO = re.compile(r'WHERE \(?"(\w+)"\."(\w+)" (?:=|IN)')
+# Pares objeto.atributo da linha que disparou a query (artigo.autor)
+_ACESSO = re.compile(r"(\w+)(?=\.(\w+))")
+
+
+class NMais1Detectado(Exception):
+    pass
+
+
+class AvisoNMais1(UserWarning):
+    pass
+
+
+@dataclass(slots=True)
+class RelatorioNMais1:
+    sql: str
+    repeticoes: int
+    origem: str | None
+    sugestao: str | None
+
+    def __str__(self) -> str:
+        linhas = [f"N+1: {self.repeticoes} queries iguais: {self.sql}"]
+        if self.origem:
+            linhas.append(f"  disparadas em {self.origem}")
+        if self.sugestao:
+            linhas.append(f"  sugestão: {self.sugestao}")
+        return "\n".join(linhas)
+
+
+@dataclass(slots=True)
+class Deteccao:
+    limite: int
+    contagens: Counter = field(default_factory=Counter)
+    origens: dict[str, Counter] = field(default_factory=dict)
+    relatorios: list[RelatorioNMais1] = field(default_factory=list)
+
+    def registrar(self, sql: str) -> None:
+        modelo = normalizar_sql(sql)
+        self.contagens[modelo] += 1
+        self.origens.setdefault(modelo, Counter())[_frame_do_projeto()] += 1
+
+    def concluir(self) -> list[RelatorioNMais1]:
+        self.relatorios = []
+        for modelo, repeticoes in self.contagens.most_common():
+            if repeticoes <= self.limite:
+                break
+            origem = self.origens[modelo].most_common(1)[0][0]
+            self.relatorios.append(
+                RelatorioNMais1(
+                    sql=modelo,
+                    repeticoes=repeticoes,
+                    origem=_descrever_origem(origem),
+                    sugestao=sugerir_carregamento(modelo, _linha_de_codigo(origem)),
+                )
+            )
+        return self.relatorios
+
+
+_deteccao: ContextVar[Deteccao | None] = ContextVar("blog_deteccao_n1", default=None)
+
+
+def registrar_query(execute, sql, params, many, context):
+    # Instalado em toda conexão (blog/signals.py), como o das métricas
+    deteccao = _deteccao.get()
+    if deteccao is not None:
+        deteccao.registrar(sql)
+    return execute(sql, params, many, context)
+
+
+class detectar_n_mais_1:
+    # Em testes: with detectar_n_mais_1(acao="erro"): ... falha se alguma query
+    # se repetir mais de limite vezes no bloco
+    def __init__(self, limite: int | None = None, acao: str | None = None):
+        self.limite = settings.BLOG_N1_LIMITE if limite is None else limite
+        self.acao = acao or settings.BLOG_N1_ACAO or "erro"
+        if self.acao not in ACOES:
+            raise ValueError(f"acao deve ser uma de {', '.join(ACOES)}")
+
+    def __enter__(self) -> Deteccao:
+        self.deteccao = Deteccao(self.limite)
+        self._contexto = _deteccao.set(self.deteccao)
+        return self.deteccao
+
+    def __exit__(self, tipo, *excecao) -> None:
+        _deteccao.reset(self._contexto)
+        relatorios = self.deteccao.concluir()
+        # Uma exceção do próprio bloco tem prioridade sobre o relatório
+        if relatorios and tipo is None:
+            reagir(relatorios, self.acao)
+
+
+def reagir(relatorios: list[RelatorioNMais1], acao: str) -> None:
+    mensagem = "\n".join(str(relatorio) for relatorio in relatorios)
+    if acao == "erro":
+        raise NMais1Detectado(mensagem)
+    if acao == "log":
+        logger.warning(mensagem)
+    else:
+        warnings.warn(mensagem, AvisoNMais1, stacklevel=3)
+
+
+def normalizar_sql(sql: str) -> str:
+    # O ORM já manda os valores como parâmetros; sobram listas de IN com
+    # tamanhos diferentes e literais de SQL escrito à mão
+    sql = _ESPACOS.sub(" ", sql).strip()
+    sql = _TEXTO.sub("?", sql)
+    sql = _NUMERO.sub("?", sql)
+    return _LISTA_IN.sub("IN (...)", sql)
+
+
+def sugerir_carregamento(sql: str, codigo: str | None = None) -> str | None:
+    # A coluna filtrada diz qual relação foi carregada uma linha por vez
+    filtro = _FILTRO.search(sql)
+    if filtro is None:
+        return None
+    tabela, coluna = filtro.groups()
+    modelo = _modelos_por_tabela().get(tabela)
+    if modelo is None:
+        return None
+    campo = next(
+        (campo for campo in modelo._meta.concrete_fields if campo.column == coluna),
+        None,
+    )
+    if campo is None:
+        return None
+
+    if campo.primary_key:
+        # artigo.autor: o objeto do outro lado de uma FK, buscado pela pk
+        return _sugerir_select_related(modelo, codigo)
+
+    if not campo.is_relation:
+        return None
+
+    if modelo._meta.auto_created:
+        # Tabela intermediária de um ManyToMany: artigo.tags.all()
+        for outro in apps.get_models():
+            for m2m in outro._meta.local_many_to_many:
+                if m2m.remote_field.through is not modelo:
+                    continue
+                if m2m.m2m_column_name() == coluna:
+                    return f'{m2m.model.__name__}: prefetch_related("{m2m.name}")'
+                acessor = m2m.remote_field.get_accessor_name()
+                return f'{m2m.related_model.__name__}: prefetch_related("{acessor}")'
+        return None
+
+    # FK reversa: artigo.comentarios.all()
+    acessor = campo.remote_field.get_accessor_name()
+    return f'{campo.related_model.__name__}: prefetch_related("{acessor}")'
+
+
+def _sugerir_select_related(modelo, codigo: str | None) -> str | None:
+    # Uma busca pela pk não diz qual FK a disparou (Artigo.autor e
+    # Comentario.autor buscam o mesmo User): só sugere quando a linha de
+    # código mostra o acesso a uma única FK dos apps do projeto; as do Django
+    # (LogEntry.user) não são suspeitas
+    if not codigo:
+        return None
+    acessos = set(_ACESSO.findall(codigo))
+    atributos = {atributo for _, atributo in acessos}
+    candidatos = [
+        relacao
+        for outro in apps.get_models()
+        if outro._meta.app_config.path.startswith(str(settings.BASE_DIR))
+        for relacao in outro._meta.concrete_fields
+        if relacao.is_relation
+        and (relacao.many_to_one or relacao.one_to_one)
+        and relacao.related_model is modelo
+        and relacao.name in atributos
+    ]
+    if len(candidatos) > 1:
+        # Mesmo nome em modelos diferentes: desempata pela variável
+        # (artigo.autor é Artigo.autor)
+        candidatos = [
+            relacao
+            for relacao in candidatos
+            if (relacao.model._meta.model_name, relacao.name) in acessos
+        ]
+    if len(candidatos) != 1:
+        return None
+    (relacao,) = candidatos
+    return f'{relacao.model.__name__}: select_related("{relacao.name}")'
+
+
+def _modelos_por_tabela() -> dict:
+    return {
+        modelo._meta.db_table: modelo
+        for modelo in apps.get_models(include_auto_created=True)
+    }
+
+
+def _frame_do_projeto() -> tuple[str, int, str] | None:
+    # O primeiro frame do código do projeto (não do Django, das bibliotecas
+    # ou da instrumentação) acima da query
+    base = str(settings.BASE_DIR)
+    frame = sys._getframe(2)
+    while frame is not None:
+        arquivo = frame.f_code.co_filename
+        if (
+            arquivo.startswith(base)
+            and "site-packages" not in arquivo
+            and arquivo not in _ARQUIVOS_IGNORADOS
+        ):
+            return arquivo, frame.f_lineno, frame.f_code.co_name
+        frame = frame.f_back
+    return None
+
+
+def _linha_de_codigo(origem: tuple[str, int, str] | None) -> str | None:
+    if origem is None:
+        return None
+    arquivo, linha, _ = origem
+    return linecache.getline(arquivo, linha).strip()
+
+
+def _descrever_origem(origem: tuple[str, int, str] | None) -> str | None:
+    if origem is None:
+        return None
+    arquivo, linha, funcao = origem
+    codigo = _linha_de_codigo(origem)
+    caminho = Path(arquivo)
+    if caminho.is_relative_to(settings.BASE_DIR):
+        caminho = caminho.relative_to(settings.BASE_DIR)
+    return f"{caminho}:{linha} em {funcao}(): {codigo}"
@@ -1,9 +1,10 @@
 from dataclasses import dataclass
 from datetime import datetime
 from typing import List
+from uuid import UUID
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AutorDTO:
     username: str
     first_name: str
@@ -16,29 +17,35 @@ class AutorDTO:
         return self.username
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TagDTO:
     nome: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ComentarioDTO:
     texto: str
     data_criacao: datetime
     autor: AutorDTO
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ArtigoDTO:
     titulo: str
     conteudo: str
     data_publicacao: datetime | None
     autor: AutorDTO
     tags: List[TagDTO]
+    # Só a primeira página; as seguintes vêm de obter_pagina_comentarios_dto
     comentarios: List[ComentarioDTO]
+    # id e data_atualizacao formam a chave do fragmento em cache do corpo
+    id: UUID
+    data_atualizacao: datetime
+    total_comentarios: int = 0
+    proximo_cursor_comentarios: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ArtigoListDTO:
     titulo: str
     slug: str
@@ -47,7 +54,38 @@ class ArtigoListDTO:
     data_criacao: datetime
     autor: AutorDTO
     tags: List[TagDTO]
+    # Chave do fragmento em cache do card, com o total de comentários
+    id: UUID
+    data_atualizacao: datetime
+    total_comentarios: int = 0
 
     @property
     def data_exibicao(self) -> datetime:
         return self.data_publicacao or self.data_criacao
+
+
+@dataclass(slots=True, frozen=True)
+class PaginaArtigosDTO:
+    artigos: List[ArtigoListDTO]
+    proximo_cursor: str | None
+    cursor_anterior: str | None
+
+
+@dataclass(slots=True, frozen=True)
+class PaginaComentariosDTO:
+    comentarios: List[ComentarioDTO]
+    proximo_cursor: str | None
+
+
+@dataclass(slots=True, frozen=True)
+class ValidadoresDTO:
+    etag: str
+    ultima_modificacao: datetime | None
+
+
+@dataclass(slots=True, frozen=True)
+class ResultadoBuscaDTO:
+    titulo: str
+    slug: str
+    trecho: str
+    relevancia: float
@@ -0,0 +1,63 @@
+import os
+import random
+import threading
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
+
+# UUIDv7 (RFC 9562): 48 bits de timestamp Unix em ms, a versão, 12 bits de
+# contador, a variante e 62 bits aleatórios. Em ordem de criação, as chaves
+# novas vão para o fim do índice em vez de cair em páginas aleatórias da
+# árvore B. O Python só traz uuid.uuid7 a partir do 3.14
+
+_EPOCA = datetime(1970, 1, 1, tzinfo=UTC)
+_MASCARA_ALEATORIO = (1 << 62) - 1
+_MAXIMO_CONTADOR = 0xFFF
+
+_trava = threading.Lock()
+_ultimo_ms = 0
+_contador = 0
+
+
+def uuid7() -> uuid.UUID:
+    # Crescente dentro do processo: ids do mesmo milissegundo incrementam o
+    # contador e, se o relógio voltar, o último timestamp continua valendo
+    global _ultimo_ms, _contador
+    with _trava:
+        agora_ms = time.time_ns() // 1_000_000
+        if agora_ms > _ultimo_ms:
+            _ultimo_ms, _contador = agora_ms, _contador_inicial()
+        elif _contador < _MAXIMO_CONTADOR:
+            _contador += 1
+        else:
+            # Mais de ~2 mil ids no mesmo milissegundo: avança o timestamp
+            _ultimo_ms, _contador = _ultimo_ms + 1, _contador_inicial()
+        milissegundos, contador = _ultimo_ms, _contador
+    aleatorio = int.from_bytes(os.urandom(8), "big") & _MASCARA_ALEATORIO
+    return _montar(milissegundos, contador, aleatorio)
+
+
+def uuid7_em(momento: datetime, rng: random.Random) -> uuid.UUID:
+    # Para cargas sintéticas: o id corresponde à data de criação gerada e é
+    # reproduzível com a mesma semente
+    return _montar(
+        (momento - _EPOCA) // timedelta(milliseconds=1),
+        rng.getrandbits(12),
+        rng.getrandbits(62),
+    )
+
+
+def _contador_inicial() -> int:
+    # Aleatório com o bit mais alto zerado (RFC 9562, seção 6.2): dificulta
+    # adivinhar ids e deixa folga para incrementar no mesmo milissegundo
+    return int.from_bytes(os.urandom(2), "big") & (_MAXIMO_CONTADOR >> 1)
+
+
+def _montar(milissegundos: int, contador: int, aleatorio: int) -> uuid.UUID:
+    return uuid.UUID(
+        int=(milissegundos & ((1 << 48) - 1)) << 80
+        | 0x7 << 76
+        | contador << 64
+        | 0b10 << 62
+        | aleatorio
+    )
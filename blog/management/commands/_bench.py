@@ -0,0 +1,267 @@
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from itertools import accumulate
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from blog.models import Artigo, Comentario, Tag
+
+PALAVRAS = (
+    "django orm consulta banco dados índice performance python cache "
+    "memória tempo lote transação servidor página artigo comentário tag "
+    "autor lista detalhe prefetch select related query plano sqlite "
+    "postgres escala usuário projeto código teste função serviço modelo"
+).split()
+
+
+@dataclass
+class Medicao:
+    nome: str
+    iteracoes: int
+    media_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    queries: int
+    pico_kib: float
+
+
+@contextmanager
+def banco_isolado(verbosity: int = 0, arquivo: str | None = None) -> Iterator[str]:
+    # Mesmo mecanismo do test runner: cria um banco descartável, aplica as
+    # migrations e o remove no final, sem tocar no banco de desenvolvimento.
+    # No SQLite o banco de teste fica em memória, a menos que se indique um
+    # arquivo (para medir I/O e o tamanho das páginas em disco)
+    nome_original = connection.settings_dict["NAME"]
+    teste = connection.settings_dict.setdefault("TEST", {})
+    nome_teste_original = teste.get("NAME")
+    if arquivo is not None:
+        teste["NAME"] = arquivo
+    try:
+        nome_teste = connection.creation.create_test_db(
+            verbosity=verbosity, autoclobber=True, serialize=False
+        )
+        try:
+            # Com DEBUG ligado cada query é guardada em connection.queries
+            with override_settings(DEBUG=False):
+                yield nome_teste
+        finally:
+            connection.creation.destroy_test_db(nome_original, verbosity=verbosity)
+    finally:
+        teste["NAME"] = nome_teste_original
+
+
+def medir(
+    nome: str,
+    funcao: Callable[[], object],
+    iteracoes: int,
+    aquecimento: int = 3,
+) -> Medicao:
+    for _ in range(aquecimento):
+        funcao()
+
+    with CaptureQueriesContext(connection) as contexto:
+        funcao()
+    queries = len(contexto.captured_queries)
+
+    # Pico de alocação numa execução à parte: o tracemalloc distorce o tempo
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    tempos = []
+    for _ in range(iteracoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+
+    return Medicao(
+        nome=nome,
+        iteracoes=iteracoes,
+        media_ms=statistics.fmean(tempos),
+        queries=queries,
+        pico_kib=pico / 1024,
+        **percentis(tempos),
+    )
+
+
+def percentis(tempos: list[float]) -> dict[str, float]:
+    if len(tempos) < 2:
+        return {"p50_ms": tempos[0], "p95_ms": tempos[0], "p99_ms": tempos[0]}
+    cortes = statistics.quantiles(tempos, n=100, method="inclusive")
+    return {"p50_ms": cortes[49], "p95_ms": cortes[94], "p99_ms": cortes[98]}
+
+
+class GeradorTexto:
+    # Vocabulário sintético com frequências de Zipf: poucas palavras muito
+    # comuns e uma cauda longa de palavras raras, como em texto real
+    SILABAS = "ba be bi bo bu ca ce ci co cu da de di do du la le li lo lu ma me mi mo mu na ne ni no nu pa pe pi po pu ra re ri ro ru sa se si so su ta te ti to tu".split()
+
+    def __init__(self, rng: random.Random, tamanho_vocabulario: int = 5000):
+        self.rng = rng
+        sinteticas = {
+            "".join(rng.choices(self.SILABAS, k=rng.randint(2, 4)))
+            for _ in range(tamanho_vocabulario)
+        }
+        self.vocabulario = PALAVRAS + sorted(sinteticas - set(PALAVRAS))
+        self.pesos_acumulados = list(
+            accumulate(1 / posicao for posicao in range(1, len(self.vocabulario) + 1))
+        )
+
+    def palavras(self, quantidade: int) -> list[str]:
+        return self.rng.choices(
+            self.vocabulario, cum_weights=self.pesos_acumulados, k=quantidade
+        )
+
+    def html(self, paragrafos: int, palavras: int = 60) -> str:
+        return "".join(
+            "<p>" + " ".join(self.palavras(palavras)) + "</p>"
+            for _ in range(paragrafos)
+        )
+
+
+def semear_blog(
+    gerador: "GeradorTexto",
+    artigos: int,
+    usuarios: int = 5,
+    tags: int = 20,
+    tags_por_artigo: int = 3,
+    comentarios_por_artigo: int = 0,
+    paragrafos: int = 8,
+) -> None:
+    # Carga com bulk_create: os sinais não disparam, então o contador de
+    # comentários aprovados é calculado aqui mesmo
+    rng = gerador.rng
+    agora = timezone.now()
+    autores = User.objects.bulk_create(
+        User(
+            username=f"bench-{indice}",
+            first_name=gerador.palavras(1)[0].title(),
+            last_name=gerador.palavras(1)[0].title(),
+        )
+        for indice in range(usuarios)
+    )
+    lista_tags = Tag.objects.bulk_create(
+        Tag(nome=f"Tag {indice}", slug=f"tag-{indice}") for indice in range(tags)
+    )
+
+    aprovados_por_artigo = [
+        sum(rng.random() < 0.8 for _ in range(comentarios_por_artigo))
+        for _ in range(artigos)
+    ]
+    lista_artigos = Artigo.objects.bulk_create(
+        (
+            Artigo(
+                titulo=" ".join(gerador.palavras(5)),
+                slug=f"artigo-{indice}",
+                autor=rng.choice(autores),
+                conteudo=gerador.html(paragrafos),
+                resumo=gerador.html(1, palavras=25),
+                publicado=rng.random() < 0.95,
+                data_publicacao=agora - timedelta(minutes=indice),
+                total_comentarios_aprovados=aprovados_por_artigo[indice],
+            )
+            for indice in range(artigos)
+        ),
+        batch_size=500,
+    )
+    Artigo.tags.through.objects.bulk_create(
+        (
+            Artigo.tags.through(artigo_id=artigo.pk, tag_id=tag.pk)
+            for artigo in lista_artigos
+            for tag in rng.sample(lista_tags, min(tags_por_artigo, tags))
+        ),
+        batch_size=1000,
+    )
+    Comentario.objects.bulk_create(
+        (
+            Comentario(
+                artigo=artigo,
+                autor=rng.choice(autores),
+                texto=gerador.html(1, palavras=30),
+                aprovado=posicao < aprovados,
+            )
+            for artigo, aprovados in zip(lista_artigos, aprovados_por_artigo)
+            for posicao in range(comentarios_por_artigo)
+        ),
+        batch_size=1000,
+    )
+
+
+def escrever_tabela(stdout, medicoes: list[Medicao]) -> None:
+    largura = max(len(medicao.nome) for medicao in medicoes)
+    stdout.write(
+        f"{'cenário':<{largura}}  {'média':>9}  {'p50':>9}  {'p95':>9}  "
+        f"{'p99':>9}  {'queries':>7}  {'pico':>10}"
+    )
+    for medicao in medicoes:
+        stdout.write(
+            f"{medicao.nome:<{largura}}  {medicao.media_ms:>7.2f}ms  "
+            f"{medicao.p50_ms:>7.2f}ms  {medicao.p95_ms:>7.2f}ms  "
+            f"{medicao.p99_ms:>7.2f}ms  {medicao.queries:>7}  "
+            f"{medicao.pico_kib:>6.0f} KiB"
+        )
+
+
+def escrever_json(destino, parametros: dict, medicoes: list[Medicao]) -> None:
+    # Chaves ordenadas e metadados da execução: dois arquivos de commits
+    # diferentes podem ser comparados com diff
+    json.dump(
+        {
+            "commit": _commit_atual(),
+            "gerado_em": timezone.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "banco": settings.DATABASES["default"]["ENGINE"],
+            "parametros": parametros,
+            "medicoes": [asdict(medicao) for medicao in medicoes],
+        },
+        destino,
+        indent=2,
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    destino.write("\n")
+
+
+def executar_manage(ambiente: dict[str, str], *argumentos: str) -> None:
+    # manage.py em outro processo, com o ambiente (settings, banco) indicado
+    subprocess.run(
+        [sys.executable, "manage.py", *argumentos, "--skip-checks"],
+        cwd=settings.BASE_DIR,
+        env=ambiente,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def _commit_atual() -> str | None:
+    try:
+        resultado = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return resultado.stdout.strip()
@@ -0,0 +1,67 @@
+"""Processo de carga do bench_sqlite.
+
+Roda em processos separados (multiprocessing com spawn), como workers do
+gunicorn: só importa o Django depois de configurar o ambiente.
+"""
+
+import os
+import random
+import time
+
+
+def trabalhador(
+    indice, perfil, caminho_banco, duracao, fracao_escritas, barreira, fila
+):
+    os.environ["DJANGO_SETTINGS_MODULE"] = "config.settings_bench"
+    os.environ["BLOG_BENCH_DB"] = caminho_banco
+    os.environ["BLOG_BENCH_SQLITE"] = perfil
+
+    import django
+
+    django.setup()
+
+    from django.db import OperationalError, close_old_connections, transaction
+
+    from blog.models import Artigo, Comentario
+    from blog.services.artigo_service import obter_artigo_dto_por_slug
+
+    rng = random.Random(indice)
+    artigos = list(
+        Artigo.objects.filter(publicado=True).values_list("pk", "slug")[:500]
+    )
+    autor_ids = list(Comentario.objects.values_list("autor_id", flat=True)[:100])
+    close_old_connections()
+
+    leituras: list[float] = []
+    escritas: list[float] = []
+    erros = 0
+    barreira.wait()
+    fim = time.perf_counter() + duracao
+    while time.perf_counter() < fim:
+        artigo_id, slug = rng.choice(artigos)
+        escrever = rng.random() < fracao_escritas
+        inicio = time.perf_counter()
+        try:
+            if escrever:
+                # Transação de uma request que comenta: INSERT e o contador
+                with transaction.atomic():
+                    Comentario.objects.create(
+                        artigo_id=artigo_id,
+                        autor_id=rng.choice(autor_ids),
+                        texto="<p>Comentário do benchmark</p>",
+                        aprovado=True,
+                    )
+            else:
+                obter_artigo_dto_por_slug(slug)
+        except OperationalError:
+            # "database is locked"
+            erros += 1
+        else:
+            tempo_ms = (time.perf_counter() - inicio) * 1000
+            (escritas if escrever else leituras).append(tempo_ms)
+        finally:
+            # O que o Django faz no fim de cada request: sem CONN_MAX_AGE a
+            # conexão é fechada e a próxima request abre outra
+            close_old_connections()
+
+    fila.put((leituras, escritas, erros))
@@ -0,0 +1,112 @@
+"""Renderização das páginas do export_static.
+
+Roda também em processos separados (multiprocessing com spawn): os imports
+do Django ficam dentro das funções, depois do django.setup() do inicializador.
+"""
+
+import shutil
+from pathlib import Path
+
+from blog.arquivos import gravar_atomico
+
+# As páginas da lista depois da primeira ficam em caminhos, não em ?cursor=:
+# um CDN ignora a query string e serviria sempre a primeira. Ficam sob
+# artigos/, que nenhum slug alcança (o detalhe é um segmento só)
+PREFIXO_PAGINAS = "artigos/pagina/"
+
+
+def iniciar_trabalhador():
+    # DJANGO_SETTINGS_MODULE e o resto do ambiente vêm do processo pai
+    import django
+
+    django.setup()
+
+
+def caminho_da_pagina(destino: str, url: str) -> Path:
+    # /slug/ vira slug/index.html: a URL estática é a mesma da view
+    return Path(destino, *url.strip("/").split("/"), "index.html")
+
+
+def renderizar_lista(destino: str) -> int:
+    # Todas as páginas da lista; devolve quantas foram gravadas
+    from django.template.loader import render_to_string
+    from django.urls import reverse
+
+    from blog.services.artigo_service import obter_pagina_artigos_dto
+    from blog.views import ArtigoListView
+
+    url_lista = reverse("blog:artigo_list")
+    numero = 1
+    cursor = None
+    while True:
+        pagina = obter_pagina_artigos_dto(cursor)
+        html = render_to_string(
+            ArtigoListView.template_name,
+            {
+                "artigos": pagina.artigos,
+                "pagina": pagina,
+                "url_anterior": (
+                    _url_da_pagina(url_lista, numero - 1) if numero > 1 else None
+                ),
+                "url_proxima": (
+                    _url_da_pagina(url_lista, numero + 1)
+                    if pagina.proximo_cursor
+                    else None
+                ),
+            },
+        )
+        gravar_atomico(
+            caminho_da_pagina(destino, _url_da_pagina(url_lista, numero)),
+            html.encode(),
+        )
+        if not pagina.proximo_cursor:
+            break
+        cursor = pagina.proximo_cursor
+        numero += 1
+
+    # Páginas de um export anterior com mais artigos
+    pasta_paginas = Path(destino, *PREFIXO_PAGINAS.strip("/").split("/"))
+    if pasta_paginas.is_dir():
+        for pasta in pasta_paginas.iterdir():
+            if not pasta.name.isdigit() or int(pasta.name) > numero:
+                shutil.rmtree(pasta, ignore_errors=True)
+    return numero
+
+
+def _url_da_pagina(url_lista: str, numero: int) -> str:
+    return url_lista if numero == 1 else f"{url_lista}{PREFIXO_PAGINAS}{numero}/"
+
+
+def renderizar_artigos(destino: str, slugs: list[str]) -> list[str]:
+    # Devolve os slugs gravados; um artigo despublicado entre a listagem e a
+    # renderização fica de fora
+    from django.db import close_old_connections
+    from django.template.loader import render_to_string
+    from django.urls import reverse
+
+    from blog.models import Artigo
+    from blog.services.artigo_service import obter_artigo_dto_por_slug
+    from blog.views import ArtigoDetailView
+
+    gravados = []
+    try:
+        for slug in slugs:
+            try:
+                artigo = obter_artigo_dto_por_slug(slug)
+            except Artigo.DoesNotExist:
+                continue
+            html = render_to_string(
+                ArtigoDetailView.template_name,
+                {
+                    "artigo": artigo,
+                    "comentarios": artigo.comentarios,
+                    "slug": slug,
+                    "estatico": True,
+                },
+            )
+            url = reverse("blog:artigo_detail", kwargs={"slug": slug})
+            gravar_atomico(caminho_da_pagina(destino, url), html.encode())
+            gravados.append(slug)
+    finally:
+        close_old_connections()
+    return gravados
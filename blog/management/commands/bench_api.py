@@ -0,0 +1,109 @@
+import dataclasses
+import importlib.util
+import json
+import random
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test.utils import override_settings
+
+from blog.dto import ArtigoDTO, PaginaArtigosDTO
+from blog.serializacao import codificador
+from blog.services.artigo_service import (
+    obter_artigo_dto_por_slug,
+    obter_pagina_artigos_dto,
+)
+
+from ._bench import GeradorTexto, banco_isolado, escrever_tabela, medir, semear_blog
+
+SEM_FRAGMENTOS = {
+    **settings.CACHES,
+    "template_fragments": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara tamanho e tempo de serialização da lista e do detalhe: HTML, "
+        "json.dumps(asdict()) e os codificadores compilados da API"
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--artigos", type=int, default=200)
+        parser.add_argument("--paragrafos", type=int, default=8)
+        parser.add_argument("--iteracoes", type=int, default=500)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        gerador = GeradorTexto(random.Random(options["seed"]))
+        iteracoes = options["iteracoes"]
+
+        with banco_isolado():
+            semear_blog(
+                gerador,
+                artigos=options["artigos"],
+                comentarios_por_artigo=5,
+                paragrafos=options["paragrafos"],
+            )
+            pagina = obter_pagina_artigos_dto()
+            slug = pagina.artigos[0].slug
+            artigo = obter_artigo_dto_por_slug(slug)
+
+        campos_sem_conteudo = [
+            campo.name
+            for campo in dataclasses.fields(ArtigoDTO)
+            if campo.name != "conteudo"
+        ]
+        cenarios = {
+            "lista: html": lambda: render_to_string(
+                "blog/artigo_list.html", {"artigos": pagina.artigos, "pagina": pagina}
+            ),
+            "lista: json.dumps(asdict())": lambda: json.dumps(
+                dataclasses.asdict(pagina), default=str
+            ),
+            "lista: codificador compilado": lambda: codificador(PaginaArtigosDTO)(
+                pagina
+            ),
+            "lista: codificador, só titulo e slug": lambda: codificador(
+                PaginaArtigosDTO, aninhados={"artigos": ["titulo", "slug"]}
+            )(pagina),
+            "detalhe: html": lambda: render_to_string(
+                "blog/artigo_detail.html",
+                {"artigo": artigo, "comentarios": artigo.comentarios, "slug": slug},
+            ),
+            "detalhe: json.dumps(asdict())": lambda: json.dumps(
+                dataclasses.asdict(artigo), default=str
+            ),
+            "detalhe: codificador compilado": lambda: codificador(ArtigoDTO)(artigo),
+            "detalhe: codificador, sem conteudo": lambda: codificador(
+                ArtigoDTO, campos_sem_conteudo
+            )(artigo),
+        }
+        # Referência opcional: orjson serializa dataclasses em C
+        if importlib.util.find_spec("orjson") is not None:
+            import orjson
+
+            cenarios["lista: orjson"] = lambda: orjson.dumps(pagina)
+            cenarios["detalhe: orjson"] = lambda: orjson.dumps(artigo)
+
+        # O HTML sem os fragmentos em cache: o custo de montar a página inteira
+        with override_settings(CACHES=SEM_FRAGMENTOS):
+            medicoes = [
+                medir(nome, funcao, iteracoes) for nome, funcao in cenarios.items()
+            ]
+            tamanhos = {
+                nome: len(_em_bytes(funcao())) for nome, funcao in cenarios.items()
+            }
+
+        escrever_tabela(self.stdout, medicoes)
+        self.stdout.write("")
+        largura = max(len(nome) for nome in tamanhos)
+        self.stdout.write(f"{'cenário':<{largura}}  {'bytes':>9}")
+        for nome, tamanho in tamanhos.items():
+            self.stdout.write(f"{nome:<{largura}}  {tamanho:>9,}")
+
+
+def _em_bytes(resultado: str | bytes) -> bytes:
+    return resultado if isinstance(resultado, bytes) else resultado.encode()
@@ -0,0 +1,225 @@
+import http.client
+import importlib.util
+import os
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ._bench import executar_manage, percentis
+
+
+@dataclass
+class ResultadoCarga:
+    nome: str
+    requisicoes: int
+    erros: int
+    duracao_s: float
+    media_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+    @property
+    def por_segundo(self) -> float:
+        return self.requisicoes / self.duracao_s
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara a vazão concorrente das views sob uvicorn (ASGI, views async) "
+        "e sob um servidor WSGI com threads (views síncronas)"
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--artigos", type=int, default=2000)
+        parser.add_argument("--comentarios", type=int, default=20000)
+        parser.add_argument("--concorrencia", type=int, default=32)
+        parser.add_argument("--duracao", type=float, default=10, help="Segundos")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        if importlib.util.find_spec("uvicorn") is None:
+            raise CommandError(
+                "uvicorn não está instalado: "
+                "uv run --with uvicorn python manage.py bench_asgi"
+            )
+
+        with tempfile.TemporaryDirectory() as diretorio:
+            ambiente = {
+                **os.environ,
+                "DJANGO_SETTINGS_MODULE": "config.settings_bench",
+                "BLOG_BENCH_DB": str(Path(diretorio) / "bench.sqlite3"),
+            }
+            self.stdout.write("Semeando o banco do benchmark...")
+            executar_manage(ambiente, "migrate", "-v0")
+            executar_manage(
+                ambiente,
+                "seed_blog",
+                f"--artigos={options['artigos']}",
+                f"--comentarios={options['comentarios']}",
+                f"--seed={options['seed']}",
+                "--usuarios=200",
+                "--sem-indice",
+            )
+            caminhos = ["/", *_urls_de_detalhe(ambiente["BLOG_BENCH_DB"])]
+
+            servidores = {
+                "wsgi (threads, views síncronas)": [
+                    "manage.py",
+                    "runserver",
+                    "--noreload",
+                    "--skip-checks",
+                ],
+                "asgi (uvicorn, views async)": [
+                    "-m",
+                    "uvicorn",
+                    "config.asgi:application",
+                    "--no-access-log",
+                    "--log-level=warning",
+                ],
+            }
+            resultados = []
+            for nome, comando in servidores.items():
+                porta = _porta_livre()
+                if "uvicorn" in comando:
+                    comando = [*comando, f"--port={porta}"]
+                else:
+                    comando = [*comando, f"127.0.0.1:{porta}"]
+                with _servidor(comando, ambiente, porta):
+                    _gerar_carga(porta, caminhos, 4, 1)  # aquecimento
+                    resultados.append(
+                        _gerar_carga(
+                            porta,
+                            caminhos,
+                            options["concorrencia"],
+                            options["duracao"],
+                            nome,
+                        )
+                    )
+
+        largura = max(len(resultado.nome) for resultado in resultados)
+        self.stdout.write(
+            f"{'servidor':<{largura}}  {'req/s':>8}  {'média':>9}  {'p50':>9}  "
+            f"{'p95':>9}  {'p99':>9}  {'erros':>5}"
+        )
+        for resultado in resultados:
+            self.stdout.write(
+                f"{resultado.nome:<{largura}}  {resultado.por_segundo:>8.1f}  "
+                f"{resultado.media_ms:>7.2f}ms  {resultado.p50_ms:>7.2f}ms  "
+                f"{resultado.p95_ms:>7.2f}ms  {resultado.p99_ms:>7.2f}ms  "
+                f"{resultado.erros:>5}"
+            )
+
+
+@contextmanager
+def _servidor(comando, ambiente, porta):
+    processo = subprocess.Popen(
+        [sys.executable, *comando],
+        cwd=settings.BASE_DIR,
+        env=ambiente,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _aguardar_porta(porta, processo)
+        yield
+    finally:
+        processo.terminate()
+        processo.wait(timeout=10)
+
+
+def _aguardar_porta(porta, processo, timeout=30):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            raise CommandError(f"O servidor terminou com código {processo.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", porta), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise CommandError(f"O servidor não abriu a porta {porta} em {timeout}s")
+
+
+def _gerar_carga(porta, caminhos, concorrencia, duracao, nome=""):
+    # Cada cliente é uma thread com conexão keep-alive; os servidores rodam
+    # em outros processos, então o GIL daqui não limita o lado medido
+    tempos: list[float] = []
+    erros = 0
+    trava = threading.Lock()
+    fim = time.perf_counter() + duracao
+
+    def cliente(indice):
+        nonlocal erros
+        conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=30)
+        locais, falhas, proximo = [], 0, indice
+        while time.perf_counter() < fim:
+            caminho = caminhos[proximo % len(caminhos)]
+            proximo += 1
+            inicio = time.perf_counter()
+            try:
+                conexao.request("GET", caminho)
+                resposta = conexao.getresponse()
+                resposta.read()
+                if resposta.status != 200:
+                    falhas += 1
+            except (OSError, http.client.HTTPException):
+                falhas += 1
+                conexao.close()
+                conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=30)
+                continue
+            locais.append((time.perf_counter() - inicio) * 1000)
+        conexao.close()
+        with trava:
+            tempos.extend(locais)
+            erros += falhas
+
+    inicio = time.perf_counter()
+    threads = [
+        threading.Thread(target=cliente, args=(indice,))
+        for indice in range(concorrencia)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    decorrido = time.perf_counter() - inicio
+
+    if not tempos:
+        raise CommandError(f"Nenhuma requisição completou em {nome or 'aquecimento'}")
+    return ResultadoCarga(
+        nome=nome,
+        requisicoes=len(tempos),
+        erros=erros,
+        duracao_s=decorrido,
+        media_ms=statistics.fmean(tempos),
+        **percentis(tempos),
+    )
+
+
+def _urls_de_detalhe(caminho_banco, quantidade=50):
+    with sqlite3.connect(caminho_banco) as conexao:
+        slugs = conexao.execute(
+            "SELECT slug FROM blog_artigo WHERE publicado "
+            "ORDER BY data_publicacao DESC LIMIT ?",
+            (quantidade,),
+        ).fetchall()
+    return [f"/{slug}/" for (slug,) in slugs]
+
+
+def _porta_livre():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
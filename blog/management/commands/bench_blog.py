@@ -0,0 +1,117 @@
+import random
+import sys
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from blog.services.artigo_service import (
+    obter_artigo_dto_por_slug,
+    obter_lista_artigos_dto,
+)
+from blog.services.cache_artigo import cache_artigo_dto
+
+from ._bench import (
+    GeradorTexto,
+    banco_isolado,
+    escrever_json,
+    escrever_tabela,
+    medir,
+    semear_blog,
+)
+
+
+class Command(BaseCommand):
+    help = "Mede serviços e views do blog em um banco isolado com dados sintéticos"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--usuarios", type=int, default=50)
+        parser.add_argument("--tags", type=int, default=30)
+        parser.add_argument("--artigos", type=int, default=1000)
+        parser.add_argument("--comentarios", type=int, default=10, help="Por artigo")
+        parser.add_argument("--iteracoes", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--json",
+            metavar="ARQUIVO",
+            help="Grava o resultado em JSON; use '-' para a saída padrão",
+        )
+
+    def handle(self, *args, **options):
+        parametros = {
+            chave: options[chave]
+            for chave in (
+                "usuarios",
+                "tags",
+                "artigos",
+                "comentarios",
+                "iteracoes",
+                "seed",
+            )
+        }
+        gerador = GeradorTexto(random.Random(options["seed"]))
+        iteracoes = options["iteracoes"]
+
+        # Sem o Silk, que grava cada request no banco e dominaria a medição
+        middleware = [
+            classe for classe in settings.MIDDLEWARE if not classe.startswith("silk.")
+        ]
+        with (
+            banco_isolado(),
+            override_settings(MIDDLEWARE=middleware, ALLOWED_HOSTS=["testserver"]),
+        ):
+            semear_blog(
+                gerador,
+                artigos=options["artigos"],
+                usuarios=options["usuarios"],
+                tags=options["tags"],
+                comentarios_por_artigo=options["comentarios"],
+            )
+            slug = obter_lista_artigos_dto()[0].slug
+            client = Client()
+            url_lista = reverse("blog:artigo_list")
+            url_detalhe = reverse("blog:artigo_detail", kwargs={"slug": slug})
+            for url in (url_lista, url_detalhe):
+                status = client.get(url).status_code
+                if status != 200:
+                    raise CommandError(f"{url} respondeu {status}")
+
+            def detalhe_sem_cache():
+                _limpar_caches()
+                return obter_artigo_dto_por_slug(slug)
+
+            def view_detalhe_sem_cache():
+                _limpar_caches()
+                return client.get(url_detalhe)
+
+            medicoes = [
+                medir("obter_lista_artigos_dto", obter_lista_artigos_dto, iteracoes),
+                medir("obter_artigo_dto_por_slug", detalhe_sem_cache, iteracoes),
+                medir("view lista", lambda: client.get(url_lista), iteracoes),
+                medir("view detalhe (cache frio)", view_detalhe_sem_cache, iteracoes),
+                medir(
+                    "view detalhe (cache quente)",
+                    lambda: client.get(url_detalhe),
+                    iteracoes,
+                ),
+            ]
+
+        destino = options["json"]
+        if destino == "-":
+            escrever_json(sys.stdout, parametros, medicoes)
+            return
+
+        escrever_tabela(self.stdout, medicoes)
+        if destino:
+            with open(destino, "w", encoding="utf-8") as arquivo:
+                escrever_json(arquivo, parametros, medicoes)
+            self.stdout.write(f"Resultado gravado em {destino}")
+
+
+def _limpar_caches():
+    cache.clear()
+    cache_artigo_dto.limpar()
@@ -0,0 +1,100 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from blog.models import Artigo
+from blog.services.busca_service import (
+    busca_disponivel,
+    buscar_artigos,
+    filtrar_por_busca,
+    reindexar_tudo,
+)
+
+from ._bench import GeradorTexto, banco_isolado, escrever_tabela, medir, semear_blog
+
+
+class Command(BaseCommand):
+    help = "Compara a busca FTS5 com o caminho icontains em um banco isolado"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--artigos", type=int, default=2000)
+        parser.add_argument("--paragrafos", type=int, default=8)
+        parser.add_argument("--iteracoes", type=int, default=30)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--termos",
+            nargs="+",
+            help="Padrão: uma palavra comum, uma intermediária e uma rara",
+        )
+
+    def handle(self, *args, **options):
+        if not busca_disponivel():
+            raise CommandError("A busca full-text exige SQLite com FTS5")
+
+        gerador = GeradorTexto(random.Random(options["seed"]))
+        vocabulario = gerador.vocabulario
+        termos = options["termos"] or [
+            vocabulario[0],
+            vocabulario[len(vocabulario) // 20],
+            vocabulario[len(vocabulario) // 2],
+        ]
+        iteracoes = options["iteracoes"]
+
+        with banco_isolado():
+            semear_blog(
+                gerador, artigos=options["artigos"], paragrafos=options["paragrafos"]
+            )
+            # bulk_create não dispara sinais: o índice é montado de uma vez
+            reindexar_tudo()
+            medicoes = []
+            for termo in termos:
+                # Página pública: 20 resultados (FTS5 com ranking e trecho)
+                medicoes.append(
+                    medir(
+                        f"fts5 '{termo}'", lambda t=termo: buscar_artigos(t), iteracoes
+                    )
+                )
+                medicoes.append(
+                    medir(
+                        f"icontains '{termo}'",
+                        lambda t=termo: list(_icontains(t).values_list("slug")[:20]),
+                        iteracoes,
+                    )
+                )
+                # Changelist do admin: COUNT(*) de todos os resultados
+                medicoes.append(
+                    medir(
+                        f"admin fts5 '{termo}'",
+                        lambda t=termo: filtrar_por_busca(_publicados(), t).count(),
+                        iteracoes,
+                    )
+                )
+                medicoes.append(
+                    medir(
+                        f"admin icontains '{termo}'",
+                        lambda t=termo: _icontains(t).count(),
+                        iteracoes,
+                    )
+                )
+
+        self.stdout.write(f"{options['artigos']} artigos publicados")
+        escrever_tabela(self.stdout, medicoes)
+
+
+def _publicados():
+    return Artigo.objects.filter(publicado=True)
+
+
+def _icontains(termo: str):
+    # Caminho anterior do admin: LIKE '%termo%' em cada coluna, palavra a palavra
+    filtro = Q()
+    for palavra in termo.split():
+        filtro &= (
+            Q(titulo__icontains=palavra)
+            | Q(resumo__icontains=palavra)
+            | Q(conteudo__icontains=palavra)
+            | Q(tags__nome__icontains=palavra)
+        )
+    return _publicados().filter(filtro).distinct()
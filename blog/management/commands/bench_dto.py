@@ -0,0 +1,65 @@
+import random
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from blog.services.artigo_service import (
+    obter_lista_artigos_dto,
+    obter_lista_artigos_dto_por_valores,
+)
+
+from ._bench import GeradorTexto, banco_isolado, escrever_tabela, medir, semear_blog
+
+
+class Command(BaseCommand):
+    help = "Compara a montagem de ArtigoListDTO via modelos e via values_list"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--artigos", type=int, default=2000)
+        parser.add_argument("--iteracoes", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        gerador = GeradorTexto(random.Random(options["seed"]))
+        construtores = {
+            "modelos": obter_lista_artigos_dto,
+            "values_list": obter_lista_artigos_dto_por_valores,
+        }
+
+        with banco_isolado():
+            semear_blog(gerador, artigos=options["artigos"], paragrafos=1)
+            quantidade = len(obter_lista_artigos_dto())
+            medicoes = [
+                medir(nome, construtor, options["iteracoes"])
+                for nome, construtor in construtores.items()
+            ]
+            escrever_tabela(self.stdout, medicoes)
+
+            self.stdout.write("")
+            self.stdout.write(f"por artigo ({quantidade} artigos publicados):")
+            for nome, construtor in construtores.items():
+                cpu_us, pico_bytes = _custo_por_artigo(
+                    construtor, quantidade, options["iteracoes"]
+                )
+                self.stdout.write(
+                    f"{nome:<12} cpu {cpu_us:>7.1f}µs  pico {pico_bytes:>8.0f} bytes"
+                )
+
+
+def _custo_por_artigo(construtor, quantidade: int, iteracoes: int):
+    # CPU do processo (inclui o SQLite, que roda no mesmo processo) e pico de
+    # alocação medido à parte, porque o tracemalloc distorce o tempo
+    inicio = time.process_time()
+    for _ in range(iteracoes):
+        construtor()
+    cpu_us = (time.process_time() - inicio) / iteracoes / quantidade * 1_000_000
+
+    tracemalloc.start()
+    try:
+        construtor()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return cpu_us, pico / quantidade
@@ -0,0 +1,125 @@
+import random
+import time
+from dataclasses import dataclass
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from blog.models import Artigo, Comentario
+from blog.services.moderacao_service import (
+    aprovar_comentarios,
+    despublicar_artigos,
+    publicar_artigos,
+    rejeitar_comentarios,
+)
+
+from ._bench import GeradorTexto, banco_isolado, semear_blog
+
+
+@dataclass
+class ResultadoModeracao:
+    nome: str
+    linhas: int
+    segundos: float
+    queries: int
+
+    @property
+    def por_segundo(self) -> float:
+        return self.linhas / self.segundos if self.segundos else 0.0
+
+
+class _ContadorQueries:
+    # execute_wrapper em vez de CaptureQueriesContext: não guarda o SQL de
+    # cada query, que pesaria na medição com 100 mil linhas
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.total += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara moderação e publicação em lote (um UPDATE por lote) com "
+        "save() por linha, em um banco isolado"
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--artigos", type=int, default=100_000)
+        parser.add_argument("--comentarios", type=int, default=1, help="Por artigo")
+        parser.add_argument(
+            "--amostra",
+            type=int,
+            default=1000,
+            help="Linhas alteradas com save() por linha, para comparação",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        gerador = GeradorTexto(random.Random(options["seed"]))
+        amostra = options["amostra"]
+
+        with banco_isolado():
+            self.stdout.write("Semeando o banco do benchmark...")
+            semear_blog(
+                gerador,
+                artigos=options["artigos"],
+                comentarios_por_artigo=options["comentarios"],
+                paragrafos=1,
+            )
+
+            def save_por_comentario():
+                comentarios = list(Comentario.objects.filter(aprovado=True)[:amostra])
+                for comentario in comentarios:
+                    comentario.aprovado = False
+                    comentario.save()
+                return len(comentarios)
+
+            def publicar_por_artigo():
+                artigos = list(Artigo.objects.filter(publicado=False)[:amostra])
+                for artigo in artigos:
+                    artigo.publicar()
+                return len(artigos)
+
+            resultados = [
+                self._medir("comentários: save() por linha", save_por_comentario),
+                self._medir(
+                    "comentários: rejeitar_comentarios",
+                    lambda: rejeitar_comentarios(Comentario.objects.all()),
+                ),
+                self._medir(
+                    "comentários: aprovar_comentarios",
+                    lambda: aprovar_comentarios(Comentario.objects.all()),
+                ),
+                self._medir(
+                    "artigos: despublicar_artigos",
+                    lambda: despublicar_artigos(Artigo.objects.all()),
+                ),
+                self._medir("artigos: publicar() por linha", publicar_por_artigo),
+                self._medir(
+                    "artigos: publicar_artigos",
+                    lambda: publicar_artigos(Artigo.objects.all()),
+                ),
+            ]
+
+        largura = max(len(resultado.nome) for resultado in resultados)
+        self.stdout.write(
+            f"{'cenário':<{largura}}  {'linhas':>8}  {'tempo':>9}  "
+            f"{'linhas/s':>10}  {'queries':>7}"
+        )
+        for resultado in resultados:
+            self.stdout.write(
+                f"{resultado.nome:<{largura}}  {resultado.linhas:>8}  "
+                f"{resultado.segundos:>8.2f}s  {resultado.por_segundo:>10,.0f}  "
+                f"{resultado.queries:>7}"
+            )
+
+    def _medir(self, nome, funcao) -> ResultadoModeracao:
+        contador = _ContadorQueries()
+        with connection.execute_wrapper(contador):
+            inicio = time.perf_counter()
+            linhas = funcao()
+            segundos = time.perf_counter() - inicio
+        return ResultadoModeracao(nome, linhas, segundos, contador.total)
@@ -0,0 +1,138 @@
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from ._bench import executar_manage, percentis
+from ._carga_sqlite import trabalhador
+
+PERFIS = {
+    "padrao": "padrão (rollback journal, sem PRAGMAs, conexão por request)",
+    "producao": "produção (WAL, PRAGMAs, IMMEDIATE, conexão persistente)",
+}
+
+
+@dataclass
+class ResultadoPerfil:
+    nome: str
+    duracao_s: float
+    leituras: list[float]
+    escritas: list[float]
+    erros: int
+
+    @property
+    def operacoes_por_segundo(self) -> float:
+        return (len(self.leituras) + len(self.escritas)) / self.duracao_s
+
+
+class Command(BaseCommand):
+    help = (
+        "Vazão de leituras e escritas concorrentes em vários processos, com o "
+        "SQLite padrão e com o perfil de produção (config/sqlite.py)"
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--artigos", type=int, default=2000)
+        parser.add_argument("--comentarios", type=int, default=20000)
+        parser.add_argument("--processos", type=int, default=8)
+        parser.add_argument("--duracao", type=float, default=10, help="Segundos")
+        parser.add_argument(
+            "--escritas",
+            type=float,
+            default=0.2,
+            help="Fração das operações que escrevem (0 a 1)",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as diretorio:
+            semente = Path(diretorio) / "semente.sqlite3"
+            ambiente = {
+                **os.environ,
+                "DJANGO_SETTINGS_MODULE": "config.settings_bench",
+                "BLOG_BENCH_DB": str(semente),
+            }
+            self.stdout.write("Semeando o banco do benchmark...")
+            executar_manage(ambiente, "migrate", "-v0")
+            executar_manage(
+                ambiente,
+                "seed_blog",
+                f"--artigos={options['artigos']}",
+                f"--comentarios={options['comentarios']}",
+                f"--seed={options['seed']}",
+                "--usuarios=200",
+                "--sem-indice",
+            )
+
+            resultados = []
+            for perfil, nome in PERFIS.items():
+                # Uma cópia por perfil: o modo WAL fica gravado no arquivo
+                caminho = Path(diretorio) / f"{perfil}.sqlite3"
+                shutil.copyfile(semente, caminho)
+                self.stdout.write(f"Carga com o perfil {perfil}...")
+                resultados.append(self._carga(nome, perfil, str(caminho), options))
+
+        self._escrever(resultados)
+
+    def _carga(self, nome, perfil, caminho, options) -> ResultadoPerfil:
+        contexto = multiprocessing.get_context("spawn")
+        barreira = contexto.Barrier(options["processos"])
+        fila = contexto.Queue()
+        processos = [
+            contexto.Process(
+                target=trabalhador,
+                args=(
+                    indice,
+                    perfil,
+                    caminho,
+                    options["duracao"],
+                    options["escritas"],
+                    barreira,
+                    fila,
+                ),
+            )
+            for indice in range(options["processos"])
+        ]
+        for processo in processos:
+            processo.start()
+        # Lê a fila antes do join: um processo com a fila cheia não termina
+        parciais = [fila.get() for _ in processos]
+        for processo in processos:
+            processo.join()
+
+        return ResultadoPerfil(
+            nome=nome,
+            duracao_s=options["duracao"],
+            leituras=[tempo for leituras, _, _ in parciais for tempo in leituras],
+            escritas=[tempo for _, escritas, _ in parciais for tempo in escritas],
+            erros=sum(erros for _, _, erros in parciais),
+        )
+
+    def _escrever(self, resultados: list[ResultadoPerfil]) -> None:
+        for resultado in resultados:
+            self.stdout.write("")
+            self.stdout.write(resultado.nome)
+            self.stdout.write(
+                f"  {resultado.operacoes_por_segundo:,.0f} operações/s, "
+                f"{resultado.erros} erros (database is locked)"
+            )
+            for tipo, tempos in (
+                ("leituras", resultado.leituras),
+                ("escritas", resultado.escritas),
+            ):
+                if not tempos:
+                    self.stdout.write(f"  {tipo:<8} nenhuma completou")
+                    continue
+                cortes = percentis(tempos)
+                self.stdout.write(
+                    f"  {tipo:<8} {len(tempos) / resultado.duracao_s:>8,.0f}/s  "
+                    f"média {statistics.fmean(tempos):>7.2f}ms  "
+                    f"p50 {cortes['p50_ms']:>7.2f}ms  "
+                    f"p99 {cortes['p99_ms']:>8.2f}ms"
+                )
@@ -0,0 +1,97 @@
+import random
+from dataclasses import replace
+from datetime import timedelta
+from itertools import count
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test.utils import override_settings
+
+from blog.services.artigo_service import (
+    obter_artigo_dto_por_slug,
+    obter_pagina_artigos_dto,
+)
+
+from ._bench import GeradorTexto, banco_isolado, escrever_tabela, medir, semear_blog
+
+SEM_FRAGMENTOS = {
+    **settings.CACHES,
+    "template_fragments": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede a renderização da lista e do detalhe com e sem os fragmentos "
+        "de template em cache (DTOs prontos: só o custo do template)"
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--artigos", type=int, default=200)
+        parser.add_argument("--paragrafos", type=int, default=8)
+        parser.add_argument("--iteracoes", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        gerador = GeradorTexto(random.Random(options["seed"]))
+        iteracoes = options["iteracoes"]
+
+        with banco_isolado():
+            semear_blog(
+                gerador,
+                artigos=options["artigos"],
+                comentarios_por_artigo=5,
+                paragrafos=options["paragrafos"],
+            )
+            pagina = obter_pagina_artigos_dto()
+            artigo = obter_artigo_dto_por_slug(pagina.artigos[0].slug)
+
+        def lista(artigos=pagina.artigos):
+            return render_to_string(
+                "blog/artigo_list.html", {"artigos": artigos, "pagina": pagina}
+            )
+
+        def detalhe():
+            return render_to_string(
+                "blog/artigo_detail.html",
+                {
+                    "artigo": artigo,
+                    "comentarios": artigo.comentarios,
+                    "slug": pagina.artigos[0].slug,
+                },
+            )
+
+        versoes = count(1)
+
+        def lista_com_um_card_alterado():
+            # Cada iteração muda data_atualizacao de um artigo: só o card
+            # dele é renderizado de novo
+            alterado = replace(
+                pagina.artigos[0],
+                data_atualizacao=pagina.artigos[0].data_atualizacao
+                + timedelta(microseconds=next(versoes)),
+            )
+            return lista([alterado, *pagina.artigos[1:]])
+
+        caches["template_fragments"].clear()
+        with override_settings(CACHES=SEM_FRAGMENTOS):
+            medicoes = [
+                medir("lista: sem cache de fragmentos", lista, iteracoes),
+                medir("detalhe: sem cache de fragmentos", detalhe, iteracoes),
+            ]
+        medicoes += [
+            # Piso: base.html e a navegação, sem nenhum card
+            medir("lista: sem artigos", lambda: lista([]), iteracoes),
+            medir("lista: fragmentos em cache", lista, iteracoes),
+            medir("lista: um card alterado", lista_com_um_card_alterado, iteracoes),
+            medir("detalhe: fragmento em cache", detalhe, iteracoes),
+        ]
+
+        self.stdout.write(
+            f"{len(pagina.artigos)} cards por página, "
+            f"{len(artigo.conteudo):,} caracteres de conteúdo no detalhe"
+        )
+        escrever_tabela(self.stdout, medicoes)
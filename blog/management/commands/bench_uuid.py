@@ -0,0 +1,162 @@
+import random
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from blog.identificadores import uuid7
+from blog.models import Artigo, Comentario
+
+from ._bench import GeradorTexto, banco_isolado, semear_blog
+
+GERADORES = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+MIB = 1024 * 1024
+
+
+@dataclass
+class ResultadoInsercao:
+    gerador: str
+    linhas: int
+    segundos: float
+    # Vazão no último décimo da carga, com o índice já grande
+    por_segundo_final: float
+    pk_bytes: int
+    pk_ocupacao: float
+    tabela_bytes: int
+    outros_indices_bytes: int
+    banco_bytes: int
+
+    @property
+    def por_segundo(self) -> float:
+        return self.linhas / self.segundos
+
+
+class Command(BaseCommand):
+    help = (
+        "Insere milhões de comentários com chaves uuid4 e uuid7 em bancos SQLite "
+        "em arquivo e compara vazão e tamanho dos índices"
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--comentarios", type=int, default=2_000_000)
+        parser.add_argument(
+            "--lote", type=int, default=10_000, help="Linhas por transação"
+        )
+        parser.add_argument("--artigos", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("O tamanho dos índices vem do dbstat do SQLite")
+        if options["comentarios"] < 1 or options["lote"] < 1:
+            raise CommandError("--comentarios e --lote devem ser positivos")
+
+        resultados = []
+        with tempfile.TemporaryDirectory() as diretorio:
+            for nome, gerar in GERADORES.items():
+                self.stdout.write(
+                    f"Inserindo {options['comentarios']:,} comentários ({nome})..."
+                )
+                with banco_isolado(arquivo=str(Path(diretorio) / f"{nome}.sqlite3")):
+                    resultados.append(self._inserir(nome, gerar, options))
+
+        self._escrever(resultados)
+
+    def _inserir(self, nome, gerar, options) -> ResultadoInsercao:
+        # Mesma semente nos dois bancos: só a chave muda
+        rng = random.Random(options["seed"])
+        gerador = GeradorTexto(rng)
+        semear_blog(gerador, artigos=options["artigos"], usuarios=50, paragrafos=1)
+        artigo_ids = list(Artigo.objects.values_list("pk", flat=True))
+        autor_ids = list(User.objects.values_list("pk", flat=True))
+        textos = [gerador.html(1, palavras=rng.randint(5, 40)) for _ in range(200)]
+
+        total, lote = options["comentarios"], options["lote"]
+        tempos = []
+        for inicio in range(0, total, lote):
+            comentarios = [
+                Comentario(
+                    id=gerar(),
+                    artigo_id=rng.choice(artigo_ids),
+                    autor_id=rng.choice(autor_ids),
+                    texto=rng.choice(textos),
+                    aprovado=True,
+                )
+                for _ in range(min(lote, total - inicio))
+            ]
+            comeco = time.perf_counter()
+            # Um lote por transação, como uma carga contínua
+            Comentario.objects.bulk_create(comentarios, batch_size=lote)
+            tempos.append((len(comentarios), time.perf_counter() - comeco))
+
+        ultimos = tempos[-max(1, len(tempos) // 10) :]
+        tamanhos = _tamanhos(Comentario._meta.db_table)
+        return ResultadoInsercao(
+            gerador=nome,
+            linhas=total,
+            segundos=sum(segundos for _, segundos in tempos),
+            por_segundo_final=(
+                sum(linhas for linhas, _ in ultimos)
+                / sum(segundos for _, segundos in ultimos)
+            ),
+            **tamanhos,
+        )
+
+    def _escrever(self, resultados: list[ResultadoInsercao]) -> None:
+        self.stdout.write(
+            f"{'chave':<6}  {'linhas/s':>9}  {'final/s':>9}  {'índice pk':>10}  "
+            f"{'ocupação':>8}  {'tabela':>9}  {'outros':>9}  {'banco':>9}"
+        )
+        for resultado in resultados:
+            self.stdout.write(
+                f"{resultado.gerador:<6}  {resultado.por_segundo:>9,.0f}  "
+                f"{resultado.por_segundo_final:>9,.0f}  "
+                f"{resultado.pk_bytes / MIB:>6.1f} MiB  "
+                f"{resultado.pk_ocupacao:>7.0%}  "
+                f"{resultado.tabela_bytes / MIB:>5.1f} MiB  "
+                f"{resultado.outros_indices_bytes / MIB:>5.1f} MiB  "
+                f"{resultado.banco_bytes / MIB:>5.1f} MiB"
+            )
+
+
+def _tamanhos(tabela: str) -> dict[str, int | float]:
+    # dbstat: bytes por página de cada árvore B; "unused" é o espaço livre
+    # deixado pelas divisões de página
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s",
+            [tabela],
+        )
+        indices = [nome for (nome,) in cursor.fetchall()]
+        cursor.execute(
+            "SELECT name, SUM(pgsize), SUM(unused) FROM dbstat "
+            f"WHERE name IN ({', '.join(['%s'] * (len(indices) + 1))}) GROUP BY name",
+            [tabela, *indices],
+        )
+        paginas = {nome: (tamanho, livre) for nome, tamanho, livre in cursor.fetchall()}
+        cursor.execute("PRAGMA page_count")
+        (quantidade,) = cursor.fetchone()
+        cursor.execute("PRAGMA page_size")
+        (tamanho_pagina,) = cursor.fetchone()
+
+    # O UNIQUE da chave primária em char(32) vira um índice automático
+    pk = next(nome for nome in indices if nome.startswith("sqlite_autoindex_"))
+    pk_bytes, pk_livre = paginas[pk]
+    return {
+        "pk_bytes": pk_bytes,
+        "pk_ocupacao": 1 - pk_livre / pk_bytes,
+        "tabela_bytes": paginas[tabela][0],
+        "outros_indices_bytes": sum(
+            tamanho
+            for nome, (tamanho, _) in paginas.items()
+            if nome not in (pk, tabela)
+        ),
+        "banco_bytes": quantidade * tamanho_pagina,
+    }
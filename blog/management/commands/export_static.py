@@ -0,0 +1,154 @@
+import contextlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from blog.arquivos import gravar_atomico
+from blog.services.artigo_service import (
+    obter_validadores_artigos,
+    obter_validadores_lista_artigos,
+)
+
+from ._exportacao import (
+    caminho_da_pagina,
+    iniciar_trabalhador,
+    renderizar_artigos,
+    renderizar_lista,
+)
+
+ARQUIVO_MANIFESTO = ".manifesto.json"
+
+VERSAO_MANIFESTO = 1
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta a lista e o detalhe dos artigos publicados como HTML estático, "
+        "renderizando em paralelo só as páginas que mudaram desde o último export"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("destino", help="Pasta servida pelo CDN")
+        parser.add_argument(
+            "--processos",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Processos de renderização; 1 renderiza neste processo",
+        )
+        parser.add_argument("--lote", type=int, default=50, help="Artigos por tarefa")
+        parser.add_argument(
+            "--tudo",
+            action="store_true",
+            help="Ignora o manifesto (ex.: depois de mudar um template)",
+        )
+
+    def handle(self, *args, **options):
+        if options["processos"] < 1 or options["lote"] < 1:
+            raise CommandError("--processos e --lote devem ser positivos")
+
+        destino = options["destino"]
+        Path(destino).mkdir(parents=True, exist_ok=True)
+        inicio = time.perf_counter()
+
+        # Os validadores do GET condicional mudam quando muda o artigo ou os
+        # comentários aprovados dele: são a versão de cada página
+        anterior = _ler_manifesto(destino)
+        versoes_anteriores = anterior.get("artigos", {})
+        versoes = {
+            slug: validadores.etag
+            for slug, validadores in obter_validadores_artigos().items()
+        }
+        versao_lista = obter_validadores_lista_artigos().etag
+
+        alterados = [
+            slug
+            for slug, etag in versoes.items()
+            if options["tudo"] or versoes_anteriores.get(slug) != etag
+        ]
+        removidos = versoes_anteriores.keys() - versoes.keys()
+
+        gravados = self._renderizar(destino, alterados, options)
+        for slug in removidos:
+            url = reverse("blog:artigo_detail", kwargs={"slug": slug})
+            pagina = caminho_da_pagina(destino, url)
+            pagina.unlink(missing_ok=True)
+            with contextlib.suppress(OSError):
+                pagina.parent.rmdir()
+
+        paginas = len(gravados)
+        if (
+            options["tudo"]
+            or alterados
+            or removidos
+            or anterior.get("lista") != versao_lista
+        ):
+            paginas += renderizar_lista(destino)
+
+        # Só as versões gravadas entram no manifesto: o que falhou (ou foi
+        # despublicado no meio) é tentado de novo no próximo export
+        _gravar_manifesto(
+            destino,
+            {
+                "versao": VERSAO_MANIFESTO,
+                "lista": versao_lista,
+                "artigos": {
+                    **{
+                        slug: etag
+                        for slug, etag in versoes_anteriores.items()
+                        if versoes.get(slug) == etag
+                    },
+                    **{slug: versoes[slug] for slug in gravados},
+                },
+            },
+        )
+
+        segundos = time.perf_counter() - inicio
+        self.stdout.write(
+            f"{paginas} páginas renderizadas, "
+            f"{len(versoes) - len(alterados)} sem mudanças, "
+            f"{len(removidos)} removidas em {segundos:.2f}s "
+            f"({paginas / segundos:,.1f} páginas/s)"
+        )
+
+    def _renderizar(self, destino, slugs, options) -> list[str]:
+        if not slugs:
+            return []
+        tamanho = options["lote"]
+        lotes = [
+            slugs[indice : indice + tamanho] for indice in range(0, len(slugs), tamanho)
+        ]
+        processos = min(options["processos"], len(lotes))
+        if processos == 1:
+            return [
+                slug for lote in lotes for slug in renderizar_artigos(destino, lote)
+            ]
+
+        # spawn: os processos não herdam as conexões abertas deste
+        with ProcessPoolExecutor(
+            max_workers=processos,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=iniciar_trabalhador,
+        ) as executor:
+            resultados = executor.map(renderizar_artigos, [destino] * len(lotes), lotes)
+            return [slug for gravados in resultados for slug in gravados]
+
+
+def _ler_manifesto(destino: str) -> dict:
+    try:
+        manifesto = json.loads(Path(destino, ARQUIVO_MANIFESTO).read_bytes())
+    except (FileNotFoundError, ValueError):
+        return {}
+    return manifesto if manifesto.get("versao") == VERSAO_MANIFESTO else {}
+
+
+def _gravar_manifesto(destino: str, manifesto: dict) -> None:
+    gravar_atomico(
+        Path(destino, ARQUIVO_MANIFESTO),
+        json.dumps(manifesto, indent=2, sort_keys=True).encode(),
+    )
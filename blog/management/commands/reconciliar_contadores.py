@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from blog.services.contador_service import reconciliar_total_comentarios
+
+
+class Command(BaseCommand):
+    help = "Recalcula Artigo.total_comentarios_aprovados a partir dos comentários"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas informa quantos artigos estão divergentes",
+        )
+
+    def handle(self, *args, **options):
+        corrigir = not options["dry_run"]
+        divergentes = reconciliar_total_comentarios(corrigir=corrigir)
+
+        if not divergentes:
+            self.stdout.write(self.style.SUCCESS("Todos os contadores estão corretos"))
+        elif corrigir:
+            self.stdout.write(
+                self.style.SUCCESS(f"{divergentes} artigo(s) corrigido(s)")
+            )
+        else:
+            self.stdout.write(
+                self.style.WARNING(f"{divergentes} artigo(s) com contador divergente")
+            )
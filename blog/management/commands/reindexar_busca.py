@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.services.busca_service import busca_disponivel, reindexar_tudo
+
+
+class Command(BaseCommand):
+    help = "Reconstrói o índice FTS5 de busca de artigos"
+
+    def handle(self, *args, **options):
+        if not busca_disponivel():
+            raise CommandError("A busca full-text exige SQLite com FTS5")
+
+        total = reindexar_tudo()
+        self.stdout.write(self.style.SUCCESS(f"{total} artigo(s) indexado(s)"))
@@ -0,0 +1,243 @@
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from blog.identificadores import uuid7_em
+from blog.models import Artigo, Comentario, Tag
+from blog.services.busca_service import reindexar_tudo
+
+from ._bench import GeradorTexto
+
+TAMANHO_BULK = 1000
+
+
+class Command(BaseCommand):
+    help = "Gera grandes volumes de dados sintéticos com bulk_create"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--usuarios", type=int, default=1000)
+        parser.add_argument("--tags", type=int, default=100)
+        parser.add_argument("--artigos", type=int, default=100_000)
+        parser.add_argument("--comentarios", type=int, default=1_000_000)
+        parser.add_argument("--tags-por-artigo", type=int, default=3)
+        parser.add_argument("--paragrafos", type=int, default=5)
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=2000,
+            help="Artigos por transação; os comentários vão junto com o artigo",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--prefixo",
+            default="seed",
+            help="Prefixo de slugs e usernames; permite várias cargas no mesmo banco",
+        )
+        parser.add_argument(
+            "--sem-indice",
+            action="store_true",
+            help="Não reconstrói o índice de busca no final",
+        )
+
+    def handle(self, *args, **options):
+        prefixo = slugify(options["prefixo"])
+        if Artigo.objects.filter(slug__startswith=f"{prefixo}-").exists():
+            raise CommandError(
+                f"Já existem artigos com o prefixo '{prefixo}'; use outro --prefixo"
+            )
+        if options["usuarios"] < 1 or options["artigos"] < 1 or options["lote"] < 1:
+            raise CommandError("--usuarios, --artigos e --lote devem ser positivos")
+
+        self.verbosity = options["verbosity"]
+        rng = random.Random(options["seed"])
+        # Ids vêm de um gerador próprio, que inclui o prefixo: a mesma --seed
+        # com outro prefixo repete o conteúdo sem colidir nas chaves primárias
+        self.gerador_ids = random.Random(f"{options['seed']}:{prefixo}")
+        gerador = GeradorTexto(rng)
+        linhas = Counter()
+        inicio = time.perf_counter()
+
+        with transaction.atomic():
+            autor_ids = self._criar_usuarios(rng, prefixo, options["usuarios"])
+            tag_ids = self._criar_tags(gerador, options["tags"])
+        linhas["usuários"] = len(autor_ids)
+        linhas["tags"] = len(tag_ids)
+
+        total_artigos = options["artigos"]
+        media_comentarios = options["comentarios"] / total_artigos
+        agora = timezone.now()
+        for inicio_lote in range(0, total_artigos, options["lote"]):
+            indices = range(
+                inicio_lote, min(inicio_lote + options["lote"], total_artigos)
+            )
+            # Uma transação por lote: a memória fica limitada ao lote e uma
+            # falha no meio não desfaz o que já foi gravado
+            with transaction.atomic(), _sem_auto_now(Artigo, Comentario):
+                linhas += self._criar_lote(
+                    rng,
+                    gerador,
+                    prefixo,
+                    indices,
+                    autor_ids,
+                    tag_ids,
+                    media_comentarios,
+                    agora,
+                    options,
+                )
+            self._progresso(linhas, inicio)
+
+        if not options["sem_indice"]:
+            # bulk_create não dispara os sinais que mantêm o índice de busca
+            self.stdout.write("Reconstruindo o índice de busca...")
+            reindexar_tudo()
+
+        # Estatísticas do planejador; a contagem estimada do admin vem delas
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        duracao = time.perf_counter() - inicio
+        total = sum(linhas.values())
+        for tabela, quantidade in linhas.items():
+            self.stdout.write(f"{tabela:<14} {quantidade:>10}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} linhas em {duracao:.1f}s ({total / duracao:,.0f} linhas/s)"
+            )
+        )
+
+    def _criar_usuarios(self, rng, prefixo, quantidade):
+        senha = make_password(None)
+        usuarios = User.objects.bulk_create(
+            (
+                User(
+                    username=f"{prefixo}-usuario-{indice}",
+                    first_name=f"Nome{indice}",
+                    last_name=f"Sobrenome{indice}",
+                    password=senha,
+                )
+                for indice in range(quantidade)
+            ),
+            batch_size=TAMANHO_BULK,
+        )
+        return [usuario.pk for usuario in usuarios]
+
+    def _criar_tags(self, gerador, quantidade):
+        # Tags podem já existir de uma carga anterior: ignora conflitos e lê
+        # de volta pelo slug
+        nomes = gerador.vocabulario[:quantidade]
+        Tag.objects.bulk_create(
+            (Tag(nome=nome.title(), slug=slugify(nome)) for nome in nomes),
+            ignore_conflicts=True,
+        )
+        return list(
+            Tag.objects.filter(slug__in=[slugify(nome) for nome in nomes]).values_list(
+                "pk", flat=True
+            )
+        )
+
+    def _criar_lote(
+        self,
+        rng,
+        gerador,
+        prefixo,
+        indices,
+        autor_ids,
+        tag_ids,
+        media_comentarios,
+        agora,
+        options,
+    ):
+        artigos = []
+        comentarios = []
+        for indice in indices:
+            titulo = " ".join(gerador.palavras(6)).capitalize()
+            criado_em = agora - timedelta(minutes=indice * 7 + rng.randrange(7))
+            publicado = rng.random() < 0.9
+            artigo = Artigo(
+                id=uuid7_em(criado_em, self.gerador_ids),
+                titulo=titulo,
+                slug=f"{prefixo}-{indice}-{slugify(titulo)[:60]}",
+                autor_id=rng.choice(autor_ids),
+                conteudo=gerador.html(options["paragrafos"]),
+                resumo=gerador.html(1, palavras=30),
+                publicado=publicado,
+                data_criacao=criado_em,
+                data_publicacao=criado_em + timedelta(hours=1) if publicado else None,
+                data_atualizacao=criado_em + timedelta(hours=1),
+            )
+
+            quantidade = (
+                int(rng.expovariate(1 / media_comentarios)) if media_comentarios else 0
+            )
+            for _ in range(quantidade):
+                comentado_em = min(
+                    agora, criado_em + timedelta(minutes=rng.randrange(1, 20000))
+                )
+                comentario = Comentario(
+                    id=uuid7_em(comentado_em, self.gerador_ids),
+                    artigo_id=artigo.id,
+                    autor_id=rng.choice(autor_ids),
+                    texto=gerador.html(1, palavras=rng.randint(5, 40)),
+                    aprovado=rng.random() < 0.8,
+                    data_criacao=comentado_em,
+                )
+                artigo.total_comentarios_aprovados += comentario.aprovado
+                comentarios.append(comentario)
+            artigos.append(artigo)
+
+        Artigo.objects.bulk_create(artigos, batch_size=TAMANHO_BULK)
+        ligacoes = [
+            Artigo.tags.through(artigo_id=artigo.id, tag_id=tag_id)
+            for artigo in artigos
+            for tag_id in rng.sample(
+                tag_ids, min(options["tags_por_artigo"], len(tag_ids))
+            )
+        ]
+        Artigo.tags.through.objects.bulk_create(ligacoes, batch_size=TAMANHO_BULK)
+        Comentario.objects.bulk_create(comentarios, batch_size=TAMANHO_BULK)
+        return Counter(
+            {
+                "artigos": len(artigos),
+                "artigo_tags": len(ligacoes),
+                "comentários": len(comentarios),
+            }
+        )
+
+    def _progresso(self, linhas, inicio):
+        if self.verbosity < 2:
+            return
+        decorrido = time.perf_counter() - inicio
+        total = sum(linhas.values())
+        self.stdout.write(
+            f"{linhas['artigos']} artigos, {linhas['comentários']} comentários "
+            f"({total / decorrido:,.0f} linhas/s)"
+        )
+
+
+@contextmanager
+def _sem_auto_now(*modelos):
+    # bulk_create chama pre_save, que sobrescreveria as datas geradas com a
+    # hora atual; o comando roda numa thread só, então o ajuste é seguro
+    campos = [
+        campo
+        for modelo in modelos
+        for campo in modelo._meta.concrete_fields
+        if getattr(campo, "auto_now", False) or getattr(campo, "auto_now_add", False)
+    ]
+    originais = [(campo.auto_now, campo.auto_now_add) for campo in campos]
+    for campo in campos:
+        campo.auto_now = campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, (auto_now, auto_now_add) in zip(campos, originais):
+            campo.auto_now, campo.auto_now_add = auto_now, auto_now_add
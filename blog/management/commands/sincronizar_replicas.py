@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from blog.roteador_banco import PRIMARIO, replicas_configuradas
+
+
+class Command(BaseCommand):
+    help = (
+        "Copia o banco principal para as réplicas de leitura (BLOG_DB_REPLICAS) "
+        "com a API de backup do SQLite; substituto local da replicação"
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--intervalo",
+            type=float,
+            help="Repete a cópia a cada N segundos, até Ctrl+C",
+        )
+
+    def handle(self, *args, **options):
+        replicas = replicas_configuradas()
+        if not replicas:
+            raise CommandError("Nenhuma réplica configurada em BLOG_DB_REPLICAS")
+        if connections[PRIMARIO].vendor != "sqlite":
+            raise CommandError(
+                "Só para SQLite; em outros bancos use a replicação do próprio banco"
+            )
+
+        while True:
+            for alias in replicas:
+                inicio = time.perf_counter()
+                copiar_banco(PRIMARIO, alias)
+                self.stdout.write(
+                    f"{alias}: copiado em {(time.perf_counter() - inicio) * 1000:.0f}ms"
+                )
+            if not options["intervalo"]:
+                return
+            time.sleep(options["intervalo"])
+
+
+def copiar_banco(origem: str, destino: str) -> None:
+    # backup() copia página a página a partir de uma leitura consistente do
+    # primário; quem lê a réplica espera o fim da cópia pelo busy_timeout
+    conexao_origem, conexao_destino = connections[origem], connections[destino]
+    conexao_origem.ensure_connection()
+    conexao_destino.ensure_connection()
+    conexao_origem.connection.backup(conexao_destino.connection)
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.perfilador import gerar_token
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera um token assinado para perfilar requests específicos com o "
+        "PerfilAmostradoMiddleware"
+    )
+    requires_system_checks = []
+
+    def handle(self, *args, **options):
+        token = gerar_token()
+        self.stdout.write(token)
+        self.stderr.write(
+            f"Válido por {settings.BLOG_PERFIL_VALIDADE_TOKEN}s. Exemplo:\n"
+            f"  curl -H '{settings.BLOG_PERFIL_CABECALHO}: {token}' "
+            "http://127.0.0.1:8000/\n"
+            f"Relatórios em {settings.BLOG_PERFIL_DIRETORIO}"
+        )
@@ -0,0 +1,420 @@
+import atexit
+import fcntl
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from pathlib import Path
+from typing import TypeVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+from .arquivos import gravar_atomico
+from .identificadores import uuid7
+
+F = TypeVar("F", bound=Callable)
+
+# Limites dos baldes do histograma de latência, em segundos (le do Prometheus)
+BALDES = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# tipo -> (nome da métrica, rótulo, descrição)
+TIPOS = {
+    "servico": ("blog_servico", "funcao", "funções de serviço"),
+    "view": ("blog_view", "view", "views"),
+}
+
+
+@dataclass(slots=True)
+class Serie:
+    baldes: list[int] = field(default_factory=lambda: [0] * (len(BALDES) + 1))
+    soma: float = 0.0
+    queries: int = 0
+    linhas: int = 0
+
+    @property
+    def chamadas(self) -> int:
+        return sum(self.baldes)
+
+    def somar(self, outra: "Serie") -> None:
+        for indice, quantidade in enumerate(outra.baldes):
+            self.baldes[indice] += quantidade
+        self.soma += outra.soma
+        self.queries += outra.queries
+        self.linhas += outra.linhas
+
+
+@dataclass(slots=True)
+class Medicao:
+    # O nome pode mudar até o fim da medição: a view só é conhecida depois
+    # da resolução da URL
+    nome: str
+    queries: int = 0
+    linhas: int = 0
+
+
+# Medições abertas no contexto atual (a view e as funções de serviço dentro
+# dela): cada query conta para todas. O contexto acompanha o request até as
+# threads do sync_to_async
+_medicoes: ContextVar[tuple[Medicao, ...]] = ContextVar("blog_medicoes", default=())
+
+# Um dicionário de séries por thread: quem registra nunca espera uma trava.
+# A trava só protege a lista de dicionários, quando uma thread nova aparece
+_local = threading.local()
+_series_por_thread: list[dict[tuple[str, str], Serie]] = []
+_trava = threading.Lock()
+
+_exportador: threading.Thread | None = None
+
+# Soma das séries dos processos que já terminaram, no diretório compartilhado
+ARQUIVO_ENCERRADOS = "encerrados.json"
+
+# Um arquivo por processo no diretório compartilhado; o uuid7 evita que um
+# worker novo com o pid de um antigo sobrescreva as contagens dele
+_arquivo_do_processo = f"{os.getpid()}-{uuid7()}.json"
+
+
+def _depois_do_fork() -> None:
+    # Com --preload o gunicorn importa a aplicação antes do fork: cada worker
+    # começa com séries, arquivo e exportador próprios
+    global _local, _series_por_thread, _trava, _exportador, _arquivo_do_processo
+    _local = threading.local()
+    _series_por_thread = []
+    _trava = threading.Lock()
+    _exportador = None
+    _arquivo_do_processo = f"{os.getpid()}-{uuid7()}.json"
+
+
+os.register_at_fork(after_in_child=_depois_do_fork)
+
+
+def medido(funcao: F) -> F:
+    # Latência, queries e linhas lidas por chamada, na série da função
+    nome = f"{funcao.__module__.rsplit('.', 1)[-1]}.{funcao.__qualname__}"
+
+    if iscoroutinefunction(funcao):
+
+        @wraps(funcao)
+        async def medir_async(*args, **kwargs):
+            with medir("servico", nome):
+                return await funcao(*args, **kwargs)
+
+        return medir_async
+
+    @wraps(funcao)
+    def medir_sync(*args, **kwargs):
+        with medir("servico", nome):
+            return funcao(*args, **kwargs)
+
+    return medir_sync
+
+
+class medir:
+    # Classe em vez de @contextmanager: sem o gerador, a medição custa menos
+    # em funções chamadas a cada request
+    __slots__ = ("tipo", "medicao", "_contexto", "_inicio")
+
+    def __init__(self, tipo: str, nome: str):
+        self.tipo = tipo
+        self.medicao = Medicao(nome)
+
+    def __enter__(self) -> Medicao:
+        self._contexto = _medicoes.set((*_medicoes.get(), self.medicao))
+        self._inicio = time.perf_counter()
+        return self.medicao
+
+    def __exit__(self, *excecao) -> None:
+        segundos = time.perf_counter() - self._inicio
+        _medicoes.reset(self._contexto)
+        medicao = self.medicao
+        observar(self.tipo, medicao.nome, segundos, medicao.queries, medicao.linhas)
+
+
+def observar(tipo: str, nome: str, segundos: float, queries: int, linhas: int) -> None:
+    series = _series_da_thread()
+    serie = series.get((tipo, nome))
+    if serie is None:
+        serie = series[(tipo, nome)] = Serie()
+    serie.baldes[bisect_left(BALDES, segundos)] += 1
+    serie.soma += segundos
+    serie.queries += queries
+    serie.linhas += linhas
+
+
+def registrar_query(execute, sql, params, many, context):
+    # Instalado em toda conexão (blog/signals.py), como o do perfilador
+    medicoes = _medicoes.get()
+    if not medicoes:
+        return execute(sql, params, many, context)
+    for medicao in medicoes:
+        medicao.queries += 1
+    # As linhas só aparecem no fetch: o cursor do Django passa a ler por um
+    # proxy que conta o que sai do banco
+    cursor = context["cursor"]
+    if not isinstance(cursor.cursor, _CursorContador):
+        cursor.cursor = _CursorContador(cursor.cursor)
+    return execute(sql, params, many, context)
+
+
+class _CursorContador:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+    def __iter__(self):
+        for linha in self._cursor:
+            _contar_linhas(1)
+            yield linha
+
+    def fetchone(self):
+        linha = self._cursor.fetchone()
+        if linha is not None:
+            _contar_linhas(1)
+        return linha
+
+    def fetchmany(self, *args, **kwargs):
+        linhas = self._cursor.fetchmany(*args, **kwargs)
+        _contar_linhas(len(linhas))
+        return linhas
+
+    def fetchall(self):
+        linhas = self._cursor.fetchall()
+        _contar_linhas(len(linhas))
+        return linhas
+
+
+def _contar_linhas(quantidade: int) -> None:
+    for medicao in _medicoes.get():
+        medicao.linhas += quantidade
+
+
+def _series_da_thread() -> dict[tuple[str, str], Serie]:
+    try:
+        return _local.series
+    except AttributeError:
+        pass
+    series = _local.series = {}
+    with _trava:
+        _series_por_thread.append(series)
+    _iniciar_exportador()
+    return series
+
+
+def series_do_processo() -> dict[tuple[str, str], Serie]:
+    # Os dicionários das threads são lidos sem trava: copy() é atômico sob o
+    # GIL, e uma série lida no meio de uma atualização só adia uma observação
+    # para a próxima coleta
+    with _trava:
+        por_thread = list(_series_por_thread)
+    total: dict[tuple[str, str], Serie] = {}
+    for series in por_thread:
+        for chave, serie in series.copy().items():
+            total.setdefault(chave, Serie()).somar(serie)
+    return total
+
+
+def coletar() -> dict[tuple[str, str], Serie]:
+    # Com BLOG_METRICAS_DIRETORIO, soma os arquivos de todos os processos (os
+    # workers do gunicorn); sem ele, só este processo
+    diretorio = settings.BLOG_METRICAS_DIRETORIO
+    if not diretorio:
+        return series_do_processo()
+
+    gravar_series_do_processo()
+    diretorio = Path(diretorio)
+    consolidar_processos_encerrados(diretorio)
+    total: dict[tuple[str, str], Serie] = {}
+    # Compartilhada: outro worker só consolida entre duas coletas, nunca com um
+    # arquivo já somado aqui e ainda não apagado
+    with _trava_do_diretorio(diretorio, fcntl.LOCK_SH):
+        for arquivo in diretorio.glob("*.json"):
+            _somar(total, _ler_entradas(arquivo))
+    return total
+
+
+def gravar_series_do_processo() -> None:
+    diretorio = settings.BLOG_METRICAS_DIRETORIO
+    if not diretorio:
+        return
+    gravar_atomico(
+        Path(diretorio, _arquivo_do_processo),
+        json.dumps(_entradas(series_do_processo())).encode(),
+    )
+
+
+def consolidar_processos_encerrados(diretorio: Path) -> None:
+    # Como o modo multiprocesso do cliente Prometheus: cada worker reciclado
+    # deixa um arquivo. Os de pids que não existem mais são somados ao
+    # ARQUIVO_ENCERRADOS (os contadores não podem voltar) e apagados
+    with _trava_do_diretorio(diretorio, fcntl.LOCK_EX):
+        caminho_encerrados = diretorio / ARQUIVO_ENCERRADOS
+        try:
+            encerrados = json.loads(caminho_encerrados.read_bytes())
+        except (FileNotFoundError, ValueError):
+            encerrados = {"consolidados": [], "series": []}
+        # Somados na consolidação anterior, que parou antes de apagá-los
+        for nome in encerrados["consolidados"]:
+            (diretorio / nome).unlink(missing_ok=True)
+
+        arquivos = [
+            arquivo
+            for arquivo in diretorio.glob("*.json")
+            if arquivo.name != _arquivo_do_processo
+            and not _processo_vivo(arquivo.name.partition("-")[0])
+        ]
+        if not arquivos and not encerrados["consolidados"]:
+            return
+
+        total: dict[tuple[str, str], Serie] = {}
+        _somar(total, encerrados["series"])
+        for arquivo in arquivos:
+            _somar(total, _ler_entradas(arquivo))
+        conteudo = {
+            "consolidados": [arquivo.name for arquivo in arquivos],
+            "series": _entradas(total),
+        }
+        gravar_atomico(caminho_encerrados, json.dumps(conteudo).encode())
+        for arquivo in arquivos:
+            arquivo.unlink(missing_ok=True)
+
+
+def _processo_vivo(pid: str) -> bool:
+    # Nomes que não começam por um pid (o próprio ARQUIVO_ENCERRADOS) ficam
+    if not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # O pid existe, de outro usuário
+        return True
+    return True
+
+
+@contextmanager
+def _trava_do_diretorio(diretorio: Path, modo: int) -> Iterator[None]:
+    with open(diretorio / ".trava", "a") as arquivo:
+        fcntl.flock(arquivo, modo)
+        try:
+            yield
+        finally:
+            fcntl.flock(arquivo, fcntl.LOCK_UN)
+
+
+def _ler_entradas(arquivo: Path) -> list[dict]:
+    try:
+        entradas = json.loads(arquivo.read_bytes())
+    except (FileNotFoundError, ValueError):
+        return []
+    if isinstance(entradas, dict):
+        # ARQUIVO_ENCERRADOS
+        return entradas["series"]
+    return entradas
+
+
+def _somar(total: dict[tuple[str, str], Serie], entradas: list[dict]) -> None:
+    for entrada in entradas:
+        serie = Serie(
+            baldes=entrada["baldes"],
+            soma=entrada["soma"],
+            queries=entrada["queries"],
+            linhas=entrada["linhas"],
+        )
+        total.setdefault((entrada["tipo"], entrada["nome"]), Serie()).somar(serie)
+
+
+def _entradas(series: dict[tuple[str, str], Serie]) -> list[dict]:
+    return [
+        {
+            "tipo": tipo,
+            "nome": nome,
+            "baldes": serie.baldes,
+            "soma": serie.soma,
+            "queries": serie.queries,
+            "linhas": serie.linhas,
+        }
+        for (tipo, nome), serie in series.items()
+    ]
+
+
+def _iniciar_exportador() -> None:
+    # Grava as séries deste processo a cada BLOG_METRICAS_INTERVALO segundos,
+    # fora dos requests
+    global _exportador
+    if _exportador is not None or not settings.BLOG_METRICAS_DIRETORIO:
+        return
+    with _trava:
+        if _exportador is not None:
+            return
+        _exportador = threading.Thread(
+            target=_exportar_periodicamente, name="blog-metricas", daemon=True
+        )
+        _exportador.start()
+    atexit.register(gravar_series_do_processo)
+
+
+def _exportar_periodicamente() -> None:
+    while True:
+        time.sleep(settings.BLOG_METRICAS_INTERVALO)
+        gravar_series_do_processo()
+
+
+def limpar() -> None:
+    with _trava:
+        for series in _series_por_thread:
+            series.clear()
+
+
+def formatar_prometheus(series: dict[tuple[str, str], Serie]) -> str:
+    # Formato texto 0.0.4 da exposição do Prometheus
+    linhas: list[str] = []
+    for tipo, (metrica, rotulo, descricao) in TIPOS.items():
+        do_tipo = sorted(
+            (nome, serie)
+            for (tipo_serie, nome), serie in series.items()
+            if tipo_serie == tipo
+        )
+        linhas += [
+            f"# HELP {metrica}_duracao_segundos Latência das {descricao}",
+            f"# TYPE {metrica}_duracao_segundos histogram",
+        ]
+        for nome, serie in do_tipo:
+            rotulos = f'{rotulo}="{_escapar(nome)}"'
+            acumulado = 0
+            for limite, quantidade in zip((*BALDES, "+Inf"), serie.baldes):
+                acumulado += quantidade
+                linhas.append(
+                    f'{metrica}_duracao_segundos_bucket{{{rotulos},le="{limite}"}} '
+                    f"{acumulado}"
+                )
+            linhas += [
+                f"{metrica}_duracao_segundos_sum{{{rotulos}}} {serie.soma!r}",
+                f"{metrica}_duracao_segundos_count{{{rotulos}}} {acumulado}",
+            ]
+        for campo, explicacao in (
+            ("queries", "Queries executadas pelas"),
+            ("linhas", "Linhas lidas do banco pelas"),
+        ):
+            linhas += [
+                f"# HELP {metrica}_{campo}_total {explicacao} {descricao}",
+                f"# TYPE {metrica}_{campo}_total counter",
+                *(
+                    f'{metrica}_{campo}_total{{{rotulo}="{_escapar(nome)}"}} '
+                    f"{getattr(serie, campo)}"
+                    for nome, serie in do_tipo
+                ),
+            ]
+    return "\n".join(linhas) + "\n"
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
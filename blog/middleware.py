@@ -0,0 +1,170 @@
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .detector_n1 import detectar_n_mais_1
+from .metricas import medir
+from .perfilador import em_andamento, perfilar, token_valido
+from .roteador_banco import replicas_configuradas, sessao_de_leitura
+
+COOKIE_LER_DO_PRIMARIO = "blog_ler_do_primario"
+
+VIEW_SEM_ROTA = "sem_rota"
+
+
+class DetectorNMais1Middleware:
+    # Desenvolvimento: avisa, loga ou falha (BLOG_N1_ACAO) quando uma query
+    # se repete mais de BLOG_N1_LIMITE vezes no mesmo request
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.BLOG_N1_ACAO:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self._async = iscoroutinefunction(get_response)
+        if self._async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self._async:
+            return self.__acall__(request)
+        with detectar_n_mais_1():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with detectar_n_mais_1():
+            return await self.get_response(request)
+
+
+class MetricasMiddleware:
+    # Latência, queries e linhas lidas por view, com o nome da rota
+    # (blog:artigo_list); requests sem rota ficam numa série só
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._async = iscoroutinefunction(get_response)
+        if self._async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self._async:
+            return self.__acall__(request)
+        with medir("view", VIEW_SEM_ROTA) as medicao:
+            try:
+                return self.get_response(request)
+            finally:
+                medicao.nome = self._nome_da_view(request)
+
+    async def __acall__(self, request):
+        with medir("view", VIEW_SEM_ROTA) as medicao:
+            try:
+                return await self.get_response(request)
+            finally:
+                medicao.nome = self._nome_da_view(request)
+
+    @staticmethod
+    def _nome_da_view(request) -> str:
+        rota = getattr(request, "resolver_match", None)
+        return rota.view_name if rota is not None else VIEW_SEM_ROTA
+
+
+class PerfilAmostradoMiddleware:
+    # Perfila BLOG_PERFIL_AMOSTRAGEM dos requests, e os que trazem o cabeçalho
+    # BLOG_PERFIL_CABECALHO com um token de manage.py token_perfil. Os outros
+    # pagam um random(), uma consulta ao META e a contagem dos requests em
+    # andamento. O cProfile vê todas as threads do processo: com requests
+    # simultâneos (servidor com threads, ASGI), o relatório diz quantos se
+    # misturaram ao perfil
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.taxa = settings.BLOG_PERFIL_AMOSTRAGEM
+        self.chave_cabecalho = "HTTP_" + settings.BLOG_PERFIL_CABECALHO.upper().replace(
+            "-", "_"
+        )
+        self._async = iscoroutinefunction(get_response)
+        if self._async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self._async:
+            return self.__acall__(request)
+        with em_andamento():
+            motivo = self._motivo(request)
+            if motivo is None:
+                return self.get_response(request)
+            with perfilar(request.method, request.path, motivo) as amostra:
+                response = self.get_response(request)
+                if amostra is not None:
+                    amostra.status = response.status_code
+            return response
+
+    async def __acall__(self, request):
+        with em_andamento():
+            motivo = self._motivo(request)
+            if motivo is None:
+                return await self.get_response(request)
+            with perfilar(request.method, request.path, motivo) as amostra:
+                response = await self.get_response(request)
+                if amostra is not None:
+                    amostra.status = response.status_code
+            return response
+
+    def _motivo(self, request) -> str | None:
+        token = request.META.get(self.chave_cabecalho)
+        if token is not None and token_valido(token):
+            return "cabecalho"
+        if self.taxa and random.random() < self.taxa:
+            return "amostragem"
+        return None
+
+
+class LerPropriasEscritasMiddleware:
+    # Depois de uma escrita, o navegador lê do primário por
+    # BLOG_JANELA_LEITURA_PRIMARIO segundos: as réplicas podem ainda não ter
+    # recebido o que o usuário acabou de gravar. A janela é a validade do cookie
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replicas_configuradas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self._async = iscoroutinefunction(get_response)
+        if self._async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self._async:
+            return self.__acall__(request)
+        with sessao_de_leitura(self._na_janela(request)) as sessao:
+            response = self.get_response(request)
+        return self._marcar(response, sessao)
+
+    async def __acall__(self, request):
+        with sessao_de_leitura(self._na_janela(request)) as sessao:
+            response = await self.get_response(request)
+        return self._marcar(response, sessao)
+
+    @staticmethod
+    def _na_janela(request) -> bool:
+        return COOKIE_LER_DO_PRIMARIO in request.COOKIES
+
+    @staticmethod
+    def _marcar(response, sessao):
+        if sessao.escreveu:
+            response.set_cookie(
+                COOKIE_LER_DO_PRIMARIO,
+                "1",
+                max_age=settings.BLOG_JANELA_LEITURA_PRIMARIO,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
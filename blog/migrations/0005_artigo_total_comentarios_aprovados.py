@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:01
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def preencher_total_comentarios_aprovados(apps, schema_editor):
+    Artigo = apps.get_model("blog", "Artigo")
+    Comentario = apps.get_model("blog", "Comentario")
+    contagem = (
+        Comentario.objects.filter(artigo=OuterRef("pk"), aprovado=True)
+        .order_by()
+        .values("artigo")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    Artigo.objects.update(total_comentarios_aprovados=Coalesce(Subquery(contagem), 0))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0004_tag_artigo_tags"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="artigo",
+            name="total_comentarios_aprovados",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Comentários Aprovados"
+            ),
+        ),
+        migrations.RunPython(
+            preencher_total_comentarios_aprovados, migrations.RunPython.noop
+        ),
+    ]
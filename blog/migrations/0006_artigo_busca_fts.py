@@ -0,0 +1,99 @@
+import hashlib
+import html
+import re
+from collections import defaultdict
+
+from django.db import migrations
+from django.utils.html import strip_tags
+
+CRIAR_TABELA_BUSCA = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS blog_artigo_busca USING fts5(
+        artigo_id UNINDEXED,
+        titulo,
+        resumo,
+        conteudo,
+        tags,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+"""
+
+TAMANHO_LOTE = 500
+
+
+def criar_tabela_busca(apps, schema_editor):
+    # FTS5 é específico do SQLite; em outros bancos a busca fica desligada
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(CRIAR_TABELA_BUSCA)
+        preencher_tabela_busca(apps, schema_editor)
+
+
+def preencher_tabela_busca(apps, schema_editor):
+    # Indexa os artigos que já existem: a busca do admin passa a usar o índice
+    # assim que a migration roda. Só modelos históricos e código congelado
+    # aqui; mudanças no busca_service não alteram o que esta migration faz
+    Artigo = apps.get_model("blog", "Artigo")
+    banco = schema_editor.connection.alias
+    ultimo_id = None
+    while True:
+        lote_qs = Artigo.objects.using(banco).order_by("pk")
+        if ultimo_id is not None:
+            lote_qs = lote_qs.filter(pk__gt=ultimo_id)
+        linhas = list(
+            lote_qs.values_list("pk", "titulo", "resumo", "conteudo")[:TAMANHO_LOTE]
+        )
+        if not linhas:
+            return
+
+        tags_por_artigo = defaultdict(list)
+        for artigo_id, nome in (
+            Artigo.tags.through.objects.using(banco)
+            .filter(artigo_id__in=[linha[0] for linha in linhas])
+            .values_list("artigo_id", "tag__nome")
+        ):
+            tags_por_artigo[artigo_id].append(nome)
+
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO blog_artigo_busca "
+                "(rowid, artigo_id, titulo, resumo, conteudo, tags) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                [
+                    (
+                        _rowid(artigo_id),
+                        artigo_id.hex,
+                        titulo,
+                        _texto_puro(resumo),
+                        _texto_puro(conteudo),
+                        " ".join(tags_por_artigo[artigo_id]),
+                    )
+                    for artigo_id, titulo, resumo, conteudo in linhas
+                ],
+            )
+        ultimo_id = linhas[-1][0]
+
+
+def _rowid(artigo_id):
+    # O mesmo rowid de busca_service._rowid, que os sinais usam para
+    # atualizar e apagar a linha de um artigo
+    resumo = hashlib.blake2b(artigo_id.bytes, digest_size=8).digest()
+    return int.from_bytes(resumo, "big") >> 1
+
+
+def _texto_puro(conteudo_html):
+    texto = html.unescape(strip_tags(conteudo_html or ""))
+    return re.sub(r"\s+", " ", texto).strip()
+
+
+def remover_tabela_busca(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS blog_artigo_busca")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0005_artigo_total_comentarios_aprovados"),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_tabela_busca, remover_tabela_busca),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0006_artigo_busca_fts"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comentario",
+            index=models.Index(
+                fields=["artigo", "aprovado", "data_criacao", "id"],
+                name="comentario_pagina_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:45
+
+from django.db import migrations, models
+
+import blog.identificadores
+
+
+def _id_uuid7(model_name):
+    return migrations.AlterField(
+        model_name=model_name,
+        name="id",
+        field=models.UUIDField(
+            default=blog.identificadores.uuid7,
+            editable=False,
+            primary_key=True,
+            serialize=False,
+            verbose_name="ID",
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+    # O default é calculado no Python: nada muda no banco. Só o estado das
+    # migrations é alterado, porque no SQLite o AlterField recriaria as
+    # tabelas inteiras. Linhas existentes mantêm os ids uuid4; as novas
+    # recebem uuid7
+    dependencies = [
+        ("blog", "0008_comentario_data_idx"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                _id_uuid7("artigo"),
+                _id_uuid7("comentario"),
+                _id_uuid7("tag"),
+            ],
+        ),
+    ]
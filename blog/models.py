@@ -1,15 +1,15 @@
-import uuid
-
 from ckeditor.fields import RichTextField
 from django.contrib.auth.models import User
 from django.db import models
 from django.utils import timezone
 from django.utils.text import slugify
 
+from .identificadores import uuid7
+
 
 class Tag(models.Model):
     id = models.UUIDField(
-        primary_key=True, default=uuid.uuid4, editable=False, verbose_name="ID"
+        primary_key=True, default=uuid7, editable=False, verbose_name="ID"
     )
     nome = models.CharField(
         max_length=50, unique=True, blank=False, verbose_name="Nome"
@@ -34,7 +34,7 @@ class Tag(models.Model):
 
 class Artigo(models.Model):
     id = models.UUIDField(
-        primary_key=True, default=uuid.uuid4, editable=False, verbose_name="ID"
+        primary_key=True, default=uuid7, editable=False, verbose_name="ID"
     )
     titulo = models.CharField(max_length=200, verbose_name="Título")
     slug = models.SlugField(
@@ -63,6 +63,10 @@ class Artigo(models.Model):
     tags = models.ManyToManyField(
         Tag, related_name="artigos", blank=True, verbose_name="Tags"
     )
+    # Mantido pelos sinais de Comentario com F(); ver blog/signals.py
+    total_comentarios_aprovados = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Comentários Aprovados"
+    )
 
     class Meta:
         verbose_name = "Artigo"
@@ -71,15 +75,34 @@ class Artigo(models.Model):
     def __str__(self):
         return self.titulo
 
+    def save(self, *args, **kwargs):
+        # Uma instância carregada antes de um comentário ser aprovado não pode
+        # sobrescrever o contador com o valor antigo
+        if (
+            not self._state.adding
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            deferidos = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                campo.name
+                for campo in self._meta.concrete_fields
+                if not campo.primary_key
+                and campo.name != "total_comentarios_aprovados"
+                and campo.attname not in deferidos
+            ]
+        super().save(*args, **kwargs)
+
     def publicar(self):
         self.publicado = True
         self.data_publicacao = timezone.now()
-        self.save()
+        # Só as colunas que mudam; em lote, ver moderacao_service
+        self.save(update_fields=["publicado", "data_publicacao", "data_atualizacao"])
 
 
 class Comentario(models.Model):
     id = models.UUIDField(
-        primary_key=True, default=uuid.uuid4, editable=False, verbose_name="ID"
+        primary_key=True, default=uuid7, editable=False, verbose_name="ID"
     )
     artigo = models.ForeignKey(
         Artigo,
@@ -105,6 +128,27 @@ class Comentario(models.Model):
         verbose_name = "Comentário"
         verbose_name_plural = "Comentários"
         ordering = ["-data_criacao"]
+        indexes = [
+            # Paginação por keyset dos comentários aprovados de um artigo
+            models.Index(
+                fields=["artigo", "aprovado", "data_criacao", "id"],
+                name="comentario_pagina_idx",
+            ),
+            # Ordenação padrão do changelist do admin (-data_criacao, -id)
+            models.Index(fields=["data_criacao", "id"], name="comentario_data_idx"),
+        ]
 
     def __str__(self):
         return f"Comentário de {self.autor.username} em {self.artigo.titulo}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._guardar_estado_original()
+        return instance
+
+    def _guardar_estado_original(self):
+        # Estado do banco usado pelos sinais para saber se a aprovação mudou
+        # sem precisar de uma query extra em cada save()
+        if "aprovado" in self.__dict__ and "artigo_id" in self.__dict__:
+            self._estado_original = (self.artigo_id, self.aprovado)
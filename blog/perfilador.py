@@ -0,0 +1,221 @@
+import cProfile
+import io
+import json
+import logging
+import pstats
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+
+from .arquivos import gravar_atomico
+from .identificadores import uuid7
+
+logger = logging.getLogger(__name__)
+
+SALT_TOKEN = "blog.perfilador"
+
+VALOR_TOKEN = "perfilar"
+
+# Relatórios esperando o gravador; com a fila cheia a amostra é descartada em
+# vez de atrasar o request
+TAMANHO_FILA = 64
+
+
+@dataclass(slots=True)
+class QueryAmostrada:
+    banco: str
+    sql: str
+    inicio_ms: float
+    duracao_ms: float
+
+
+@dataclass(slots=True)
+class Amostra:
+    metodo: str
+    caminho: str
+    motivo: str
+    momento: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    inicio: float = field(default_factory=time.perf_counter)
+    queries: list[QueryAmostrada] = field(default_factory=list)
+    status: int | None = None
+    duracao_ms: float = 0.0
+    # Outros requests do processo que rodaram durante a amostra: os frames
+    # deles também estão no perfil
+    requests_simultaneos: int = 0
+
+
+# A amostra do request atual: o contexto acompanha o request até as threads
+# do sync_to_async, então as queries do ORM async também são registradas
+_amostra_atual: ContextVar[Amostra | None] = ContextVar(
+    "blog_amostra_atual", default=None
+)
+
+# Desde o Python 3.12 o cProfile usa o sys.monitoring, que vale para o
+# processo inteiro: o perfil registra as chamadas de todas as threads, e só
+# um pode estar ativo por vez. Um segundo request sorteado enquanto outro é
+# perfilado passa sem amostra
+_perfilando = threading.Lock()
+_amostra_perfilada: Amostra | None = None
+
+# Requests em andamento no processo, contados pelo PerfilAmostradoMiddleware:
+# o relatório diz quantos se misturaram ao perfil (nenhum num worker sync do
+# gunicorn; sob um servidor com threads ou ASGI, os concorrentes)
+_em_andamento = 0
+_trava_em_andamento = threading.Lock()
+
+
+def gerar_token() -> str:
+    return signing.TimestampSigner(salt=SALT_TOKEN).sign(VALOR_TOKEN)
+
+
+def token_valido(token: str) -> bool:
+    try:
+        valor = signing.TimestampSigner(salt=SALT_TOKEN).unsign(
+            token, max_age=settings.BLOG_PERFIL_VALIDADE_TOKEN
+        )
+    except signing.BadSignature:
+        return False
+    return valor == VALOR_TOKEN
+
+
+def registrar_query(execute, sql, params, many, context):
+    # Instalado em toda conexão (blog/signals.py); sem amostra ativa custa
+    # uma leitura de ContextVar por query
+    amostra = _amostra_atual.get()
+    if amostra is None:
+        return execute(sql, params, many, context)
+
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        amostra.queries.append(
+            QueryAmostrada(
+                banco=context["connection"].alias,
+                sql=sql,
+                inicio_ms=(inicio - amostra.inicio) * 1000,
+                duracao_ms=(time.perf_counter() - inicio) * 1000,
+            )
+        )
+
+
+class em_andamento:
+    # Classe em vez de @contextmanager, como o medir das métricas: roda em
+    # todo request
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        global _em_andamento
+        with _trava_em_andamento:
+            _em_andamento += 1
+            if _amostra_perfilada is not None:
+                _amostra_perfilada.requests_simultaneos += 1
+
+    def __exit__(self, *excecao) -> None:
+        global _em_andamento
+        with _trava_em_andamento:
+            _em_andamento -= 1
+
+
+@contextmanager
+def perfilar(metodo: str, caminho: str, motivo: str):
+    global _amostra_perfilada
+    if not _perfilando.acquire(blocking=False):
+        yield None
+        return
+
+    amostra = Amostra(metodo=metodo, caminho=caminho, motivo=motivo)
+    with _trava_em_andamento:
+        # O próprio request já foi contado
+        amostra.requests_simultaneos = max(_em_andamento - 1, 0)
+        _amostra_perfilada = amostra
+    contexto = _amostra_atual.set(amostra)
+    perfil = cProfile.Profile()
+    perfil.enable()
+    try:
+        yield amostra
+    finally:
+        perfil.disable()
+        with _trava_em_andamento:
+            _amostra_perfilada = None
+        _amostra_atual.reset(contexto)
+        _perfilando.release()
+        amostra.duracao_ms = (time.perf_counter() - amostra.inicio) * 1000
+        gravador.enfileirar(amostra, perfil)
+
+
+class GravadorDeRelatorios:
+    # Uma thread em segundo plano formata o pstats e grava os relatórios: o
+    # request sorteado só paga a coleta
+    def __init__(self):
+        self._fila: queue.Queue = queue.Queue(maxsize=TAMANHO_FILA)
+        self._thread: threading.Thread | None = None
+        self._trava = threading.Lock()
+        self.descartados = 0
+
+    def enfileirar(self, amostra: Amostra, perfil: cProfile.Profile) -> None:
+        self._iniciar()
+        try:
+            self._fila.put_nowait((amostra, perfil))
+        except queue.Full:
+            self.descartados += 1
+
+    def esvaziar(self) -> None:
+        self._fila.join()
+
+    def _iniciar(self) -> None:
+        if self._thread is not None:
+            return
+        with self._trava:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._executar, name="blog-perfilador", daemon=True
+                )
+                self._thread.start()
+
+    def _executar(self) -> None:
+        while True:
+            amostra, perfil = self._fila.get()
+            try:
+                gravar_relatorio(amostra, perfil)
+            except Exception:
+                logger.exception("Falha ao gravar o relatório de %s", amostra.caminho)
+            finally:
+                self._fila.task_done()
+
+
+gravador = GravadorDeRelatorios()
+
+
+def gravar_relatorio(amostra: Amostra, perfil: cProfile.Profile) -> Path:
+    saida = io.StringIO()
+    pstats.Stats(perfil, stream=saida).sort_stats("cumulative").print_stats(
+        settings.BLOG_PERFIL_LINHAS
+    )
+    dados = asdict(amostra)
+    dados.pop("inicio")
+    relatorio = {
+        **dados,
+        "momento": amostra.momento.isoformat(),
+        "total_queries": len(amostra.queries),
+        "tempo_sql_ms": sum(query.duracao_ms for query in amostra.queries),
+        "perfil": saida.getvalue(),
+    }
+
+    # Nomes uuid7 ordenam por data: o anel descarta os mais antigos
+    diretorio = Path(settings.BLOG_PERFIL_DIRETORIO)
+    caminho = diretorio / f"{uuid7()}.json"
+    gravar_atomico(caminho, json.dumps(relatorio, indent=2).encode())
+    for antigo in sorted(diretorio.glob("*.json"))[
+        : -settings.BLOG_PERFIL_MAXIMO_RELATORIOS
+    ]:
+        antigo.unlink(missing_ok=True)
+    return caminho
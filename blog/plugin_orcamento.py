@@ -0,0 +1,147 @@
+"""Plugin pytest que verifica os orçamentos de queries declarados com
+``@orcamento_queries`` em ``blog.services``.
+
+Cada função registrada é executada com dados em dois tamanhos: a contagem de
+queries não pode passar do orçamento nem crescer com o volume de dados.
+"""
+
+import importlib
+import inspect
+import math
+import pkgutil
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import blog.services
+from blog.models import Artigo, Comentario, Tag
+from blog.services.orcamento import ORCAMENTOS, OrcamentoQueries
+
+TAMANHOS = (2, 6)
+
+# Valor passado ao parâmetro cresce_com: pequeno para que haja vários lotes
+TAMANHO_LOTE = 2
+
+
+def pytest_generate_tests(metafunc):
+    if "orcamento" not in metafunc.fixturenames:
+        return
+    # Importa todos os módulos de serviço para que os decorators registrem
+    # as funções, inclusive as que nenhum teste importa
+    for modulo in pkgutil.iter_modules(blog.services.__path__):
+        importlib.import_module(f"blog.services.{modulo.name}")
+    orcamentos = sorted(ORCAMENTOS.values(), key=lambda orcamento: orcamento.nome)
+    metafunc.parametrize(
+        "orcamento", orcamentos, ids=[orcamento.nome for orcamento in orcamentos]
+    )
+
+
+@pytest.fixture
+def medir_orcamento(db):
+    def _medir(orcamento: OrcamentoQueries, tamanho: int) -> list[str]:
+        _limpar_dados()
+        argumentos = _semear(tamanho)
+        kwargs = _argumentos_da_chamada(orcamento, argumentos)
+        with CaptureQueriesContext(connection) as contexto:
+            funcao = orcamento.funcao
+            if inspect.isasyncgenfunction(funcao):
+                async_to_sync(_consumir)(funcao(**kwargs))
+            else:
+                if inspect.iscoroutinefunction(funcao):
+                    # async_to_sync roda o ORM na thread do teste: mesma
+                    # conexão e mesma transação, então as queries são
+                    # capturadas
+                    funcao = async_to_sync(funcao)
+                resultado = funcao(**kwargs)
+                if inspect.isgenerator(resultado):
+                    list(resultado)
+        return [query["sql"] for query in contexto.captured_queries]
+
+    return _medir
+
+
+async def _consumir(gerador) -> list:
+    return [item async for item in gerador]
+
+
+def limite_de_queries(orcamento: OrcamentoQueries, tamanho: int) -> int:
+    if orcamento.cresce_com is None:
+        return orcamento.maximo
+    return orcamento.maximo * math.ceil(tamanho / TAMANHO_LOTE)
+
+
+def relatorio_de_queries(queries: list[str]) -> str:
+    return "\n".join(f"  {indice}. {sql}" for indice, sql in enumerate(queries, 1))
+
+
+def _semear(tamanho: int) -> dict[str, object]:
+    # tamanho artigos publicados, cada um com tamanho tags e tamanho
+    # comentários aprovados de autores diferentes: um N+1 em qualquer relação
+    # aparece como queries a mais no tamanho maior
+    autores = [
+        User.objects.create(username=f"orcamento-{indice}", first_name="Autor")
+        for indice in range(tamanho)
+    ]
+    tags = [
+        Tag.objects.create(nome=f"Orçamento {indice}", slug=f"orcamento-{indice}")
+        for indice in range(tamanho)
+    ]
+    artigos = []
+    for indice, autor in enumerate(autores):
+        artigo = Artigo.objects.create(
+            titulo=f"Artigo {indice}",
+            slug=f"orcamento-{indice}",
+            autor=autor,
+            conteudo="<p>Conteúdo</p>",
+            resumo="<p>Resumo</p>",
+            publicado=True,
+        )
+        artigo.tags.add(*tags)
+        for comentarista in autores:
+            Comentario.objects.create(
+                artigo=artigo, autor=comentarista, texto="<p>Oi</p>", aprovado=True
+            )
+        artigos.append(artigo)
+    Artigo.objects.create(
+        titulo="Rascunho",
+        slug="orcamento-rascunho",
+        autor=autores[0],
+        conteudo="<p>Conteúdo</p>",
+        publicado=False,
+    )
+    publicados = Artigo.objects.filter(publicado=True)
+    return {
+        "slug": artigos[0].slug,
+        # Um registro por artigo, para o trabalho crescer com tamanho
+        "artigos": publicados,
+        "comentarios": Comentario.objects.filter(
+            pk__in=[artigo.comentarios.first().pk for artigo in artigos]
+        ),
+    }
+
+
+def _limpar_dados():
+    Comentario.objects.all().delete()
+    Artigo.objects.all().delete()
+    Tag.objects.all().delete()
+    User.objects.all().delete()
+
+
+def _argumentos_da_chamada(
+    orcamento: OrcamentoQueries, disponiveis: dict[str, object]
+) -> dict[str, object]:
+    kwargs = {}
+    for nome, parametro in inspect.signature(orcamento.funcao).parameters.items():
+        if nome == orcamento.cresce_com:
+            kwargs[nome] = TAMANHO_LOTE
+        elif nome in disponiveis:
+            kwargs[nome] = disponiveis[nome]
+        elif parametro.default is inspect.Parameter.empty:
+            pytest.fail(
+                f"{orcamento.nome}: o plugin não sabe preencher o parâmetro "
+                f"obrigatório '{nome}'"
+            )
+    return kwargs
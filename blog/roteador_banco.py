@@ -0,0 +1,97 @@
+import random
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PRIMARIO = DEFAULT_DB_ALIAS
+
+
+@dataclass
+class _SessaoLeitura:
+    # Estado de uma request: mutável para que a escrita registrada pelo
+    # roteador chegue ao middleware mesmo de dentro do sync_to_async
+    primario: bool = False
+    escreveu: bool = False
+    replica: str | None = None
+
+
+_sessao: ContextVar[_SessaoLeitura | None] = ContextVar(
+    "blog_sessao_leitura", default=None
+)
+_primario_forcado: ContextVar[bool] = ContextVar("blog_primario_forcado", default=False)
+
+
+def replicas_configuradas() -> list[str]:
+    return getattr(settings, "BLOG_REPLICAS_LEITURA", [])
+
+
+def banco_leitura() -> str:
+    # Banco das leituras da camada de serviço. Só os serviços pedem réplica,
+    # com .using(banco_leitura()); o resto do projeto (admin incluído) lê do
+    # primário
+    replicas = replicas_configuradas()
+    if not replicas or _primario_forcado.get():
+        return PRIMARIO
+    # Dentro de uma transação do primário a leitura precisa ver as próprias
+    # escritas ainda não confirmadas
+    if connections[PRIMARIO].in_atomic_block:
+        return PRIMARIO
+
+    sessao = _sessao.get()
+    if sessao is None:
+        return random.choice(replicas)
+    if sessao.primario or sessao.escreveu:
+        return PRIMARIO
+    # Uma réplica por request: as queries da página veem o mesmo atraso
+    if sessao.replica is None:
+        sessao.replica = random.choice(replicas)
+    return sessao.replica
+
+
+@contextmanager
+def ler_do_primario() -> Iterator[None]:
+    token = _primario_forcado.set(True)
+    try:
+        yield
+    finally:
+        _primario_forcado.reset(token)
+
+
+@contextmanager
+def sessao_de_leitura(primario: bool = False) -> Iterator[_SessaoLeitura]:
+    sessao = _SessaoLeitura(primario=primario)
+    token = _sessao.set(sessao)
+    try:
+        yield sessao
+    finally:
+        _sessao.reset(token)
+
+
+class RoteadorReplicas:
+    def db_for_read(self, model, **hints):
+        # Sem opinião: o Django usa o banco da instância relacionada (uma
+        # réplica, se ela veio de uma) ou o primário
+        return None
+
+    def db_for_write(self, model, **hints):
+        sessao = _sessao.get()
+        if sessao is not None:
+            sessao.escreveu = True
+        # Também para instâncias lidas de uma réplica
+        return PRIMARIO
+
+    def allow_relation(self, obj1, obj2, **hints):
+        bancos = {PRIMARIO, *replicas_configuradas()}
+        if obj1._state.db in bancos and obj2._state.db in bancos:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Réplicas são cópias do primário (manage.py sincronizar_replicas)
+        if db in replicas_configuradas():
+            return False
+        return None
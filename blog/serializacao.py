@@ -0,0 +1,98 @@
+import dataclasses
+import types
+import typing
+from collections.abc import Callable, Iterable, Mapping
+from datetime import datetime
+from functools import lru_cache
+from json.encoder import encode_basestring
+from uuid import UUID
+
+Codificador = Callable[[typing.Any], str]
+
+
+class CampoDesconhecido(ValueError):
+    pass
+
+
+def codificador(
+    tipo: type,
+    campos: Iterable[str] | None = None,
+    aninhados: Mapping[str, Iterable[str]] | None = None,
+) -> Codificador:
+    # Um codificador JSON por classe de DTO (e seleção de campos), montado uma
+    # vez a partir das anotações: nada de asdict(), que copia o objeto
+    # inteiro, nem de checar o tipo de cada valor na hora de codificar.
+    # aninhados seleciona os campos dos DTOs dentro de um campo (ex.: os
+    # artigos de uma página)
+    return _compilar(
+        tipo,
+        None if campos is None else frozenset(campos),
+        frozenset(
+            (nome, frozenset(subcampos))
+            for nome, subcampos in (aninhados or {}).items()
+        ),
+    )
+
+
+@lru_cache(maxsize=None)
+def _compilar(
+    tipo: type,
+    campos: frozenset[str] | None,
+    aninhados: frozenset[tuple[str, frozenset[str]]] = frozenset(),
+) -> Codificador:
+    nomes = [campo.name for campo in dataclasses.fields(tipo)]
+    selecao_aninhada = dict(aninhados)
+    desconhecidos = ((campos or set()) | selecao_aninhada.keys()) - set(nomes)
+    if desconhecidos:
+        raise CampoDesconhecido(", ".join(sorted(desconhecidos)))
+    if campos is not None:
+        nomes = [nome for nome in nomes if nome in campos]
+
+    anotacoes = typing.get_type_hints(tipo)
+    # Código gerado como o dos próprios dataclasses: uma única expressão de
+    # concatenação, com as chaves já escritas em JSON
+    ambiente = {}
+    partes = []
+    for indice, nome in enumerate(nomes):
+        ambiente[f"_c{indice}"] = _codificador_do_tipo(
+            anotacoes[nome], selecao_aninhada.get(nome)
+        )
+        chave = encode_basestring(nome)
+        separador = "{" if indice == 0 else ","
+        partes.append(f"{separador!r} + {chave + ':'!r} + _c{indice}(obj.{nome})")
+    corpo = " + ".join(partes) + " + '}'" if partes else "'{}'"
+    exec(f"def codificar(obj):\n    return {corpo}\n", ambiente)
+    codificar = ambiente["codificar"]
+    codificar.__qualname__ = f"codificador({tipo.__name__})"
+    return codificar
+
+
+def _codificador_do_tipo(anotacao, campos: frozenset[str] | None = None) -> Codificador:
+    origem = typing.get_origin(anotacao)
+    argumentos = typing.get_args(anotacao)
+
+    if origem in (typing.Union, types.UnionType):
+        # Só Optional[X]: X | None
+        (interno,) = [
+            argumento for argumento in argumentos if argumento is not type(None)
+        ]
+        codificar_interno = _codificador_do_tipo(interno, campos)
+        return lambda valor: "null" if valor is None else codificar_interno(valor)
+    if origem is list:
+        codificar_item = _codificador_do_tipo(argumentos[0], campos)
+        return lambda valores: "[" + ",".join(map(codificar_item, valores)) + "]"
+    if dataclasses.is_dataclass(anotacao):
+        return _compilar(anotacao, campos)
+    if campos is not None:
+        raise CampoDesconhecido(f"{anotacao.__name__} não tem campos")
+    if anotacao is str:
+        return encode_basestring
+    if anotacao is bool:
+        return lambda valor: "true" if valor else "false"
+    if anotacao in (int, float):
+        return repr
+    if anotacao is datetime:
+        return lambda valor: '"' + valor.isoformat() + '"'
+    if anotacao is UUID:
+        return lambda valor: '"' + str(valor) + '"'
+    raise TypeError(f"Sem codificador JSON para {anotacao!r}")
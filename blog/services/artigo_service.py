@@ -1,60 +1,342 @@
-from django.db.models import Prefetch
+import hashlib
+import uuid
+from collections import defaultdict
+from collections.abc import AsyncIterator, Iterator
+from datetime import datetime
 
-from blog.dto import ArtigoDTO, ArtigoListDTO, AutorDTO, ComentarioDTO, TagDTO
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, Prefetch, Q, QuerySet
+from django.utils import timezone
+
+from blog.dto import (
+    ArtigoDTO,
+    ArtigoListDTO,
+    AutorDTO,
+    ComentarioDTO,
+    PaginaArtigosDTO,
+    PaginaComentariosDTO,
+    TagDTO,
+    ValidadoresDTO,
+)
+from blog.metricas import medido
 from blog.models import Artigo, Comentario, Tag
+from blog.roteador_banco import banco_leitura
+from blog.services.cursor import (
+    CursorInvalido,
+    codificar_cursor,
+    decodificar_cursor,
+    ler_data,
+)
+from blog.services.orcamento import orcamento_queries
+
+TAMANHO_PAGINA_ARTIGOS = 20
+TAMANHO_LOTE_STREAMING = 200
+TAMANHO_PAGINA_COMENTARIOS = 20
+
+# Despublicar ou apagar um artigo não aumenta o max(data_atualizacao) dos que
+# continuam publicados: o momento da última saída da lista fica no cache
+# padrão (compartilhado pelos workers) e entra no Last-Modified
+CHAVE_SAIDA_DA_LISTA = "blog:lista_artigos:ultima_saida"
 
+_AGREGADOS_DA_LISTA = {
+    "ultima_atualizacao": Max("data_atualizacao"),
+    "total": Count("id"),
+}
 
+
+@orcamento_queries(maximo=2)
+@medido
 def obter_lista_artigos_dto() -> list[ArtigoListDTO]:
-    artigos_qs = (
-        Artigo.objects.filter(publicado=True)
-        .only(
+    compartilhados = _DTOsCompartilhados()
+    return [
+        _construir_artigo_list_dto(artigo, compartilhados)
+        for artigo in _artigos_publicados_qs()
+    ]
+
+
+@orcamento_queries(maximo=2)
+@medido
+async def aobter_lista_artigos_dto() -> list[ArtigoListDTO]:
+    compartilhados = _DTOsCompartilhados()
+    return [
+        _construir_artigo_list_dto(artigo, compartilhados)
+        async for artigo in _artigos_publicados_qs()
+    ]
+
+
+@orcamento_queries(maximo=2)
+@medido
+def obter_lista_artigos_dto_por_valores() -> list[ArtigoListDTO]:
+    # Mesmo resultado de obter_lista_artigos_dto, lendo tuplas com values_list:
+    # nenhuma instância de Artigo, User ou Tag é criada, só os DTOs
+    artigos_qs = _artigos_publicados_qs()
+    linhas = list(
+        artigos_qs.prefetch_related(None).values_list(
             "id",
             "titulo",
             "slug",
             "resumo",
             "data_publicacao",
             "data_criacao",
-            "autor_id",
+            "data_atualizacao",
+            "total_comentarios_aprovados",
             "autor__username",
             "autor__first_name",
             "autor__last_name",
         )
-        .select_related("autor")
-        .prefetch_related(
-            Prefetch(
-                "tags",
-                queryset=Tag.objects.only("id", "nome"),
-            )
-        )
-        .order_by("-data_publicacao", "-data_criacao")
     )
+    if not linhas:
+        return []
+
+    compartilhados = _DTOsCompartilhados()
+    tags_por_artigo: dict[uuid.UUID, list[TagDTO]] = defaultdict(list)
+    for artigo_id, nome in (
+        Artigo.tags.through.objects.using(artigos_qs.db)
+        .filter(artigo_id__in=[linha[0] for linha in linhas])
+        .order_by("tag__nome")
+        .values_list("artigo_id", "tag__nome")
+    ):
+        tags_por_artigo[artigo_id].append(compartilhados.tag(nome))
 
     return [
         ArtigoListDTO(
-            titulo=artigo.titulo,
-            slug=artigo.slug,
-            resumo=artigo.resumo,
-            data_publicacao=artigo.data_publicacao,
-            data_criacao=artigo.data_criacao,
-            autor=AutorDTO(
-                username=artigo.autor.username,
-                first_name=artigo.autor.first_name,
-                last_name=artigo.autor.last_name,
-            ),
-            tags=[TagDTO(nome=tag.nome) for tag in artigo.tags.all()],
+            titulo=titulo,
+            slug=slug,
+            resumo=resumo,
+            data_publicacao=data_publicacao,
+            data_criacao=data_criacao,
+            autor=compartilhados.autor(username, first_name, last_name),
+            tags=tags_por_artigo.get(artigo_id, []),
+            id=artigo_id,
+            data_atualizacao=data_atualizacao,
+            total_comentarios=total_comentarios,
         )
-        for artigo in artigos_qs
+        for (
+            artigo_id,
+            titulo,
+            slug,
+            resumo,
+            data_publicacao,
+            data_criacao,
+            data_atualizacao,
+            total_comentarios,
+            username,
+            first_name,
+            last_name,
+        ) in linhas
     ]
 
 
+@orcamento_queries(maximo=2, cresce_com="chunk_size")
+def iterar_artigos_dto(
+    chunk_size: int = TAMANHO_LOTE_STREAMING, banco: str | None = None
+) -> Iterator[ArtigoListDTO]:
+    # Lê os artigos em lotes de chunk_size; o prefetch das tags é feito lote a
+    # lote, então a memória fica limitada ao tamanho do lote. O gerador pode
+    # ser consumido depois do fim da request (streaming), fora da sessão de
+    # leitura: quem chama resolve o banco antes e o passa em banco
+    artigos_qs = _artigos_publicados_qs()
+    if banco is not None:
+        artigos_qs = artigos_qs.using(banco)
+    compartilhados = _DTOsCompartilhados()
+    for artigo in artigos_qs.iterator(chunk_size=chunk_size):
+        yield _construir_artigo_list_dto(artigo, compartilhados)
+
+
+@orcamento_queries(maximo=2, cresce_com="chunk_size")
+async def aiterar_artigos_dto(
+    chunk_size: int = TAMANHO_LOTE_STREAMING, banco: str | None = None
+) -> AsyncIterator[ArtigoListDTO]:
+    # Para o streaming sob ASGI: um iterador síncrono seria consumido inteiro
+    # pelo Django (sync_to_async(list)) antes do primeiro byte sair
+    artigos_qs = _artigos_publicados_qs()
+    if banco is not None:
+        artigos_qs = artigos_qs.using(banco)
+    compartilhados = _DTOsCompartilhados()
+    async for artigo in artigos_qs.aiterator(chunk_size=chunk_size):
+        yield _construir_artigo_list_dto(artigo, compartilhados)
+
+
+@orcamento_queries(maximo=2)
+@medido
+def obter_pagina_artigos_dto(
+    cursor: str | None = None, tamanho: int = TAMANHO_PAGINA_ARTIGOS
+) -> PaginaArtigosDTO:
+    # Paginação por keyset em (data_publicacao, data_criacao, id): cada página
+    # custa as mesmas 2 queries (artigos + tags), não importa a profundidade
+    artigos_qs, direcao = _consulta_da_pagina(cursor, tamanho)
+    return _montar_pagina(list(artigos_qs[: tamanho + 1]), direcao, cursor, tamanho)
+
+
+@orcamento_queries(maximo=2)
+@medido
+async def aobter_pagina_artigos_dto(
+    cursor: str | None = None, tamanho: int = TAMANHO_PAGINA_ARTIGOS
+) -> PaginaArtigosDTO:
+    artigos_qs, direcao = _consulta_da_pagina(cursor, tamanho)
+    artigos = [artigo async for artigo in artigos_qs[: tamanho + 1]]
+    return _montar_pagina(artigos, direcao, cursor, tamanho)
+
+
+@orcamento_queries(maximo=3)
+@medido
 def obter_artigo_dto_por_slug(slug: str) -> ArtigoDTO:
-    artigo = (
-        Artigo.objects.filter(publicado=True)
+    # Artigo + tags + primeira página de comentários: o custo não depende de
+    # quantos comentários o artigo tem
+    artigo = _artigo_detalhe_qs().get(slug=slug)
+    comentarios = list(
+        _comentarios_aprovados_qs().filter(artigo=artigo)[
+            : TAMANHO_PAGINA_COMENTARIOS + 1
+        ]
+    )
+    return _construir_artigo_dto(artigo, comentarios)
+
+
+@orcamento_queries(maximo=3)
+@medido
+async def aobter_artigo_dto_por_slug(slug: str) -> ArtigoDTO:
+    artigo = await _artigo_detalhe_qs().aget(slug=slug)
+    comentarios = [
+        comentario
+        async for comentario in _comentarios_aprovados_qs().filter(artigo=artigo)[
+            : TAMANHO_PAGINA_COMENTARIOS + 1
+        ]
+    ]
+    return _construir_artigo_dto(artigo, comentarios)
+
+
+@orcamento_queries(maximo=2)
+@medido
+def obter_pagina_comentarios_dto(
+    slug: str, cursor: str | None = None, tamanho: int = TAMANHO_PAGINA_COMENTARIOS
+) -> PaginaComentariosDTO:
+    # Keyset em (data_criacao, id); a segunda query só acontece quando a
+    # página vem vazia, para distinguir "sem mais comentários" de "artigo
+    # inexistente"
+    comentarios = list(_consulta_pagina_comentarios(slug, cursor, tamanho))
+    if not comentarios and not _artigo_publicado_qs(slug).exists():
+        raise Artigo.DoesNotExist(slug)
+    return _montar_pagina_comentarios(comentarios, tamanho)
+
+
+@orcamento_queries(maximo=2)
+@medido
+async def aobter_pagina_comentarios_dto(
+    slug: str, cursor: str | None = None, tamanho: int = TAMANHO_PAGINA_COMENTARIOS
+) -> PaginaComentariosDTO:
+    comentarios = [
+        comentario
+        async for comentario in _consulta_pagina_comentarios(slug, cursor, tamanho)
+    ]
+    if not comentarios and not await _artigo_publicado_qs(slug).aexists():
+        raise Artigo.DoesNotExist(slug)
+    return _montar_pagina_comentarios(comentarios, tamanho)
+
+
+@orcamento_queries(maximo=1)
+@medido
+def obter_validadores_lista_artigos() -> ValidadoresDTO:
+    # Uma query, mais a última saída da lista no cache
+    return _validadores_da_lista(
+        Artigo.objects.using(banco_leitura())
+        .filter(publicado=True)
+        .aggregate(**_AGREGADOS_DA_LISTA),
+        _ultima_saida_da_lista(),
+    )
+
+
+@orcamento_queries(maximo=1)
+@medido
+async def aobter_validadores_lista_artigos() -> ValidadoresDTO:
+    return _validadores_da_lista(
+        await Artigo.objects.using(banco_leitura())
+        .filter(publicado=True)
+        .aaggregate(**_AGREGADOS_DA_LISTA),
+        await _aultima_saida_da_lista(),
+    )
+
+
+@orcamento_queries(maximo=1)
+@medido
+def obter_validadores_artigo(slug: str) -> ValidadoresDTO | None:
+    return _validadores_do_artigo(_validadores_artigo_qs(slug).first())
+
+
+@orcamento_queries(maximo=1)
+@medido
+async def aobter_validadores_artigo(slug: str) -> ValidadoresDTO | None:
+    return _validadores_do_artigo(await _validadores_artigo_qs(slug).afirst())
+
+
+@orcamento_queries(maximo=1)
+@medido
+def obter_validadores_artigos() -> dict[str, ValidadoresDTO]:
+    # Os validadores do detalhe de todos os artigos publicados, por slug, numa
+    # query: o export_static só renderiza de novo os que mudaram
+    return {
+        slug: _validadores_do_artigo(linha)
+        for slug, *linha in _validadores_artigos_qs().values_list(
+            "slug", *_CAMPOS_VALIDADORES
+        )
+    }
+
+
+class _DTOsCompartilhados:
+    # Os DTOs são imutáveis: dentro de uma chamada de serviço, artigos e
+    # comentários do mesmo autor (ou com a mesma tag) reusam a mesma instância
+    def __init__(self):
+        self._autores: dict[tuple[str, str, str], AutorDTO] = {}
+        self._tags: dict[str, TagDTO] = {}
+
+    def autor(self, username: str, first_name: str, last_name: str) -> AutorDTO:
+        chave = (username, first_name, last_name)
+        autor = self._autores.get(chave)
+        if autor is None:
+            autor = self._autores[chave] = AutorDTO(*chave)
+        return autor
+
+    def autor_do_usuario(self, usuario: User) -> AutorDTO:
+        return self.autor(usuario.username, usuario.first_name, usuario.last_name)
+
+    def tag(self, nome: str) -> TagDTO:
+        tag = self._tags.get(nome)
+        if tag is None:
+            tag = self._tags[nome] = TagDTO(nome=nome)
+        return tag
+
+
+def _construir_artigo_dto(artigo: Artigo, comentarios: list[Comentario]) -> ArtigoDTO:
+    compartilhados = _DTOsCompartilhados()
+    pagina = _montar_pagina_comentarios(
+        comentarios, TAMANHO_PAGINA_COMENTARIOS, compartilhados
+    )
+    return ArtigoDTO(
+        titulo=artigo.titulo,
+        conteudo=artigo.conteudo,
+        data_publicacao=artigo.data_publicacao,
+        autor=compartilhados.autor_do_usuario(artigo.autor),
+        tags=[compartilhados.tag(tag.nome) for tag in artigo.tags.all()],
+        comentarios=pagina.comentarios,
+        id=artigo.id,
+        data_atualizacao=artigo.data_atualizacao,
+        total_comentarios=artigo.total_comentarios_aprovados,
+        proximo_cursor_comentarios=pagina.proximo_cursor,
+    )
+
+
+def _artigo_detalhe_qs() -> QuerySet[Artigo]:
+    return (
+        Artigo.objects.using(banco_leitura())
+        .filter(publicado=True)
         .only(
             "id",
             "titulo",
             "conteudo",
             "data_publicacao",
+            "data_atualizacao",
+            "total_comentarios_aprovados",
             "autor_id",
             "autor__username",
             "autor__first_name",
@@ -66,50 +348,284 @@ def obter_artigo_dto_por_slug(slug: str) -> ArtigoDTO:
                 "tags",
                 queryset=Tag.objects.only("id", "nome"),
             ),
-            Prefetch(
-                "comentarios",
-                queryset=Comentario.objects.filter(aprovado=True)
-                .only(
-                    "id",
-                    "texto",
-                    "data_criacao",
-                    "artigo_id",
-                    "autor_id",
-                    "autor__username",
-                    "autor__first_name",
-                    "autor__last_name",
-                )
-                .select_related("autor")
-                .order_by("data_criacao"),
-            ),
         )
-        .get(slug=slug)
     )
 
-    return _construir_artigo_dto(artigo)
 
+def _comentarios_aprovados_qs() -> QuerySet[Comentario]:
+    # Ordem coberta pelo índice comentario_pagina_idx
+    return (
+        Comentario.objects.using(banco_leitura())
+        .filter(aprovado=True)
+        .only(
+            "id",
+            "texto",
+            "data_criacao",
+            "artigo_id",
+            "autor_id",
+            "autor__username",
+            "autor__first_name",
+            "autor__last_name",
+        )
+        .select_related("autor")
+        .order_by("data_criacao", "id")
+    )
 
-def _construir_artigo_dto(artigo: Artigo) -> ArtigoDTO:
-    return ArtigoDTO(
-        titulo=artigo.titulo,
-        conteudo=artigo.conteudo,
-        data_publicacao=artigo.data_publicacao,
-        autor=AutorDTO(
-            username=artigo.autor.username,
-            first_name=artigo.autor.first_name,
-            last_name=artigo.autor.last_name,
-        ),
-        tags=[TagDTO(nome=tag.nome) for tag in artigo.tags.all()],
+
+def _artigo_publicado_qs(slug: str) -> QuerySet[Artigo]:
+    return Artigo.objects.using(banco_leitura()).filter(publicado=True, slug=slug)
+
+
+def _consulta_pagina_comentarios(
+    slug: str, cursor: str | None, tamanho: int
+) -> QuerySet[Comentario]:
+    if tamanho < 1:
+        raise ValueError("tamanho deve ser positivo")
+
+    comentarios_qs = _comentarios_aprovados_qs().filter(
+        artigo__slug=slug, artigo__publicado=True
+    )
+    if cursor:
+        direcao, valores = decodificar_cursor(cursor, 2)
+        if direcao != "proximo":
+            raise CursorInvalido(cursor)
+        data_criacao, id = ler_data(valores[0]), _ler_uuid(valores[1])
+        comentarios_qs = comentarios_qs.filter(
+            Q(data_criacao__gt=data_criacao) | Q(data_criacao=data_criacao, id__gt=id)
+        )
+    return comentarios_qs[: tamanho + 1]
+
+
+def _montar_pagina_comentarios(
+    comentarios: list[Comentario],
+    tamanho: int,
+    compartilhados: _DTOsCompartilhados | None = None,
+) -> PaginaComentariosDTO:
+    compartilhados = compartilhados or _DTOsCompartilhados()
+    pagina = comentarios[:tamanho]
+    return PaginaComentariosDTO(
         comentarios=[
             ComentarioDTO(
                 texto=comentario.texto,
                 data_criacao=comentario.data_criacao,
-                autor=AutorDTO(
-                    username=comentario.autor.username,
-                    first_name=comentario.autor.first_name,
-                    last_name=comentario.autor.last_name,
-                ),
+                autor=compartilhados.autor_do_usuario(comentario.autor),
             )
-            for comentario in artigo.comentarios.all()
+            for comentario in pagina
+        ],
+        proximo_cursor=(
+            codificar_cursor("proximo", pagina[-1].data_criacao, str(pagina[-1].id))
+            if len(comentarios) > tamanho
+            else None
+        ),
+    )
+
+
+def registrar_saida_da_lista() -> None:
+    # Chamado pelos sinais e pela moderação em lote quando um artigo publicado
+    # é despublicado ou apagado. De novo após o commit: um request entre as
+    # duas gravações ainda leu a lista antiga
+    cache.set(CHAVE_SAIDA_DA_LISTA, timezone.now(), None)
+    if connection.in_atomic_block:
+        transaction.on_commit(
+            lambda: cache.set(CHAVE_SAIDA_DA_LISTA, timezone.now(), None)
+        )
+
+
+def _ultima_saida_da_lista() -> datetime:
+    saida = cache.get(CHAVE_SAIDA_DA_LISTA)
+    if saida is None:
+        # Nunca registrada, ou despejada do cache: agora é o valor seguro, que
+        # custa no máximo um 200 a mais, nunca um 304 de uma lista que mudou
+        saida = timezone.now()
+        if not cache.add(CHAVE_SAIDA_DA_LISTA, saida, None):
+            saida = cache.get(CHAVE_SAIDA_DA_LISTA, saida)
+    return saida
+
+
+async def _aultima_saida_da_lista() -> datetime:
+    saida = await cache.aget(CHAVE_SAIDA_DA_LISTA)
+    if saida is None:
+        saida = timezone.now()
+        if not await cache.aadd(CHAVE_SAIDA_DA_LISTA, saida, None):
+            saida = await cache.aget(CHAVE_SAIDA_DA_LISTA, saida)
+    return saida
+
+
+def _validadores_da_lista(resultado: dict, saida: datetime) -> ValidadoresDTO:
+    # A contagem entra no ETag: remover um artigo antigo não muda o
+    # max(data_atualizacao)
+    ultima_atualizacao = resultado["ultima_atualizacao"]
+    if ultima_atualizacao is None or saida > ultima_atualizacao:
+        ultima_atualizacao = saida
+    return _construir_validadores(ultima_atualizacao, resultado["total"])
+
+
+# O contador desnormalizado e data_atualizacao (que muda junto com ele e a
+# cada edição de um comentário visível) bastam: a linha do artigo sozinha,
+# sem agregar os comentários, seja quantos forem
+_CAMPOS_VALIDADORES = ("id", "data_atualizacao", "total_comentarios_aprovados")
+
+
+def _validadores_artigos_qs() -> QuerySet[Artigo]:
+    return Artigo.objects.using(banco_leitura()).filter(publicado=True)
+
+
+def _validadores_artigo_qs(slug: str) -> QuerySet:
+    return _validadores_artigos_qs().filter(slug=slug).values_list(*_CAMPOS_VALIDADORES)
+
+
+def _validadores_do_artigo(linha: tuple | None) -> ValidadoresDTO | None:
+    if linha is None:
+        return None
+
+    artigo_id, data_atualizacao, total_comentarios = linha
+    return _construir_validadores(data_atualizacao, artigo_id, total_comentarios)
+
+
+def _consulta_da_pagina(
+    cursor: str | None, tamanho: int
+) -> tuple[QuerySet[Artigo], str]:
+    if tamanho < 1:
+        raise ValueError("tamanho deve ser positivo")
+
+    artigos_qs = _artigos_publicados_qs()
+    direcao = "proximo"
+    if cursor:
+        direcao, valores = decodificar_cursor(cursor, 3)
+        chave = (
+            ler_data(valores[0], obrigatorio=False),
+            ler_data(valores[1]),
+            _ler_uuid(valores[2]),
+        )
+        if direcao == "proximo":
+            artigos_qs = artigos_qs.filter(_filtro_depois_de(*chave))
+        else:
+            artigos_qs = artigos_qs.filter(_filtro_antes_de(*chave)).reverse()
+    return artigos_qs, direcao
+
+
+def _montar_pagina(
+    artigos: list[Artigo], direcao: str, cursor: str | None, tamanho: int
+) -> PaginaArtigosDTO:
+    tem_mais = len(artigos) > tamanho
+    artigos = artigos[:tamanho]
+
+    if direcao == "proximo":
+        tem_proxima, tem_anterior = tem_mais, cursor is not None
+    else:
+        artigos.reverse()
+        tem_proxima, tem_anterior = True, tem_mais
+
+    compartilhados = _DTOsCompartilhados()
+    return PaginaArtigosDTO(
+        artigos=[
+            _construir_artigo_list_dto(artigo, compartilhados) for artigo in artigos
         ],
+        proximo_cursor=(
+            codificar_cursor("proximo", *_chave_keyset(artigos[-1]))
+            if tem_proxima and artigos
+            else None
+        ),
+        cursor_anterior=(
+            codificar_cursor("anterior", *_chave_keyset(artigos[0]))
+            if tem_anterior and artigos
+            else None
+        ),
     )
+
+
+def _artigos_publicados_qs() -> QuerySet[Artigo]:
+    return (
+        Artigo.objects.using(banco_leitura())
+        .filter(publicado=True)
+        .only(
+            "id",
+            "titulo",
+            "slug",
+            "resumo",
+            "data_publicacao",
+            "data_criacao",
+            "data_atualizacao",
+            "total_comentarios_aprovados",
+            "autor_id",
+            "autor__username",
+            "autor__first_name",
+            "autor__last_name",
+        )
+        .select_related("autor")
+        .prefetch_related(
+            Prefetch(
+                "tags",
+                queryset=Tag.objects.only("id", "nome"),
+            )
+        )
+        .order_by(F("data_publicacao").desc(nulls_last=True), "-data_criacao", "-id")
+    )
+
+
+def _construir_artigo_list_dto(
+    artigo: Artigo, compartilhados: _DTOsCompartilhados
+) -> ArtigoListDTO:
+    return ArtigoListDTO(
+        titulo=artigo.titulo,
+        slug=artigo.slug,
+        resumo=artigo.resumo,
+        data_publicacao=artigo.data_publicacao,
+        data_criacao=artigo.data_criacao,
+        autor=compartilhados.autor_do_usuario(artigo.autor),
+        tags=[compartilhados.tag(tag.nome) for tag in artigo.tags.all()],
+        id=artigo.id,
+        data_atualizacao=artigo.data_atualizacao,
+        total_comentarios=artigo.total_comentarios_aprovados,
+    )
+
+
+def _chave_keyset(artigo: Artigo) -> tuple[datetime | None, datetime, str]:
+    return artigo.data_publicacao, artigo.data_criacao, str(artigo.id)
+
+
+def _filtro_depois_de(
+    data_publicacao: datetime | None, data_criacao: datetime, id: uuid.UUID
+) -> Q:
+    # Ordem decrescente com data_publicacao nula por último
+    mesma_publicacao_mais_antigo = Q(data_criacao__lt=data_criacao) | Q(
+        data_criacao=data_criacao, id__lt=id
+    )
+    if data_publicacao is None:
+        return Q(data_publicacao__isnull=True) & mesma_publicacao_mais_antigo
+    return (
+        Q(data_publicacao__lt=data_publicacao)
+        | Q(data_publicacao__isnull=True)
+        | (Q(data_publicacao=data_publicacao) & mesma_publicacao_mais_antigo)
+    )
+
+
+def _filtro_antes_de(
+    data_publicacao: datetime | None, data_criacao: datetime, id: uuid.UUID
+) -> Q:
+    mesma_publicacao_mais_recente = Q(data_criacao__gt=data_criacao) | Q(
+        data_criacao=data_criacao, id__gt=id
+    )
+    if data_publicacao is None:
+        return Q(data_publicacao__isnull=False) | (
+            Q(data_publicacao__isnull=True) & mesma_publicacao_mais_recente
+        )
+    return Q(data_publicacao__gt=data_publicacao) | (
+        Q(data_publicacao=data_publicacao) & mesma_publicacao_mais_recente
+    )
+
+
+def _ler_uuid(valor: str | None) -> uuid.UUID:
+    try:
+        return uuid.UUID(valor)
+    except (TypeError, ValueError, AttributeError) as erro:
+        raise CursorInvalido(valor) from erro
+
+
+def _construir_validadores(
+    ultima_modificacao: datetime | None, *partes: object
+) -> ValidadoresDTO:
+    resumo = hashlib.md5(
+        repr((ultima_modificacao, *partes)).encode(), usedforsecurity=False
+    ).hexdigest()
+    return ValidadoresDTO(etag=f'"{resumo}"', ultima_modificacao=ultima_modificacao)
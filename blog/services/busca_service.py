@@ -0,0 +1,179 @@
+import hashlib
+import html
+import re
+from collections import defaultdict
+from collections.abc import Iterable
+from uuid import UUID
+
+from django.db import connection
+from django.db.models import QuerySet
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape, strip_tags
+
+from blog.dto import ResultadoBuscaDTO
+from blog.metricas import medido
+from blog.models import Artigo
+
+# Tabela virtual FTS5 criada pela migration 0006 (somente em SQLite)
+TABELA_BUSCA = "blog_artigo_busca"
+
+# Pesos do bm25 na ordem das colunas: artigo_id, titulo, resumo, conteudo, tags
+PESOS_BM25 = (0.0, 10.0, 4.0, 1.0, 6.0)
+
+# Marcadores de controle no snippet, trocados por <mark> depois do escape
+_INICIO_DESTAQUE = "\x02"
+_FIM_DESTAQUE = "\x03"
+
+TAMANHO_LOTE_INDEXACAO = 500
+
+
+def busca_disponivel() -> bool:
+    return connection.vendor == "sqlite"
+
+
+def texto_puro(conteudo_html: str) -> str:
+    texto = html.unescape(strip_tags(conteudo_html or ""))
+    return re.sub(r"\s+", " ", texto).strip()
+
+
+@medido
+def buscar_artigos(termo: str, limite: int = 20) -> list[ResultadoBuscaDTO]:
+    expressao = expressao_fts(termo)
+    if not expressao or not busca_disponivel():
+        return []
+
+    pesos = ", ".join(str(peso) for peso in PESOS_BM25)
+    sql = f"""
+        SELECT a.titulo, a.slug,
+               snippet({TABELA_BUSCA}, -1, %s, %s, '…', 16),
+               bm25({TABELA_BUSCA}, {pesos}) AS relevancia
+        FROM {TABELA_BUSCA}
+        JOIN blog_artigo a ON a.id = {TABELA_BUSCA}.artigo_id
+        WHERE {TABELA_BUSCA} MATCH %s AND a.publicado
+        ORDER BY relevancia
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [_INICIO_DESTAQUE, _FIM_DESTAQUE, expressao, limite])
+        linhas = cursor.fetchall()
+
+    return [
+        ResultadoBuscaDTO(
+            titulo=titulo,
+            slug=slug,
+            trecho=_destacar(trecho),
+            # bm25 do SQLite é negativo: quanto menor, mais relevante
+            relevancia=-relevancia,
+        )
+        for titulo, slug, trecho, relevancia in linhas
+    ]
+
+
+def filtrar_por_busca(queryset: QuerySet[Artigo], termo: str) -> QuerySet[Artigo]:
+    # Sem palavras não há expressão: MATCH '' é erro de sintaxe no FTS5
+    expressao = expressao_fts(termo)
+    if not expressao:
+        return queryset.none()
+
+    # Subquery no índice: não materializa a lista de ids em Python
+    return queryset.filter(
+        pk__in=RawSQL(
+            f"SELECT artigo_id FROM {TABELA_BUSCA} WHERE {TABELA_BUSCA} MATCH %s",
+            (expressao,),
+        )
+    )
+
+
+def expressao_fts(termo: str) -> str:
+    # Cada palavra vira um termo entre aspas com prefixo: a sintaxe de
+    # consulta do FTS5 nunca chega ao usuário
+    palavras = re.findall(r"\w+", termo or "")
+    return " ".join(f'"{palavra}"*' for palavra in palavras)
+
+
+def indexar_artigos(artigo_ids: Iterable[UUID]) -> None:
+    artigo_ids = list(artigo_ids)
+    if not artigo_ids or not busca_disponivel():
+        return
+
+    for inicio in range(0, len(artigo_ids), TAMANHO_LOTE_INDEXACAO):
+        lote = artigo_ids[inicio : inicio + TAMANHO_LOTE_INDEXACAO]
+        _indexar_lote(Artigo.objects.filter(pk__in=lote), lote)
+
+
+def remover_do_indice(artigo_ids: Iterable[UUID]) -> None:
+    rowids = [(_rowid(artigo_id),) for artigo_id in artigo_ids]
+    if not rowids or not busca_disponivel():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {TABELA_BUSCA} WHERE rowid = %s", rowids)
+
+
+def reindexar_tudo() -> int:
+    if not busca_disponivel():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABELA_BUSCA}")
+
+    # Percorre por keyset na pk para não manter um cursor aberto enquanto
+    # escreve no índice
+    total = 0
+    ultimo_id = None
+    while True:
+        lote_qs = Artigo.objects.order_by("pk")
+        if ultimo_id is not None:
+            lote_qs = lote_qs.filter(pk__gt=ultimo_id)
+        lote = list(lote_qs.values_list("pk", flat=True)[:TAMANHO_LOTE_INDEXACAO])
+        if not lote:
+            return total
+        total += _indexar_lote(Artigo.objects.filter(pk__in=lote), [])
+        ultimo_id = lote[-1]
+
+
+def _indexar_lote(artigos_qs: QuerySet[Artigo], remover: list[UUID]) -> int:
+    linhas = list(artigos_qs.values_list("pk", "titulo", "resumo", "conteudo"))
+    tags_por_artigo: dict[UUID, list[str]] = defaultdict(list)
+    for artigo_id, nome in Artigo.tags.through.objects.filter(
+        artigo_id__in=[linha[0] for linha in linhas]
+    ).values_list("artigo_id", "tag__nome"):
+        tags_por_artigo[artigo_id].append(nome)
+
+    with connection.cursor() as cursor:
+        if remover:
+            cursor.executemany(
+                f"DELETE FROM {TABELA_BUSCA} WHERE rowid = %s",
+                [(_rowid(artigo_id),) for artigo_id in remover],
+            )
+        cursor.executemany(
+            f"INSERT INTO {TABELA_BUSCA} "
+            "(rowid, artigo_id, titulo, resumo, conteudo, tags) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            [
+                (
+                    _rowid(artigo_id),
+                    artigo_id.hex,
+                    titulo,
+                    texto_puro(resumo),
+                    texto_puro(conteudo),
+                    " ".join(tags_por_artigo[artigo_id]),
+                )
+                for artigo_id, titulo, resumo, conteudo in linhas
+            ],
+        )
+    return len(linhas)
+
+
+def _rowid(artigo_id: UUID) -> int:
+    # O FTS5 só tem índice no rowid; derivá-lo do UUID permite apagar a linha
+    # de um artigo sem varrer a tabela. A migration 0006 tem uma cópia: as
+    # duas precisam dar o mesmo rowid
+    resumo = hashlib.blake2b(artigo_id.bytes, digest_size=8).digest()
+    return int.from_bytes(resumo, "big") >> 1
+
+
+def _destacar(trecho: str) -> str:
+    return (
+        escape(trecho)
+        .replace(_INICIO_DESTAQUE, "<mark>")
+        .replace(_FIM_DESTAQUE, "</mark>")
+    )
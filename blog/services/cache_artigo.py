@@ -0,0 +1,200 @@
+import secrets
+import threading
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, replace
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from blog.dto import ArtigoDTO
+from blog.roteador_banco import ler_do_primario
+
+# A versão muda junto com os campos do ArtigoDTO: DTOs de outro formato
+# gravados por uma versão anterior não são lidos
+PREFIXO_CHAVE = "blog:artigo_dto:v2:"
+PREFIXO_VERSAO = "blog:artigo_dto_versao:"
+
+
+@dataclass
+class EstatisticasCache:
+    acertos_locais: int = 0
+    acertos_compartilhados: int = 0
+    falhas: int = 0
+    despejos: int = 0
+
+    @property
+    def acertos(self) -> int:
+        return self.acertos_locais + self.acertos_compartilhados
+
+
+class CacheArtigoDTO:
+    # Dois níveis: LRU em memória (por processo, limitado em tamanho) na
+    # frente do framework de cache do Django (compartilhado entre processos).
+    # Cada slug tem uma versão no cache compartilhado, trocada a cada
+    # invalidação: o DTO fica guardado sob a versão em que foi carregado, e
+    # um acerto local só vale se a versão ainda for a mesma. Assim a
+    # invalidação feita por um worker chega à memória de todos os outros
+
+    def __init__(self, tamanho_maximo: int, timeout: int | None):
+        self.tamanho_maximo = tamanho_maximo
+        self.timeout = timeout
+        self._lru: OrderedDict[str, tuple[str, ArtigoDTO]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._estatisticas = EstatisticasCache()
+
+    def obter_ou_carregar(
+        self, slug: str, carregar: Callable[[str], ArtigoDTO]
+    ) -> ArtigoDTO:
+        versao = self._versao(slug)
+        artigo_dto = self._obter_local(slug, versao)
+        if artigo_dto is not None:
+            return artigo_dto
+
+        artigo_dto = cache.get(self._chave(slug, versao))
+        if artigo_dto is not None:
+            return self._registrar_compartilhado(slug, versao, artigo_dto)
+
+        self._registrar_falha()
+        # O cache é preenchido a partir do primário: uma réplica atrasada
+        # gravaria o DTO de antes da invalidação por todo o timeout. Uma
+        # carga que termina depois de uma invalidação grava sob a versão
+        # antiga, que ninguém mais lê
+        with ler_do_primario():
+            artigo_dto = carregar(slug)
+        self._guardar_carregado(slug, versao, artigo_dto)
+        cache.set(self._chave(slug, versao), artigo_dto, self.timeout)
+        return artigo_dto
+
+    async def aobter_ou_carregar(
+        self, slug: str, carregar: Callable[[str], Awaitable[ArtigoDTO]]
+    ) -> ArtigoDTO:
+        # Mesma lógica, com o cache compartilhado e a carga aguardados; as
+        # seções com o lock são curtas e não bloqueiam o event loop
+        versao = await self._aversao(slug)
+        artigo_dto = self._obter_local(slug, versao)
+        if artigo_dto is not None:
+            return artigo_dto
+
+        artigo_dto = await cache.aget(self._chave(slug, versao))
+        if artigo_dto is not None:
+            return self._registrar_compartilhado(slug, versao, artigo_dto)
+
+        self._registrar_falha()
+        with ler_do_primario():
+            artigo_dto = await carregar(slug)
+        self._guardar_carregado(slug, versao, artigo_dto)
+        await cache.aset(self._chave(slug, versao), artigo_dto, self.timeout)
+        return artigo_dto
+
+    def invalidar(self, slugs: Iterable[str]) -> None:
+        slugs = {slug for slug in slugs if slug}
+        if not slugs:
+            return
+        with self._lock:
+            for slug in slugs:
+                self._lru.pop(slug, None)
+        chaves_versao = {self._chave_versao(slug): slug for slug in slugs}
+        # Apaga os DTOs das versões atuais (sem timeout, ficariam para sempre)
+        # e troca as versões
+        versoes = cache.get_many(chaves_versao)
+        cache.delete_many(
+            [
+                self._chave(chaves_versao[chave], versao)
+                for chave, versao in versoes.items()
+            ]
+        )
+        cache.set_many({chave: _nova_versao() for chave in chaves_versao}, None)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._lru.clear()
+            self._estatisticas = EstatisticasCache()
+
+    def estatisticas(self) -> EstatisticasCache:
+        with self._lock:
+            return replace(self._estatisticas)
+
+    def _versao(self, slug: str) -> str:
+        chave = self._chave_versao(slug)
+        versao = cache.get(chave)
+        if versao is None:
+            # Primeira leitura do slug, ou versão despejada do cache: uma
+            # versão nova também descarta o que os processos guardaram antes
+            cache.add(chave, _nova_versao(), None)
+            versao = cache.get(chave)
+        return versao
+
+    async def _aversao(self, slug: str) -> str:
+        chave = self._chave_versao(slug)
+        versao = await cache.aget(chave)
+        if versao is None:
+            await cache.aadd(chave, _nova_versao(), None)
+            versao = await cache.aget(chave)
+        return versao
+
+    def _obter_local(self, slug: str, versao: str) -> ArtigoDTO | None:
+        with self._lock:
+            guardado = self._lru.get(slug)
+            if guardado is None:
+                return None
+            if guardado[0] != versao:
+                # Invalidado por outro processo
+                del self._lru[slug]
+                return None
+            self._lru.move_to_end(slug)
+            self._estatisticas.acertos_locais += 1
+            return guardado[1]
+
+    def _registrar_compartilhado(
+        self, slug: str, versao: str, artigo_dto: ArtigoDTO
+    ) -> ArtigoDTO:
+        with self._lock:
+            self._estatisticas.acertos_compartilhados += 1
+            self._guardar_local(slug, versao, artigo_dto)
+        return artigo_dto
+
+    def _registrar_falha(self) -> None:
+        with self._lock:
+            self._estatisticas.falhas += 1
+
+    def _guardar_carregado(self, slug: str, versao: str, artigo_dto: ArtigoDTO) -> None:
+        with self._lock:
+            self._guardar_local(slug, versao, artigo_dto)
+
+    def _guardar_local(self, slug: str, versao: str, artigo_dto: ArtigoDTO) -> None:
+        self._lru[slug] = (versao, artigo_dto)
+        self._lru.move_to_end(slug)
+        while len(self._lru) > self.tamanho_maximo:
+            self._lru.popitem(last=False)
+            self._estatisticas.despejos += 1
+
+    @staticmethod
+    def _chave_versao(slug: str) -> str:
+        return f"{PREFIXO_VERSAO}{slug}"
+
+    @staticmethod
+    def _chave(slug: str, versao: str) -> str:
+        return f"{PREFIXO_CHAVE}{slug}:{versao}"
+
+
+def _nova_versao() -> str:
+    # Curta para a chave do DTO (prefixo + slug de até 200 caracteres +
+    # versão) caber nos 250 caracteres do memcached
+    return secrets.token_hex(6)
+
+
+cache_artigo_dto = CacheArtigoDTO(
+    tamanho_maximo=getattr(settings, "BLOG_CACHE_ARTIGO_TAMANHO_LRU", 256),
+    timeout=getattr(settings, "BLOG_CACHE_ARTIGO_TIMEOUT", 300),
+)
+
+
+def invalidar_artigos(slugs: Iterable[str]) -> None:
+    slugs = set(slugs)
+    cache_artigo_dto.invalidar(slugs)
+    # Invalida de novo após o commit: uma leitura concorrente pode ter
+    # recarregado o DTO antigo antes de a transação terminar
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: cache_artigo_dto.invalidar(slugs))
@@ -0,0 +1,56 @@
+from collections import defaultdict
+from collections.abc import Mapping
+from uuid import UUID
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from blog.models import Artigo, Comentario
+
+
+def ajustar_total_comentarios(deltas: Mapping[UUID, int]) -> None:
+    # Um UPDATE com F() por valor distinto de delta: o incremento acontece no
+    # banco, sem ler o contador antes
+    artigos_por_delta: dict[int, list[UUID]] = defaultdict(list)
+    for artigo_id, delta in deltas.items():
+        if delta:
+            artigos_por_delta[delta].append(artigo_id)
+
+    agora = timezone.now()
+    for delta, artigo_ids in artigos_por_delta.items():
+        total = F("total_comentarios_aprovados") + delta
+        if delta < 0:
+            # Um contador que divergiu para baixo (bulk_create, SQL à mão) não
+            # pode abortar um delete no CHECK do PositiveIntegerField; o
+            # reconciliar_contadores acerta o valor depois
+            total = Greatest(total, 0)
+        Artigo.objects.filter(pk__in=artigo_ids).update(
+            total_comentarios_aprovados=total,
+            data_atualizacao=agora,
+        )
+
+
+def reconciliar_total_comentarios(corrigir: bool = True) -> int:
+    divergentes = Artigo.objects.annotate(
+        total_real=_total_comentarios_aprovados()
+    ).exclude(total_comentarios_aprovados=F("total_real"))
+    quantidade = divergentes.count()
+
+    if corrigir and quantidade:
+        Artigo.objects.filter(pk__in=divergentes.values("pk")).update(
+            total_comentarios_aprovados=_total_comentarios_aprovados(),
+            data_atualizacao=timezone.now(),
+        )
+    return quantidade
+
+
+def _total_comentarios_aprovados() -> Coalesce:
+    contagem = (
+        Comentario.objects.filter(artigo=OuterRef("pk"), aprovado=True)
+        .order_by()
+        .values("artigo")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    return Coalesce(Subquery(contagem), 0)
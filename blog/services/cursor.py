@@ -0,0 +1,50 @@
+import base64
+import json
+from datetime import datetime
+
+from django.utils.dateparse import parse_datetime
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+def codificar_cursor(direcao: str, *valores: datetime | str | None) -> str:
+    # Cursor opaco: base64 de um JSON com a direção e a chave da posição
+    normalizados = [
+        valor.isoformat() if isinstance(valor, datetime) else valor for valor in valores
+    ]
+    dados = json.dumps([direcao, *normalizados], separators=(",", ":"))
+    return base64.urlsafe_b64encode(dados.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(
+    token: str, quantidade_valores: int
+) -> tuple[str, list[str | None]]:
+    try:
+        preenchimento = "=" * (-len(token) % 4)
+        dados = json.loads(base64.urlsafe_b64decode(token + preenchimento))
+    except (ValueError, TypeError) as erro:
+        raise CursorInvalido(token) from erro
+
+    if (
+        not isinstance(dados, list)
+        or len(dados) != quantidade_valores + 1
+        or dados[0] not in ("proximo", "anterior")
+        or not all(valor is None or isinstance(valor, str) for valor in dados[1:])
+    ):
+        raise CursorInvalido(token)
+
+    return dados[0], dados[1:]
+
+
+def ler_data(valor: str | None, obrigatorio: bool = True) -> datetime | None:
+    if valor is None and not obrigatorio:
+        return None
+    try:
+        data = parse_datetime(valor) if valor is not None else None
+    except ValueError:
+        data = None
+    if data is None:
+        raise CursorInvalido(valor)
+    return data
@@ -0,0 +1,129 @@
+from collections import Counter
+from collections.abc import Callable
+
+from django.db import transaction
+from django.db.models import Model, QuerySet
+from django.utils import timezone
+
+from blog.metricas import medido
+from blog.models import Artigo, Comentario
+from blog.services.artigo_service import registrar_saida_da_lista
+from blog.services.cache_artigo import invalidar_artigos
+from blog.services.contador_service import ajustar_total_comentarios
+from blog.services.orcamento import orcamento_queries
+
+TAMANHO_LOTE_MODERACAO = 1000
+
+
+@orcamento_queries(maximo=8, cresce_com="tamanho_lote")
+@medido
+def aprovar_comentarios(
+    comentarios: QuerySet[Comentario], tamanho_lote: int = TAMANHO_LOTE_MODERACAO
+) -> int:
+    return _moderar_comentarios(comentarios, True, tamanho_lote)
+
+
+@orcamento_queries(maximo=8, cresce_com="tamanho_lote")
+@medido
+def rejeitar_comentarios(
+    comentarios: QuerySet[Comentario], tamanho_lote: int = TAMANHO_LOTE_MODERACAO
+) -> int:
+    return _moderar_comentarios(comentarios, False, tamanho_lote)
+
+
+@orcamento_queries(maximo=7, cresce_com="tamanho_lote")
+@medido
+def publicar_artigos(
+    artigos: QuerySet[Artigo], tamanho_lote: int = TAMANHO_LOTE_MODERACAO
+) -> int:
+    return _alterar_publicacao(artigos, True, tamanho_lote)
+
+
+@orcamento_queries(maximo=7, cresce_com="tamanho_lote")
+@medido
+def despublicar_artigos(
+    artigos: QuerySet[Artigo], tamanho_lote: int = TAMANHO_LOTE_MODERACAO
+) -> int:
+    return _alterar_publicacao(artigos, False, tamanho_lote)
+
+
+def _moderar_comentarios(
+    comentarios: QuerySet[Comentario], aprovado: bool, tamanho_lote: int
+) -> int:
+    # Por lote: um UPDATE nos comentários, um ajuste de contador por valor de
+    # delta (quase sempre um) e uma invalidação de cache; nenhum sinal por linha
+    delta = 1 if aprovado else -1
+
+    def moderar(lote: list[tuple]) -> int:
+        alterados = [linha for linha in lote if linha[3] != aprovado]
+        if not alterados:
+            return 0
+        Comentario.objects.filter(pk__in=[linha[0] for linha in alterados]).update(
+            aprovado=aprovado
+        )
+        deltas = Counter(linha[1] for linha in alterados)
+        ajustar_total_comentarios(
+            {artigo_id: delta * quantidade for artigo_id, quantidade in deltas.items()}
+        )
+        invalidar_artigos(linha[2] for linha in alterados)
+        return len(alterados)
+
+    return _em_lotes(
+        comentarios, tamanho_lote, moderar, "artigo_id", "artigo__slug", "aprovado"
+    )
+
+
+def _alterar_publicacao(
+    artigos: QuerySet[Artigo], publicado: bool, tamanho_lote: int
+) -> int:
+    def alterar(lote: list[tuple]) -> int:
+        alterados = [linha for linha in lote if linha[2] != publicado]
+        if not alterados:
+            return 0
+        agora = timezone.now()
+        # Mesma regra de Artigo.publicar(); rascunho não tem data de publicação
+        Artigo.objects.filter(pk__in=[linha[0] for linha in alterados]).update(
+            publicado=publicado,
+            data_publicacao=agora if publicado else None,
+            data_atualizacao=agora,
+        )
+        invalidar_artigos(linha[1] for linha in alterados)
+        if not publicado:
+            registrar_saida_da_lista()
+        return len(alterados)
+
+    return _em_lotes(artigos, tamanho_lote, alterar, "slug", "publicado")
+
+
+def _em_lotes(
+    queryset: QuerySet[Model],
+    tamanho_lote: int,
+    processar: Callable[[list[tuple]], int],
+    *campos: str,
+) -> int:
+    # Keyset na pk, uma transação por lote: a seleção do admin pode ter
+    # milhões de linhas e nada fica aberto entre os lotes. Filtrar por pk em
+    # vez de reusar o queryset descarta select_related e distinct, que não
+    # combinam com select_for_update
+    if tamanho_lote < 1:
+        raise ValueError("tamanho_lote deve ser positivo")
+
+    modelo = queryset.model
+    selecionados = queryset.values("pk")
+    total = 0
+    ultimo_pk = None
+    while True:
+        with transaction.atomic():
+            lote_qs = modelo.objects.filter(pk__in=selecionados).order_by("pk")
+            if ultimo_pk is not None:
+                lote_qs = lote_qs.filter(pk__gt=ultimo_pk)
+            lote = list(
+                lote_qs.select_for_update(of=("self",)).values_list("pk", *campos)[
+                    :tamanho_lote
+                ]
+            )
+            if lote:
+                total += processar(lote)
+        if len(lote) < tamanho_lote:
+            return total
+        ultimo_pk = lote[-1][0]
@@ -0,0 +1,36 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+
+@dataclass(frozen=True)
+class OrcamentoQueries:
+    funcao: Callable
+    maximo: int
+    # Parâmetro que divide o trabalho em lotes (ex.: chunk_size): o orçamento
+    # passa a valer por lote em vez de por chamada
+    cresce_com: str | None = None
+
+    @property
+    def nome(self) -> str:
+        return f"{self.funcao.__module__}.{self.funcao.__qualname__}"
+
+
+ORCAMENTOS: dict[str, OrcamentoQueries] = {}
+
+
+def orcamento_queries(maximo: int, cresce_com: str | None = None) -> Callable[[F], F]:
+    # Só registra a função: nenhum wrapper, nenhum custo em produção. Quem
+    # verifica o orçamento é o plugin blog.plugin_orcamento
+    if maximo < 1:
+        raise ValueError("maximo deve ser positivo")
+
+    def registrar(funcao: F) -> F:
+        orcamento = OrcamentoQueries(funcao, maximo, cresce_com)
+        ORCAMENTOS[orcamento.nome] = orcamento
+        funcao.orcamento_queries = orcamento
+        return funcao
+
+    return registrar
@@ -0,0 +1,181 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models import QuerySet
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import detector_n1, metricas, perfilador
+from .models import Artigo, Comentario, Tag
+from .services.artigo_service import registrar_saida_da_lista
+from .services.busca_service import indexar_artigos, remover_do_indice
+from .services.cache_artigo import invalidar_artigos
+from .services.contador_service import ajustar_total_comentarios
+
+CAMPOS_INDEXADOS = {"titulo", "resumo", "conteudo"}
+
+
+def _slugs_dos_artigos(**filtros) -> list[str]:
+    return list(Artigo.objects.filter(**filtros).values_list("slug", flat=True))
+
+
+def _artigos_alterados(**filtros) -> None:
+    # Mudanças nas tags não passam por Artigo.save(); atualizar
+    # data_atualizacao mantém os validadores de GET condicional corretos
+    artigos = dict(Artigo.objects.filter(**filtros).values_list("pk", "slug"))
+    if artigos:
+        Artigo.objects.filter(pk__in=artigos).update(data_atualizacao=timezone.now())
+        invalidar_artigos(artigos.values())
+        indexar_artigos(artigos)
+
+
+@receiver(pre_save, sender=Artigo)
+def guardar_estado_anterior_do_artigo(
+    sender, instance: Artigo, update_fields=None, **kwargs
+):
+    if instance._state.adding or (
+        update_fields and not {"slug", "publicado"} & set(update_fields)
+    ):
+        return
+    instance._slug_anterior, instance._publicado_anterior = (
+        Artigo.objects.filter(pk=instance.pk).values_list("slug", "publicado").first()
+    ) or (None, False)
+
+
+@receiver(post_save, sender=Artigo)
+def artigo_salvo(sender, instance: Artigo, update_fields=None, **kwargs):
+    invalidar_artigos([instance.slug, getattr(instance, "_slug_anterior", None)])
+    if getattr(instance, "_publicado_anterior", False) and not instance.publicado:
+        registrar_saida_da_lista()
+    if not update_fields or CAMPOS_INDEXADOS & set(update_fields):
+        indexar_artigos([instance.pk])
+
+
+@receiver(post_delete, sender=Artigo)
+def artigo_removido(sender, instance: Artigo, **kwargs):
+    invalidar_artigos([instance.slug])
+    remover_do_indice([instance.pk])
+    if instance.publicado:
+        registrar_saida_da_lista()
+
+
+@receiver(pre_save, sender=Comentario)
+def guardar_estado_anterior_do_comentario(sender, instance: Comentario, **kwargs):
+    if instance._state.adding:
+        instance._estado_anterior = None
+    elif hasattr(instance, "_estado_original"):
+        instance._estado_anterior = instance._estado_original
+    else:
+        instance._estado_anterior = (
+            Comentario.objects.filter(pk=instance.pk)
+            .values_list("artigo_id", "aprovado")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Comentario)
+def comentario_salvo(sender, instance: Comentario, **kwargs):
+    antes = instance._estado_anterior
+    depois = (instance.artigo_id, instance.aprovado)
+    instance._guardar_estado_original()
+
+    deltas = defaultdict(int)
+    if antes and antes[1]:
+        deltas[antes[0]] -= 1
+    if depois[1]:
+        deltas[depois[0]] += 1
+    ajustar_total_comentarios(deltas)
+
+    # Só importa para o cache se o comentário aparecia ou passou a aparecer
+    visivel_em = {
+        artigo_id for artigo_id, aprovado in filter(None, (antes, depois)) if aprovado
+    }
+    if visivel_em:
+        # Editar um comentário visível não mexe no contador (que atualiza
+        # data_atualizacao); a data muda mesmo assim, e com ela o ETag
+        editados = [artigo_id for artigo_id in visivel_em if not deltas[artigo_id]]
+        if editados:
+            Artigo.objects.filter(pk__in=editados).update(
+                data_atualizacao=timezone.now()
+            )
+        invalidar_artigos(_slugs_dos_artigos(pk__in=visivel_em))
+
+
+@receiver(post_delete, sender=Comentario)
+def comentario_removido(sender, instance: Comentario, origin=None, **kwargs):
+    # Em cascata do próprio artigo, a linha do contador também vai ser
+    # apagada: sem isso, apagar um artigo custaria um UPDATE e um SELECT por
+    # comentário aprovado
+    if _apagado_com_o_artigo(instance, origin):
+        return
+    artigo_id, aprovado = getattr(
+        instance, "_estado_original", (instance.artigo_id, instance.aprovado)
+    )
+    if aprovado:
+        ajustar_total_comentarios({artigo_id: -1})
+        invalidar_artigos(_slugs_dos_artigos(pk=artigo_id))
+
+
+def _apagado_com_o_artigo(comentario: Comentario, origin) -> bool:
+    # origin é o que recebeu o delete(): um Artigo ou um queryset de Artigo
+    # só alcança os comentários dos artigos apagados
+    if isinstance(origin, Artigo):
+        return origin.pk == comentario.artigo_id
+    return isinstance(origin, QuerySet) and origin.model is Artigo
+
+
+@receiver(post_save, sender=Tag)
+def tag_salva(sender, instance: Tag, created: bool, **kwargs):
+    if not created:
+        _artigos_alterados(tags=instance)
+
+
+@receiver(pre_delete, sender=Tag)
+def tag_removida(sender, instance: Tag, **kwargs):
+    # Em post_delete as linhas da tabela intermediária já foram apagadas
+    _artigos_alterados(tags=instance)
+
+
+@receiver(m2m_changed, sender=Artigo.tags.through)
+def tags_do_artigo_alteradas(
+    sender, instance, action: str, reverse: bool, pk_set, **kwargs
+):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            _artigos_alterados(pk=instance.pk)
+    elif action in ("post_add", "post_remove"):
+        _artigos_alterados(pk__in=pk_set)
+    elif action == "pre_clear":
+        _artigos_alterados(tags=instance)
+
+
+@receiver(connection_created)
+def configurar_sqlite(sender, connection, **kwargs):
+    pragmas = getattr(settings, "BLOG_SQLITE_PRAGMAS", None)
+    if connection.vendor != "sqlite" or not pragmas:
+        return
+    # Nomes e valores vêm dos settings, não do usuário; PRAGMA não aceita
+    # parâmetros
+    with connection.cursor() as cursor:
+        for nome, valor in pragmas.items():
+            cursor.execute(f"PRAGMA {nome} = {valor}")
+
+
+@receiver(connection_created)
+def instrumentar_conexao(sender, connection, **kwargs):
+    # O mesmo wrapper de conexão sobrevive a reconexões: instala uma vez só
+    for registrar_query in (
+        metricas.registrar_query,
+        perfilador.registrar_query,
+        detector_n1.registrar_query,
+    ):
+        if registrar_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(registrar_query)
@@ -0,0 +1,17 @@
+from django import template
+from django.contrib.admin.templatetags.base import InclusionAdminNode
+
+from blog.admin_changelist import hierarquia_datas_em_cache
+
+register = template.Library()
+
+
+@register.tag(name="hierarquia_datas_em_cache")
+def hierarquia_datas_em_cache_tag(parser, token):
+    return InclusionAdminNode(
+        parser,
+        token,
+        func=hierarquia_datas_em_cache,
+        template_name="date_hierarchy.html",
+        takes_context=False,
+    )
@@ -0,0 +1,74 @@
+import pytest
+from django.contrib.auth.models import User
+from model_bakery import baker
+
+from blog.models import Artigo, Comentario, Tag
+from blog.services.artigo_service import obter_artigo_dto_por_slug
+from blog.services.cache_artigo import cache_artigo_dto
+
+
+@pytest.fixture
+def tag_fixture():
+    def _wrapper(nome: str = "Python", slug: str = "python"):
+        return baker.make(Tag, nome=nome, slug=slug)
+
+    return _wrapper
+
+
+@pytest.fixture
+def artigo_fixture():
+    def _wrapper(
+        slug: str = "artigo-de-teste",
+        publicado: bool = True,
+        tags: list | None = None,
+        titulo: str = "Artigo de Teste",
+        conteudo: str = "<p>Conteúdo do artigo</p>",
+        resumo: str = "<p>Resumo do artigo</p>",
+    ):
+        artigo = baker.make(
+            Artigo,
+            titulo=titulo,
+            slug=slug,
+            autor=baker.make(User),
+            conteudo=conteudo,
+            resumo=resumo,
+            publicado=publicado,
+        )
+        if tags:
+            artigo.tags.add(*tags)
+        return artigo
+
+    return _wrapper
+
+
+@pytest.fixture
+def comentario_fixture():
+    def _wrapper(artigo: Artigo, aprovado: bool = True, quantity: int | None = None):
+        return baker.make(
+            Comentario,
+            artigo=artigo,
+            autor=artigo.autor,
+            texto="<p>Comentário</p>",
+            aprovado=aprovado,
+            _quantity=quantity,
+        )
+
+    return _wrapper
+
+
+@pytest.fixture
+def total_aprovados():
+    # O contador desnormalizado como está no banco
+    def _wrapper(artigo: Artigo) -> int:
+        artigo.refresh_from_db(fields=["total_comentarios_aprovados"])
+        return artigo.total_comentarios_aprovados
+
+    return _wrapper
+
+
+@pytest.fixture
+def obter_cacheado():
+    def _wrapper(slug: str):
+        return cache_artigo_dto.obter_ou_carregar(slug, obter_artigo_dto_por_slug)
+
+    return _wrapper
@@ -0,0 +1,348 @@
+import pytest
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+
+from blog import admin_changelist
+from blog.admin import TAMANHO_PAGINA_COMENTARIOS_INLINE, ComentarioInline
+from blog.admin_changelist import PaginadorEstimado
+from blog.models import Artigo, Comentario, Tag
+
+
+@pytest.fixture
+def artigos_fixture():
+    def _wrapper(quantidade: int, prefixo: str = "artigo"):
+        artigos = []
+        for indice in range(quantidade):
+            autor = baker.make(User, username=f"{prefixo}-autor-{indice}")
+            artigo = baker.make(
+                Artigo,
+                titulo=f"Artigo {prefixo} {indice}",
+                slug=f"{prefixo}-{indice}",
+                autor=autor,
+                conteudo="<p>Conteúdo</p>",
+                resumo="<p>Resumo</p>",
+                publicado=True,
+            )
+            artigo.tags.add(
+                baker.make(
+                    Tag, nome=f"Tag {prefixo} {indice}", slug=f"{prefixo}-{indice}"
+                )
+            )
+            baker.make(
+                Comentario,
+                artigo=artigo,
+                autor=autor,
+                texto="<p>Comentário</p>",
+                aprovado=True,
+            )
+            artigos.append(artigo)
+        return artigos
+
+    return _wrapper
+
+
+def _queries_da_pagina(client, url, **parametros):
+    with CaptureQueriesContext(connection) as contexto:
+        response = client.get(url, parametros)
+    assert response.status_code == 200
+    return [query["sql"] for query in contexto.captured_queries]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url", ["admin:blog_artigo_changelist", "admin:blog_comentario_changelist"]
+)
+def test_changelist_deve_ter_queries_constantes(admin_client, artigos_fixture, url):
+    artigos_fixture(2, prefixo="poucos")
+    poucos = _queries_da_pagina(admin_client, reverse(url))
+
+    artigos_fixture(10, prefixo="muitos")
+    # A hierarquia de datas em cache economizaria queries na segunda visita
+    cache.clear()
+    muitos = _queries_da_pagina(admin_client, reverse(url))
+
+    assert len(muitos) == len(poucos)
+
+
+@pytest.mark.django_db
+def test_changelist_de_artigos_nao_deve_ler_conteudo(admin_client, artigos_fixture):
+    artigos_fixture(2)
+
+    queries = _queries_da_pagina(admin_client, reverse("admin:blog_artigo_changelist"))
+
+    assert not any('"blog_artigo"."conteudo"' in sql for sql in queries)
+
+
+@pytest.mark.django_db
+def test_filtro_por_autor_deve_filtrar_sem_listar_usuarios(
+    admin_client, artigos_fixture
+):
+    artigo = artigos_fixture(3)[0]
+    url = reverse("admin:blog_comentario_changelist")
+
+    response = admin_client.get(url, {"autor": artigo.autor.pk})
+
+    assert response.status_code == 200
+    assert response.context["cl"].result_count == 1
+    assert 'data-field-name="autor"' in response.content.decode()
+    assert "artigo-autor-1" not in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_filtro_com_valor_invalido_deve_redirecionar_com_erro(admin_client):
+    url = reverse("admin:blog_comentario_changelist")
+
+    response = admin_client.get(url, {"artigo": "nao-e-uuid"})
+
+    assert response.status_code == 302
+    assert response.url.endswith("?e=1")
+
+
+@pytest.mark.django_db
+def test_hierarquia_de_datas_deve_vir_do_cache_na_segunda_visita(
+    admin_client, artigos_fixture
+):
+    artigos_fixture(2)
+    url = reverse("admin:blog_comentario_changelist")
+
+    primeira = _queries_da_pagina(admin_client, url)
+    segunda = _queries_da_pagina(admin_client, url)
+
+    assert any("MIN(" in sql for sql in primeira)
+    assert not any("MIN(" in sql for sql in segunda)
+    assert len(segunda) < len(primeira)
+
+
+@pytest.mark.django_db
+def test_paginador_sem_filtros_deve_usar_a_estimativa_do_banco(
+    artigos_fixture, monkeypatch
+):
+    artigos_fixture(3)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    # Escrita depois do ANALYZE: a estimativa não a enxerga
+    baker.make(
+        Comentario,
+        artigo=Artigo.objects.first(),
+        autor=User.objects.first(),
+        texto="<p>Depois</p>",
+    )
+    monkeypatch.setattr(admin_changelist, "LIMITE_CONTAGEM_EXATA", 2)
+
+    with CaptureQueriesContext(connection) as contexto:
+        total = PaginadorEstimado(Comentario.objects.all(), 100).count
+
+    assert total == 3
+    assert not any("COUNT(" in query["sql"] for query in contexto.captured_queries)
+
+
+@pytest.mark.django_db
+def test_paginador_com_filtros_deve_parar_de_contar_no_limite(
+    artigos_fixture, monkeypatch
+):
+    artigos_fixture(5)
+    monkeypatch.setattr(admin_changelist, "LIMITE_CONTAGEM_EXATA", 2)
+
+    total = PaginadorEstimado(Comentario.objects.filter(aprovado=True), 100).count
+
+    assert total == 2
+
+
+@pytest.mark.django_db
+def test_paginador_sem_estatisticas_deve_contar(artigos_fixture):
+    artigos_fixture(3)
+
+    assert PaginadorEstimado(Comentario.objects.all(), 100).count == 3
+
+
+@pytest.fixture
+def artigo_com_comentarios_fixture():
+    def _wrapper(quantidade: int):
+        autor = baker.make(User, username="autor-do-artigo")
+        artigo = baker.make(
+            Artigo,
+            titulo="Artigo popular",
+            slug="artigo-popular",
+            autor=autor,
+            conteudo="<p>Conteúdo</p>",
+            resumo="<p>Resumo</p>",
+            publicado=True,
+        )
+        for indice in range(quantidade):
+            baker.make(
+                Comentario,
+                artigo=artigo,
+                autor=baker.make(User, username=f"comentarista-{indice}"),
+                texto=f"<p>Comentário {indice}</p>",
+                aprovado=True,
+            )
+        return artigo
+
+    return _wrapper
+
+
+@pytest.mark.django_db
+def test_formulario_do_artigo_deve_ter_queries_constantes(
+    admin_client, artigo_com_comentarios_fixture
+):
+    artigo = artigo_com_comentarios_fixture(25)
+    url = reverse("admin:blog_artigo_change", args=[artigo.pk])
+    # Aquece o cache de ContentType do Django
+    admin_client.get(url)
+    poucos = _queries_da_pagina(admin_client, url)
+
+    for indice in range(40):
+        baker.make(
+            Comentario,
+            artigo=artigo,
+            autor=baker.make(User, username=f"outro-{indice}"),
+            texto="<p>Outro</p>",
+        )
+    muitos = _queries_da_pagina(admin_client, url)
+
+    assert len(muitos) == len(poucos)
+
+
+@pytest.mark.django_db
+def test_autores_do_inline_nao_devem_custar_uma_query_por_linha(
+    admin_client, artigo_com_comentarios_fixture, django_assert_num_queries
+):
+    artigo = artigo_com_comentarios_fixture(1)
+    url = reverse("admin:blog_artigo_change", args=[artigo.pk])
+    admin_client.get(url)
+    queries_com_uma_linha = len(_queries_da_pagina(admin_client, url))
+    for indice in range(19):
+        baker.make(
+            Comentario,
+            artigo=artigo,
+            autor=baker.make(User, username=f"outro-{indice}"),
+            texto="<p>Outro</p>",
+        )
+
+    # Vinte linhas, cada uma com um autor diferente selecionado
+    with django_assert_num_queries(queries_com_uma_linha):
+        response = admin_client.get(url)
+
+    assert "outro-18" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_inline_de_comentarios_deve_ser_paginado(
+    admin_client, artigo_com_comentarios_fixture
+):
+    artigo = artigo_com_comentarios_fixture(25)
+    url = reverse("admin:blog_artigo_change", args=[artigo.pk])
+
+    primeira = admin_client.get(url)
+    segunda = admin_client.get(url, {"pagina_comentarios": 2})
+
+    formset_primeira = primeira.context["inline_admin_formsets"][0].formset
+    formset_segunda = segunda.context["inline_admin_formsets"][0].formset
+    assert len(formset_primeira.forms) == 20
+    assert len(formset_segunda.forms) == 5
+    assert "pagina_comentarios=2" in primeira.content.decode()
+    # Sem <select> com todos os usuários: só o autor de cada linha
+    assert "comentarista-0" not in primeira.content.decode()
+    assert "comentarista-0" in segunda.content.decode()
+
+
+@pytest.mark.django_db
+def test_inline_de_comentarios_deve_salvar_a_pagina_atual(
+    admin_client, artigo_com_comentarios_fixture, settings
+):
+    # Ao salvar o POST o Django valida o autor (ModelChoiceField e
+    # ForeignKey.validate) e grava cada linha enviada: são queries por linha,
+    # limitadas à página do inline (mais o autor do artigo e o usuário
+    # logado), não ao total de comentários
+    settings.BLOG_N1_LIMITE = TAMANHO_PAGINA_COMENTARIOS_INLINE + 2
+    artigo = artigo_com_comentarios_fixture(25)
+    url = reverse("admin:blog_artigo_change", args=[artigo.pk])
+    response = admin_client.get(url, {"pagina_comentarios": 2})
+    formset = response.context["inline_admin_formsets"][0].formset
+    dados = {
+        "titulo": artigo.titulo,
+        "slug": artigo.slug,
+        "autor": artigo.autor.pk,
+        "conteudo": artigo.conteudo,
+        "resumo": artigo.resumo,
+        "publicado": "on",
+        "comentarios-TOTAL_FORMS": len(formset.forms),
+        "comentarios-INITIAL_FORMS": len(formset.forms),
+        "comentarios-MIN_NUM_FORMS": 0,
+        "comentarios-MAX_NUM_FORMS": 1000,
+    }
+    for indice, form in enumerate(formset.forms):
+        dados[f"comentarios-{indice}-id"] = form.instance.pk
+        dados[f"comentarios-{indice}-artigo"] = artigo.pk
+        dados[f"comentarios-{indice}-autor"] = form.instance.autor_id
+    # Todos da página desaprovados (checkbox ausente)
+
+    response = admin_client.post(f"{url}?pagina_comentarios=2", dados)
+
+    assert response.status_code == 302
+    assert Comentario.objects.filter(aprovado=False).count() == 5
+    artigo.refresh_from_db()
+    assert artigo.total_comentarios_aprovados == 20
+
+
+@pytest.mark.django_db
+def test_previa_do_inline_deve_vir_do_banco_sem_o_texto_completo(
+    rf, admin_user, artigo_com_comentarios_fixture
+):
+    artigo = artigo_com_comentarios_fixture(1)
+    Comentario.objects.update(texto="<p>" + "palavra " * 100 + "</p>")
+    inline = ComentarioInline(Artigo, site)
+    request = rf.get("/")
+    request.user = admin_user
+
+    comentario = inline.get_queryset(request).get(artigo=artigo)
+
+    assert "texto" in comentario.get_deferred_fields()
+    previa = inline.preview_texto(comentario)
+    assert previa.startswith("palavra palavra")
+    assert previa.endswith("...")
+    assert "<" not in previa
+    assert len(previa) == 103
+
+
+@pytest.mark.django_db
+def test_acao_de_rejeitar_deve_moderar_toda_a_selecao(admin_client, artigos_fixture):
+    artigos = artigos_fixture(3)
+    url = reverse("admin:blog_comentario_changelist")
+
+    response = admin_client.post(
+        f"{url}?aprovado__exact=1",
+        {
+            "action": "rejeitar",
+            "select_across": "1",
+            "index": "0",
+            "_selected_action": [Comentario.objects.first().pk],
+        },
+    )
+
+    assert response.status_code == 302
+    assert not Comentario.objects.filter(aprovado=True).exists()
+    assert all(
+        artigo.total_comentarios_aprovados == 0
+        for artigo in Artigo.objects.filter(pk__in=[a.pk for a in artigos])
+    )
+
+
+@pytest.mark.django_db
+def test_acao_de_publicar_deve_publicar_os_selecionados(admin_client, artigos_fixture):
+    artigo = artigos_fixture(2)[0]
+    Artigo.objects.update(publicado=False, data_publicacao=None)
+
+    admin_client.post(
+        reverse("admin:blog_artigo_changelist"),
+        {"action": "publicar", "index": "0", "_selected_action": [artigo.pk]},
+    )
+
+    assert list(Artigo.objects.filter(publicado=True)) == [artigo]
+    artigo.refresh_from_db()
+    assert artigo.data_publicacao is not None
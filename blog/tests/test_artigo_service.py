@@ -1,15 +1,39 @@
+import tracemalloc
+from dataclasses import FrozenInstanceError
+
 import pytest
+from asgiref.sync import async_to_sync
 from django.contrib.auth.models import User
 from freezegun import freeze_time
 from model_bakery import baker
 from pytest_django.asserts import assertNumQueries
 
-from blog.dto import ArtigoDTO, ArtigoListDTO, AutorDTO, ComentarioDTO, TagDTO
+from blog.dto import (
+    ArtigoDTO,
+    ArtigoListDTO,
+    AutorDTO,
+    ComentarioDTO,
+    PaginaComentariosDTO,
+    TagDTO,
+)
 from blog.models import Artigo, Comentario, Tag
 from blog.services.artigo_service import (
+    aobter_artigo_dto_por_slug,
+    aobter_lista_artigos_dto,
+    aobter_pagina_artigos_dto,
+    aobter_validadores_artigo,
+    aobter_validadores_lista_artigos,
+    iterar_artigos_dto,
     obter_artigo_dto_por_slug,
     obter_lista_artigos_dto,
+    obter_lista_artigos_dto_por_valores,
+    obter_pagina_artigos_dto,
+    obter_pagina_comentarios_dto,
+    obter_validadores_artigo,
+    obter_validadores_lista_artigos,
 )
+from blog.services.cursor import CursorInvalido, codificar_cursor
+from blog.services.moderacao_service import aprovar_comentarios, despublicar_artigos
 
 
 @pytest.fixture
@@ -34,6 +58,14 @@ def tag_fixture():
     return _wrapper
 
 
+@pytest.fixture(
+    params=[obter_lista_artigos_dto, obter_lista_artigos_dto_por_valores],
+    ids=["modelos", "valores"],
+)
+def obter_lista(request):
+    return request.param
+
+
 @pytest.fixture
 def artigo_fixture(user_fixture, tag_fixture):
     def _wrapper(
@@ -148,11 +180,11 @@ def test_retorna_dto_sem_comentarios(
 
 
 @pytest.mark.django_db
-def test_retorna_lista_com_queries_otimizadas(artigo_fixture):
+def test_retorna_lista_com_queries_otimizadas(artigo_fixture, obter_lista):
     artigo_fixture()
     # Uma query para o artigo e uma query para as tags
     with assertNumQueries(2):
-        artigos = obter_lista_artigos_dto()
+        artigos = obter_lista()
 
     assert len(artigos) == 1
     assert isinstance(artigos[0], ArtigoListDTO)
@@ -165,13 +197,109 @@ def test_retorna_lista_com_queries_otimizadas(artigo_fixture):
 
 
 @pytest.mark.django_db
-def test_retorna_lista_vazia_quando_sem_artigos():
+def test_retorna_lista_vazia_quando_sem_artigos(obter_lista):
     with assertNumQueries(1):
-        artigos = obter_lista_artigos_dto()
+        artigos = obter_lista()
 
     assert len(artigos) == 0
 
 
+@pytest.mark.django_db
+def test_lista_por_valores_igual_a_lista_por_modelos(
+    artigos_paginados_fixture, artigo_fixture, tag_fixture, comentario_fixture
+):
+    artigos_paginados_fixture(5, sem_publicacao=2)
+    autor = baker.make(User, username="sem-nome")
+    artigo = artigo_fixture(
+        slug="varias-tags",
+        tags=[tag_fixture("Zope", "zope"), tag_fixture("Asyncio", "asyncio")],
+        autor_param=autor,
+    )
+    comentario_fixture(
+        texto="<p>Oi</p>", quantity=2, artigo_param=artigo, autor_param=autor
+    )
+    artigo_fixture(
+        slug="rascunho",
+        publicado=False,
+        tags=[tag_fixture("Rascunho", "rascunho")],
+        autor_param=autor,
+    )
+
+    assert obter_lista_artigos_dto_por_valores() == obter_lista_artigos_dto()
+
+
+@pytest.mark.django_db
+def test_autores_e_tags_iguais_compartilham_o_mesmo_dto(
+    user_fixture, tag_fixture, artigo_fixture, obter_lista
+):
+    user = user_fixture()
+    tag = tag_fixture()
+    artigo_fixture(slug="primeiro", autor_param=user, tags=[tag])
+    artigo_fixture(slug="segundo", autor_param=user, tags=[tag])
+
+    primeiro, segundo = obter_lista()
+
+    assert primeiro.autor is segundo.autor
+    assert primeiro.tags[0] is segundo.tags[0]
+
+
+def test_dtos_sao_imutaveis_e_sem_dict():
+    autor = AutorDTO(username="testuser", first_name="Test", last_name="User")
+
+    with pytest.raises(FrozenInstanceError):
+        autor.username = "outro"
+    assert not hasattr(autor, "__dict__")
+    assert autor.full_name == "Test User"
+
+
+@pytest.mark.django_db
+def test_memoria_da_lista_com_dez_mil_artigos():
+    autores = User.objects.bulk_create(
+        User(username=f"autor-{indice}", first_name="Autor", last_name=str(indice))
+        for indice in range(5)
+    )
+    tags = Tag.objects.bulk_create(
+        Tag(nome=f"Tag {indice}", slug=f"tag-{indice}") for indice in range(20)
+    )
+    artigos = Artigo.objects.bulk_create(
+        (
+            Artigo(
+                titulo=f"Artigo {indice}",
+                slug=f"artigo-{indice}",
+                autor=autores[indice % 5],
+                conteudo="",
+                resumo="<p>Resumo</p>",
+                publicado=True,
+            )
+            for indice in range(10_000)
+        ),
+        batch_size=1000,
+    )
+    Artigo.tags.through.objects.bulk_create(
+        (
+            Artigo.tags.through(artigo_id=artigo.pk, tag_id=tags[(indice + j) % 20].pk)
+            for indice, artigo in enumerate(artigos)
+            for j in range(3)
+        ),
+        batch_size=1000,
+    )
+    del artigos
+
+    tracemalloc.start()
+    try:
+        lista = obter_lista_artigos_dto_por_valores()
+        retido, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # Com __dict__ e um AutorDTO/TagDTO por artigo eram ~1100 bytes por artigo;
+    # o id e a data_atualizacao (chave do fragmento do card) somam ~100
+    assert len(lista) == 10_000
+    assert len({id(artigo.autor) for artigo in lista}) == 5
+    assert len({id(tag) for artigo in lista for tag in artigo.tags}) == 20
+    assert retido / len(lista) < 700
+
+
 @pytest.mark.django_db
 def test_filtra_comentarios_nao_aprovados(
     artigo_fixture,
@@ -219,6 +347,7 @@ def test_ordena_por_data_publicacao(
     user_fixture,
     tag_fixture,
     artigo_fixture,
+    obter_lista,
 ):
     user = user_fixture()
     tag = tag_fixture()
@@ -237,7 +366,7 @@ def test_ordena_por_data_publicacao(
             tags=[tag],
         )
 
-    artigos = obter_lista_artigos_dto()
+    artigos = obter_lista()
 
     assert len(artigos) == 2
     assert artigos[0].titulo == "Artigo Recente"
@@ -250,6 +379,7 @@ def test_ordena_por_data_criacao_quando_sem_publicacao(
     user_fixture,
     tag_fixture,
     artigo_fixture,
+    obter_lista,
 ):
     user = user_fixture()
     tag = tag_fixture()
@@ -269,7 +399,7 @@ def test_ordena_por_data_criacao_quando_sem_publicacao(
             tags=[tag],
         )
 
-    artigos = obter_lista_artigos_dto()
+    artigos = obter_lista()
 
     assert len(artigos) == 2
     assert artigos[0].titulo == "Artigo Segundo"
@@ -323,3 +453,351 @@ def test_levanta_doesnotexist_quando_artigo_nao_publicado(
 
     with pytest.raises(Artigo.DoesNotExist):
         obter_artigo_dto_por_slug(artigo.slug)
+
+
+@pytest.fixture
+def artigos_paginados_fixture(user_fixture, tag_fixture):
+    def _wrapper(quantidade: int, sem_publicacao: int = 0):
+        user = user_fixture()
+        tag = tag_fixture()
+        artigos = []
+        for indice in range(quantidade):
+            with freeze_time(f"2024-01-01 10:{indice:02d}:00"):
+                artigo = baker.make(
+                    Artigo,
+                    titulo=f"Artigo {indice}",
+                    slug=f"artigo-{indice}",
+                    autor=user,
+                    conteudo="<p>Conteúdo</p>",
+                    resumo="<p>Resumo</p>",
+                    publicado=True,
+                )
+            if indice >= sem_publicacao:
+                # Publicação em ordem inversa à criação para exercitar a chave
+                Artigo.objects.filter(pk=artigo.pk).update(
+                    data_publicacao=artigo.data_criacao.replace(year=2025)
+                )
+            artigo.tags.add(tag)
+            artigos.append(artigo)
+        return artigos
+
+    return _wrapper
+
+
+def _percorrer_paginas(tamanho: int) -> list[list[str]]:
+    paginas = []
+    cursor = None
+    while True:
+        pagina = obter_pagina_artigos_dto(cursor, tamanho=tamanho)
+        paginas.append([artigo.titulo for artigo in pagina.artigos])
+        if pagina.proximo_cursor is None:
+            return paginas
+        cursor = pagina.proximo_cursor
+
+
+@pytest.mark.django_db
+def test_paginas_seguem_mesma_ordem_da_lista_completa(artigos_paginados_fixture):
+    artigos_paginados_fixture(7, sem_publicacao=3)
+
+    paginas = _percorrer_paginas(tamanho=2)
+
+    assert [len(pagina) for pagina in paginas] == [2, 2, 2, 1]
+    assert [titulo for pagina in paginas for titulo in pagina] == [
+        artigo.titulo for artigo in obter_lista_artigos_dto()
+    ]
+
+
+@pytest.mark.django_db
+def test_pagina_profunda_custa_as_mesmas_queries(artigos_paginados_fixture):
+    artigos_paginados_fixture(9, sem_publicacao=4)
+    cursor = None
+    for _ in range(5):
+        with assertNumQueries(2):
+            pagina = obter_pagina_artigos_dto(cursor, tamanho=2)
+        cursor = pagina.proximo_cursor
+
+    assert cursor is None
+
+
+@pytest.mark.django_db
+def test_cursor_anterior_volta_para_pagina_anterior(artigos_paginados_fixture):
+    artigos_paginados_fixture(6, sem_publicacao=3)
+    primeira = obter_pagina_artigos_dto(tamanho=2)
+    segunda = obter_pagina_artigos_dto(primeira.proximo_cursor, tamanho=2)
+    terceira = obter_pagina_artigos_dto(segunda.proximo_cursor, tamanho=2)
+
+    volta_segunda = obter_pagina_artigos_dto(terceira.cursor_anterior, tamanho=2)
+    volta_primeira = obter_pagina_artigos_dto(volta_segunda.cursor_anterior, tamanho=2)
+
+    assert primeira.cursor_anterior is None
+    assert volta_segunda.artigos == segunda.artigos
+    assert volta_primeira.artigos == primeira.artigos
+    assert volta_primeira.cursor_anterior is None
+    assert volta_primeira.proximo_cursor is not None
+
+
+@pytest.mark.django_db
+def test_pagina_vazia_quando_sem_artigos():
+    with assertNumQueries(1):
+        pagina = obter_pagina_artigos_dto()
+
+    assert pagina.artigos == []
+    assert pagina.proximo_cursor is None
+    assert pagina.cursor_anterior is None
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("cursor", ["lixo", "WyJwcm94aW1vIl0", "WzEsMiwzLDRd"])
+def test_levanta_cursor_invalido(cursor):
+    with pytest.raises(CursorInvalido):
+        obter_pagina_artigos_dto(cursor)
+
+
+@pytest.mark.django_db
+def test_iterador_produz_mesma_lista_com_prefetch_por_lote(
+    artigos_paginados_fixture,
+):
+    artigos_paginados_fixture(5, sem_publicacao=2)
+
+    # Uma query para os artigos e uma query de tags por lote de 2 (3 lotes)
+    with assertNumQueries(4):
+        artigos = list(iterar_artigos_dto(chunk_size=2))
+
+    assert artigos == obter_lista_artigos_dto()
+
+
+@pytest.mark.django_db
+def test_validadores_da_lista_custam_uma_query(artigo_fixture):
+    with freeze_time("2024-01-01"):
+        artigo = artigo_fixture()
+        artigo.refresh_from_db()
+
+        with assertNumQueries(1):
+            validadores = obter_validadores_lista_artigos()
+
+    assert validadores.ultima_modificacao == artigo.data_atualizacao
+    assert validadores.etag.startswith('"')
+
+
+@pytest.mark.django_db
+def test_validadores_da_lista_mudam_quando_artigo_e_despublicado(
+    user_fixture, tag_fixture, artigo_fixture
+):
+    user = user_fixture()
+    tag = tag_fixture()
+    with freeze_time("2024-01-01"):
+        antigo = artigo_fixture(slug="antigo", autor_param=user, tags=[tag])
+    artigo_fixture(slug="recente", autor_param=user, tags=[tag])
+    antes = obter_validadores_lista_artigos()
+
+    despublicar_artigos(Artigo.objects.filter(pk=antigo.pk))
+
+    depois = obter_validadores_lista_artigos()
+    assert depois.etag != antes.etag
+    # Sem isso, quem só manda If-Modified-Since receberia 304
+    assert depois.ultima_modificacao > antes.ultima_modificacao
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "retirar",
+    [
+        lambda artigo: artigo.delete(),
+        lambda artigo: setattr(artigo, "publicado", False) or artigo.save(),
+    ],
+    ids=["apagado", "despublicado_no_admin"],
+)
+def test_last_modified_da_lista_avanca_quando_artigo_sai_dela(
+    user_fixture, tag_fixture, artigo_fixture, retirar
+):
+    user = user_fixture()
+    tag = tag_fixture()
+    with freeze_time("2024-01-01"):
+        antigo = artigo_fixture(slug="antigo", autor_param=user, tags=[tag])
+    artigo_fixture(slug="recente", autor_param=user, tags=[tag])
+    antes = obter_validadores_lista_artigos()
+
+    retirar(antigo)
+
+    assert obter_validadores_lista_artigos().ultima_modificacao > (
+        antes.ultima_modificacao
+    )
+
+
+@pytest.mark.django_db
+def test_validadores_do_artigo_custam_uma_query(artigo_fixture, comentario_fixture):
+    artigo = artigo_fixture()
+    with freeze_time("2030-01-01"):
+        comentario = comentario_fixture(
+            texto="<p>Comentário</p>", artigo_param=artigo, autor_param=artigo.autor
+        )
+
+    with assertNumQueries(1) as contexto:
+        validadores = obter_validadores_artigo(artigo.slug)
+
+    assert validadores.ultima_modificacao == comentario.data_criacao
+    # Sem agregar os comentários: o custo não cresce com eles
+    assert "blog_comentario" not in contexto.captured_queries[0]["sql"]
+
+
+@pytest.mark.django_db
+def test_validadores_do_artigo_mudam_quando_comentario_e_aprovado(
+    artigo_fixture, comentario_fixture
+):
+    artigo = artigo_fixture()
+    comentario = comentario_fixture(
+        texto="<p>Comentário</p>",
+        aprovado=False,
+        artigo_param=artigo,
+        autor_param=artigo.autor,
+    )
+    antes = obter_validadores_artigo(artigo.slug)
+
+    aprovar_comentarios(Comentario.objects.filter(pk=comentario.pk))
+
+    assert obter_validadores_artigo(artigo.slug).etag != antes.etag
+
+
+@pytest.mark.django_db
+def test_validadores_do_artigo_mudam_quando_comentario_visivel_e_editado(
+    artigo_fixture, comentario_fixture
+):
+    with freeze_time("2024-01-01"):
+        artigo = artigo_fixture()
+        comentario = comentario_fixture(
+            texto="<p>Comentário</p>", artigo_param=artigo, autor_param=artigo.autor
+        )
+    antes = obter_validadores_artigo(artigo.slug)
+
+    comentario.texto = "<p>Comentário corrigido</p>"
+    comentario.save()
+
+    assert obter_validadores_artigo(artigo.slug).etag != antes.etag
+
+
+@pytest.mark.django_db
+def test_validadores_do_artigo_mudam_quando_tags_mudam(artigo_fixture, tag_fixture):
+    with freeze_time("2024-01-01"):
+        artigo = artigo_fixture()
+    antes = obter_validadores_artigo(artigo.slug)
+
+    artigo.tags.add(tag_fixture(nome="Django", slug="django"))
+
+    depois = obter_validadores_artigo(artigo.slug)
+    assert depois.etag != antes.etag
+    assert depois.ultima_modificacao > antes.ultima_modificacao
+
+
+@pytest.mark.django_db
+def test_validadores_do_artigo_inexistente_sao_none():
+    assert obter_validadores_artigo("slug-inexistente") is None
+
+
+@pytest.mark.django_db
+def test_versoes_async_retornam_o_mesmo_que_as_sincronas(
+    artigos_paginados_fixture, comentario_fixture
+):
+    artigos = artigos_paginados_fixture(5, sem_publicacao=2)
+    slug = artigos[0].slug
+    comentario_fixture(
+        texto="<p>Comentário</p>",
+        artigo_param=artigos[0],
+        autor_param=artigos[0].autor,
+    )
+    primeira_pagina = obter_pagina_artigos_dto(tamanho=2)
+
+    assert async_to_sync(aobter_lista_artigos_dto)() == obter_lista_artigos_dto()
+    assert async_to_sync(aobter_pagina_artigos_dto)(tamanho=2) == primeira_pagina
+    assert async_to_sync(aobter_pagina_artigos_dto)(
+        primeira_pagina.proximo_cursor, tamanho=2
+    ) == obter_pagina_artigos_dto(primeira_pagina.proximo_cursor, tamanho=2)
+    assert async_to_sync(aobter_artigo_dto_por_slug)(slug) == (
+        obter_artigo_dto_por_slug(slug)
+    )
+    assert async_to_sync(aobter_validadores_lista_artigos)() == (
+        obter_validadores_lista_artigos()
+    )
+    assert async_to_sync(aobter_validadores_artigo)(slug) == (
+        obter_validadores_artigo(slug)
+    )
+
+
+@pytest.mark.django_db
+def test_versao_async_levanta_doesnotexist_quando_artigo_inexistente():
+    with pytest.raises(Artigo.DoesNotExist):
+        async_to_sync(aobter_artigo_dto_por_slug)("nao-existe")
+
+
+@pytest.mark.django_db
+def test_detalhe_traz_so_a_primeira_pagina_de_comentarios(
+    artigo_fixture, comentario_fixture
+):
+    artigo = artigo_fixture()
+    comentario_fixture(
+        texto="<p>Comentário</p>",
+        quantity=25,
+        artigo_param=artigo,
+        autor_param=artigo.autor,
+    )
+
+    # Artigo+autor, tags e uma página de comentários+autores
+    with assertNumQueries(3):
+        artigo_dto = obter_artigo_dto_por_slug(artigo.slug)
+
+    assert len(artigo_dto.comentarios) == 20
+    assert artigo_dto.total_comentarios == 25
+    assert artigo_dto.proximo_cursor_comentarios is not None
+
+
+@pytest.mark.django_db
+@freeze_time("2024-01-01")
+def test_paginas_de_comentarios_cobrem_todos_em_ordem(
+    artigo_fixture, comentario_fixture
+):
+    artigo = artigo_fixture()
+    # Mesma data_criacao para todos: o desempate é pelo id
+    for indice in range(5):
+        comentario_fixture(
+            texto=f"<p>Comentário {indice}</p>",
+            artigo_param=artigo,
+            autor_param=artigo.autor,
+        )
+    esperado = list(
+        Comentario.objects.order_by("data_criacao", "id").values_list(
+            "texto", flat=True
+        )
+    )
+
+    vistos = []
+    cursor = None
+    for _ in range(3):
+        with assertNumQueries(1):
+            pagina = obter_pagina_comentarios_dto(artigo.slug, cursor, tamanho=2)
+        assert isinstance(pagina, PaginaComentariosDTO)
+        vistos.extend(comentario.texto for comentario in pagina.comentarios)
+        cursor = pagina.proximo_cursor
+
+    assert cursor is None
+    assert vistos == esperado
+
+
+@pytest.mark.django_db
+def test_pagina_de_comentarios_de_artigo_inexistente_levanta_doesnotexist(
+    artigo_fixture,
+):
+    artigo_fixture(publicado=False)
+
+    with pytest.raises(Artigo.DoesNotExist):
+        obter_pagina_comentarios_dto("artigo-de-teste")
+
+
+@pytest.mark.django_db
+def test_pagina_de_comentarios_com_cursor_invalido(artigo_fixture):
+    artigo = artigo_fixture()
+
+    with pytest.raises(CursorInvalido):
+        obter_pagina_comentarios_dto(artigo.slug, "lixo")
+    with pytest.raises(CursorInvalido):
+        obter_pagina_comentarios_dto(
+            artigo.slug, codificar_cursor("anterior", "2024-01-01T00:00:00", "x")
+        )
@@ -0,0 +1,196 @@
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.urls import reverse
+from model_bakery import baker
+from pytest_django.asserts import assertNumQueries
+
+from blog.dto import ResultadoBuscaDTO
+from blog.models import Artigo, Tag
+from blog.services.busca_service import (
+    TABELA_BUSCA,
+    buscar_artigos,
+    expressao_fts,
+    filtrar_por_busca,
+    reindexar_tudo,
+)
+
+
+def _linhas_no_indice() -> int:
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT count(*) FROM {TABELA_BUSCA}")
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+def test_busca_em_conteudo_sem_html(artigo_fixture):
+    artigo_fixture(conteudo="<p>Use <strong>select_related</strong> &amp; cia</p>")
+
+    resultados = buscar_artigos("select_related")
+
+    assert len(resultados) == 1
+    assert isinstance(resultados[0], ResultadoBuscaDTO)
+    assert resultados[0].slug == "artigo-de-teste"
+    assert "<strong>" not in resultados[0].trecho
+    assert "<mark>select_related</mark>" in resultados[0].trecho
+
+
+@pytest.mark.django_db
+def test_titulo_pesa_mais_que_conteudo(artigo_fixture):
+    artigo_fixture(
+        titulo="Dicas gerais",
+        slug="no-conteudo",
+        conteudo="<p>Falamos de prefetch aqui</p>",
+    )
+    artigo_fixture(titulo="Tudo sobre prefetch", slug="no-titulo")
+
+    resultados = buscar_artigos("prefetch")
+
+    assert [resultado.slug for resultado in resultados] == ["no-titulo", "no-conteudo"]
+    assert resultados[0].relevancia > resultados[1].relevancia
+
+
+@pytest.mark.django_db
+def test_busca_ignora_acentos_e_aceita_prefixo(artigo_fixture):
+    artigo_fixture(titulo="Otimização de consultas")
+
+    assert len(buscar_artigos("otimizacao")) == 1
+    assert len(buscar_artigos("consul")) == 1
+
+
+@pytest.mark.django_db
+def test_busca_escapa_html_do_trecho(artigo_fixture):
+    artigo_fixture(conteudo="<p>&lt;script&gt;alerta&lt;/script&gt;</p>")
+
+    trecho = buscar_artigos("alerta")[0].trecho
+
+    assert "<script>" not in trecho
+    assert "&lt;script&gt;" in trecho
+
+
+@pytest.mark.django_db
+def test_busca_ignora_artigos_nao_publicados(artigo_fixture):
+    artigo_fixture(titulo="Rascunho secreto", publicado=False)
+
+    assert buscar_artigos("secreto") == []
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("termo", ["", "   ", '"', "AND OR NOT", "a*b(c)"])
+def test_busca_nao_quebra_com_sintaxe_do_fts(artigo_fixture, termo):
+    artigo_fixture()
+
+    assert isinstance(buscar_artigos(termo), list)
+
+
+def test_expressao_fts_coloca_palavras_entre_aspas():
+    assert expressao_fts('orm "django"') == '"orm"* "django"*'
+
+
+@pytest.mark.django_db
+def test_editar_artigo_atualiza_indice(artigo_fixture):
+    artigo = artigo_fixture(titulo="Título antigo")
+
+    artigo.titulo = "Título renovado"
+    artigo.save()
+
+    assert buscar_artigos("antigo") == []
+    assert len(buscar_artigos("renovado")) == 1
+    assert _linhas_no_indice() == 1
+
+
+@pytest.mark.django_db
+def test_tags_entram_no_indice(artigo_fixture):
+    tag = baker.make(Tag, nome="Performance", slug="performance")
+    artigo = artigo_fixture(tags=[tag])
+    assert len(buscar_artigos("performance")) == 1
+
+    tag.nome = "Velocidade"
+    tag.save()
+    assert len(buscar_artigos("velocidade")) == 1
+
+    artigo.tags.clear()
+    assert buscar_artigos("velocidade") == []
+
+
+@pytest.mark.django_db
+def test_apagar_artigo_remove_do_indice(artigo_fixture):
+    artigo = artigo_fixture()
+
+    artigo.delete()
+
+    assert _linhas_no_indice() == 0
+
+
+@pytest.mark.django_db
+def test_reindexar_tudo_reconstroi_indice(artigo_fixture):
+    artigo_fixture(slug="um")
+    artigo_fixture(slug="dois")
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABELA_BUSCA}")
+
+    assert reindexar_tudo() == 2
+    assert len(buscar_artigos("artigo")) == 2
+
+
+@pytest.mark.django_db
+def test_busca_do_admin_usa_indice(admin_client, artigo_fixture):
+    artigo_fixture(titulo="Primeiro", slug="primeiro", conteudo="<p>janelas</p>")
+    artigo_fixture(titulo="Segundo", slug="segundo")
+    url = reverse("admin:blog_artigo_changelist")
+
+    response = admin_client.get(url, {"q": "janela"})
+
+    assert response.status_code == 200
+    assert list(response.context["cl"].result_list.values_list("slug", flat=True)) == [
+        "primeiro"
+    ]
+
+
+@pytest.mark.django_db
+def test_busca_do_admin_sem_palavras_usa_busca_padrao(admin_client, artigo_fixture):
+    artigo_fixture(titulo="Pare!!", slug="pare")
+    artigo_fixture(titulo="Segundo", slug="segundo")
+    url = reverse("admin:blog_artigo_changelist")
+
+    response = admin_client.get(url, {"q": "!!"})
+
+    assert response.status_code == 200
+    assert list(response.context["cl"].result_list.values_list("slug", flat=True)) == [
+        "pare"
+    ]
+
+
+@pytest.mark.django_db
+def test_filtrar_por_busca_sem_palavras_nao_consulta_o_indice(artigo_fixture):
+    artigo_fixture()
+
+    with assertNumQueries(0):
+        assert list(filtrar_por_busca(Artigo.objects.all(), "!!")) == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migration_do_indice_indexa_os_artigos_existentes():
+    antes = [("blog", "0005_artigo_total_comentarios_aprovados")]
+    executor = MigrationExecutor(connection)
+    executor.migrate(antes)
+    # Modelos históricos não disparam os sinais: o índice só vem da migration
+    historico = executor.loader.project_state(antes).apps
+    historico.get_model("blog", "Artigo").objects.create(
+        titulo="Janelas",
+        slug="janelas",
+        autor=historico.get_model("auth", "User").objects.create(username="autor"),
+        conteudo="<p>Sobre janelas</p>",
+        resumo="<p>Resumo</p>",
+        publicado=True,
+    )
+
+    executor = MigrationExecutor(connection)
+    executor.migrate(executor.loader.graph.leaf_nodes())
+
+    assert [resultado.slug for resultado in buscar_artigos("janela")] == ["janelas"]
+    # Mesmo rowid dos sinais: a edição substitui a linha da migration
+    artigo = Artigo.objects.get(slug="janelas")
+    artigo.titulo = "Portas"
+    artigo.save()
+    assert [resultado.titulo for resultado in buscar_artigos("janela")] == ["Portas"]
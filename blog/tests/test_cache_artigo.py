@@ -0,0 +1,199 @@
+import importlib
+
+import pytest
+from django.core.cache import cache
+from pytest_django.asserts import assertNumQueries
+
+from blog.models import Artigo
+from blog.services.artigo_service import obter_artigo_dto_por_slug
+from blog.services.cache_artigo import CacheArtigoDTO, cache_artigo_dto
+
+
+@pytest.mark.django_db
+def test_acerto_no_cache_nao_faz_queries(artigo_fixture, obter_cacheado):
+    artigo = artigo_fixture()
+    primeiro = obter_cacheado(artigo.slug)
+
+    with assertNumQueries(0):
+        segundo = obter_cacheado(artigo.slug)
+
+    assert segundo == primeiro
+    estatisticas = cache_artigo_dto.estatisticas()
+    assert estatisticas.falhas == 1
+    assert estatisticas.acertos_locais == 1
+
+
+@pytest.mark.django_db
+def test_acerto_no_cache_compartilhado_repopula_lru(artigo_fixture, obter_cacheado):
+    artigo = artigo_fixture()
+    obter_cacheado(artigo.slug)
+    outro_processo = CacheArtigoDTO(tamanho_maximo=10, timeout=None)
+
+    with assertNumQueries(0):
+        outro_processo.obter_ou_carregar(artigo.slug, obter_artigo_dto_por_slug)
+        outro_processo.obter_ou_carregar(artigo.slug, obter_artigo_dto_por_slug)
+
+    estatisticas = outro_processo.estatisticas()
+    assert estatisticas.acertos_compartilhados == 1
+    assert estatisticas.acertos_locais == 1
+    assert estatisticas.falhas == 0
+
+
+@pytest.mark.django_db
+def test_invalidacao_em_outro_processo_descarta_o_lru_local(artigo_fixture):
+    artigo = artigo_fixture()
+    este_processo = CacheArtigoDTO(tamanho_maximo=10, timeout=None)
+    outro_processo = CacheArtigoDTO(tamanho_maximo=10, timeout=None)
+    este_processo.obter_ou_carregar(artigo.slug, obter_artigo_dto_por_slug)
+    Artigo.objects.filter(pk=artigo.pk).update(titulo="Título Novo")
+
+    outro_processo.invalidar([artigo.slug])
+
+    artigo_dto = este_processo.obter_ou_carregar(artigo.slug, obter_artigo_dto_por_slug)
+    assert artigo_dto.titulo == "Título Novo"
+    assert este_processo.estatisticas().falhas == 2
+
+
+def test_producao_deve_usar_um_cache_padrao_compartilhado(monkeypatch):
+    # As versões que invalidam o LRU dos outros workers vivem no cache padrão:
+    # um LocMemCache por processo não as compartilharia
+    monkeypatch.setenv("DJANGO_SECRET_KEY", "teste")
+    settings_producao = importlib.import_module("config.settings_producao")
+
+    backend = settings_producao.CACHES["default"]["BACKEND"]
+    assert backend != "django.core.cache.backends.locmem.LocMemCache"
+
+
+@pytest.mark.django_db
+def test_lru_despeja_o_menos_usado(artigo_fixture, tag_fixture):
+    tag = tag_fixture()
+    slugs = [artigo_fixture(slug=f"artigo-{i}", tags=[tag]).slug for i in range(3)]
+    lru = CacheArtigoDTO(tamanho_maximo=2, timeout=None)
+    for slug in slugs:
+        lru.obter_ou_carregar(slug, obter_artigo_dto_por_slug)
+    cache.clear()
+
+    with assertNumQueries(3):
+        lru.obter_ou_carregar(slugs[0], obter_artigo_dto_por_slug)
+
+    assert lru.estatisticas().despejos == 2
+
+
+@pytest.mark.django_db
+def test_artigo_nao_encontrado_nao_e_cacheado(obter_cacheado):
+    with pytest.raises(Artigo.DoesNotExist):
+        obter_cacheado("slug-inexistente")
+
+    assert cache.get("blog:artigo_dto:slug-inexistente") is None
+
+
+@pytest.mark.django_db
+def test_salvar_artigo_invalida_cache(artigo_fixture, obter_cacheado):
+    artigo = artigo_fixture()
+    obter_cacheado(artigo.slug)
+
+    artigo.titulo = "Título Novo"
+    artigo.save()
+
+    assert obter_cacheado(artigo.slug).titulo == "Título Novo"
+
+
+@pytest.mark.django_db
+def test_trocar_slug_invalida_slug_anterior(artigo_fixture, obter_cacheado):
+    artigo = artigo_fixture()
+    obter_cacheado("artigo-de-teste")
+
+    artigo.slug = "novo-slug"
+    artigo.save()
+
+    with pytest.raises(Artigo.DoesNotExist):
+        obter_cacheado("artigo-de-teste")
+
+
+@pytest.mark.django_db
+def test_aprovar_comentario_invalida_cache(
+    artigo_fixture, comentario_fixture, obter_cacheado
+):
+    artigo = artigo_fixture()
+    comentario = comentario_fixture(artigo, aprovado=False)
+    assert obter_cacheado(artigo.slug).comentarios == []
+
+    comentario.aprovado = True
+    comentario.save()
+
+    assert len(obter_cacheado(artigo.slug).comentarios) == 1
+
+
+@pytest.mark.django_db
+def test_comentario_novo_nao_aprovado_mantem_cache(
+    artigo_fixture, comentario_fixture, obter_cacheado
+):
+    artigo = artigo_fixture()
+    obter_cacheado(artigo.slug)
+
+    comentario_fixture(artigo, aprovado=False)
+
+    with assertNumQueries(0):
+        obter_cacheado(artigo.slug)
+
+
+@pytest.mark.django_db
+def test_apagar_comentario_aprovado_invalida_cache(
+    artigo_fixture, comentario_fixture, obter_cacheado
+):
+    artigo = artigo_fixture()
+    comentario = comentario_fixture(artigo)
+    assert len(obter_cacheado(artigo.slug).comentarios) == 1
+
+    comentario.delete()
+
+    assert obter_cacheado(artigo.slug).comentarios == []
+
+
+@pytest.mark.django_db
+def test_renomear_tag_invalida_artigos_da_tag(
+    artigo_fixture, tag_fixture, obter_cacheado
+):
+    tag = tag_fixture()
+    artigo = artigo_fixture(tags=[tag])
+    outro = artigo_fixture(slug="outro", tags=[tag_fixture("Django", "django")])
+    obter_cacheado(artigo.slug)
+    obter_cacheado(outro.slug)
+
+    tag.nome = "Python 3"
+    tag.save()
+
+    assert obter_cacheado(artigo.slug).tags[0].nome == "Python 3"
+    with assertNumQueries(0):
+        obter_cacheado(outro.slug)
+
+
+@pytest.mark.django_db
+def test_apagar_tag_invalida_artigos_da_tag(
+    artigo_fixture, tag_fixture, obter_cacheado
+):
+    tag = tag_fixture()
+    artigo = artigo_fixture(tags=[tag])
+    obter_cacheado(artigo.slug)
+
+    tag.delete()
+
+    assert obter_cacheado(artigo.slug).tags == []
+
+
+@pytest.mark.django_db
+def test_alterar_tags_do_artigo_invalida_cache(
+    artigo_fixture, tag_fixture, obter_cacheado
+):
+    artigo = artigo_fixture(tags=[tag_fixture()])
+    django_tag = tag_fixture("Django", "django")
+    obter_cacheado(artigo.slug)
+
+    artigo.tags.add(django_tag)
+    assert len(obter_cacheado(artigo.slug).tags) == 2
+
+    django_tag.artigos.clear()
+    assert len(obter_cacheado(artigo.slug).tags) == 1
+
+    artigo.tags.clear()
+    assert obter_cacheado(artigo.slug).tags == []
@@ -0,0 +1,186 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from pytest_django.asserts import assertNumQueries
+
+from blog.models import Artigo, Comentario
+from blog.services.artigo_service import obter_lista_artigos_dto
+
+
+@pytest.mark.django_db
+def test_criar_comentario_aprovado_incrementa(
+    artigo_fixture, comentario_fixture, total_aprovados
+):
+    artigo = artigo_fixture()
+
+    comentario_fixture(artigo, quantity=2)
+    comentario_fixture(artigo, aprovado=False)
+
+    assert total_aprovados(artigo) == 2
+
+
+@pytest.mark.django_db
+def test_aprovar_e_desaprovar_comentario(
+    artigo_fixture, comentario_fixture, total_aprovados
+):
+    artigo = artigo_fixture()
+    comentario = comentario_fixture(artigo, aprovado=False)
+
+    comentario.aprovado = True
+    comentario.save()
+    assert total_aprovados(artigo) == 1
+
+    comentario.save()
+    assert total_aprovados(artigo) == 1
+
+    comentario.aprovado = False
+    comentario.save()
+    assert total_aprovados(artigo) == 0
+
+
+@pytest.mark.django_db
+def test_aprovar_comentario_carregado_do_banco(
+    artigo_fixture, comentario_fixture, total_aprovados
+):
+    artigo = artigo_fixture()
+    comentario_fixture(artigo, aprovado=False)
+    comentario = Comentario.objects.get()
+
+    # Estado original vem do from_db: nenhuma query extra antes do UPDATE
+    comentario.aprovado = True
+    with assertNumQueries(3):
+        comentario.save()
+
+    assert total_aprovados(artigo) == 1
+
+
+@pytest.mark.django_db
+def test_apagar_comentario_decrementa(
+    artigo_fixture, comentario_fixture, total_aprovados
+):
+    artigo = artigo_fixture()
+    aprovados = comentario_fixture(artigo, quantity=3)
+    comentario_fixture(artigo, aprovado=False)
+
+    aprovados[0].delete()
+    Comentario.objects.filter(aprovado=False).delete()
+
+    assert total_aprovados(artigo) == 2
+
+
+@pytest.mark.django_db
+def test_apagar_artigo_nao_custa_queries_por_comentario(
+    artigo_fixture, comentario_fixture
+):
+    def queries_para_apagar(quantidade: int) -> int:
+        artigo = artigo_fixture(slug=f"artigo-{quantidade}")
+        comentario_fixture(artigo, quantity=quantidade)
+        with CaptureQueriesContext(connection) as contexto:
+            artigo.delete()
+        return len(contexto)
+
+    assert queries_para_apagar(1) == queries_para_apagar(30)
+    assert not Comentario.objects.exists()
+
+
+@pytest.mark.django_db
+def test_apagar_com_contador_divergente_para_baixo_nao_falha(
+    artigo_fixture, comentario_fixture, total_aprovados
+):
+    artigo = artigo_fixture()
+    # bulk_create não dispara os sinais: o contador fica em 0
+    Comentario.objects.bulk_create(
+        Comentario(artigo=artigo, autor=artigo.autor, texto="<p>Oi</p>", aprovado=True)
+        for _ in range(2)
+    )
+
+    Comentario.objects.first().delete()
+    assert total_aprovados(artigo) == 0
+
+    artigo.delete()
+    assert not Artigo.objects.exists()
+
+
+@pytest.mark.django_db
+def test_mover_comentario_entre_artigos(
+    artigo_fixture, comentario_fixture, total_aprovados
+):
+    origem = artigo_fixture()
+    destino = artigo_fixture(slug="destino")
+    comentario = comentario_fixture(origem)
+
+    comentario.artigo = destino
+    comentario.save()
+
+    assert total_aprovados(origem) == 0
+    assert total_aprovados(destino) == 1
+
+
+@pytest.mark.django_db
+def test_salvar_artigo_desatualizado_nao_sobrescreve_contador(
+    artigo_fixture, comentario_fixture, total_aprovados
+):
+    artigo = artigo_fixture()
+    desatualizado = Artigo.objects.get(pk=artigo.pk)
+    comentario_fixture(artigo)
+
+    desatualizado.titulo = "Novo título"
+    desatualizado.save()
+
+    assert total_aprovados(artigo) == 1
+
+
+@pytest.mark.django_db
+def test_list_editable_do_admin_mantem_contador(
+    admin_client, artigo_fixture, comentario_fixture, total_aprovados
+):
+    artigo = artigo_fixture()
+    pendentes = comentario_fixture(artigo, aprovado=False, quantity=2)
+    url = reverse("admin:blog_comentario_changelist")
+
+    response = admin_client.post(
+        url,
+        {
+            "form-TOTAL_FORMS": "2",
+            "form-INITIAL_FORMS": "2",
+            "form-0-id": str(pendentes[0].pk),
+            "form-0-aprovado": "on",
+            "form-1-id": str(pendentes[1].pk),
+            "form-1-aprovado": "on",
+            "_save": "Salvar",
+        },
+    )
+
+    assert response.status_code == 302
+    assert total_aprovados(artigo) == 2
+
+
+@pytest.mark.django_db
+def test_lista_expoe_contador_sem_queries_extras(artigo_fixture, comentario_fixture):
+    artigo = artigo_fixture()
+    comentario_fixture(artigo, quantity=3)
+
+    with assertNumQueries(2):
+        artigos = obter_lista_artigos_dto()
+
+    assert artigos[0].total_comentarios == 3
+
+
+@pytest.mark.django_db
+def test_reconciliar_corrige_divergencias(
+    artigo_fixture, comentario_fixture, total_aprovados
+):
+    artigo = artigo_fixture()
+    correto = artigo_fixture(slug="correto")
+    comentario_fixture(artigo, quantity=2)
+    comentario_fixture(correto)
+    Artigo.objects.filter(pk=artigo.pk).update(total_comentarios_aprovados=7)
+
+    call_command("reconciliar_contadores", "--dry-run")
+    assert total_aprovados(artigo) == 7
+
+    call_command("reconciliar_contadores")
+    assert total_aprovados(artigo) == 2
+    assert total_aprovados(correto) == 1
@@ -0,0 +1,154 @@
+import logging
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory
+from model_bakery import baker
+
+from blog.detector_n1 import (
+    AvisoNMais1,
+    NMais1Detectado,
+    detectar_n_mais_1,
+    normalizar_sql,
+)
+from blog.middleware import DetectorNMais1Middleware
+from blog.models import Artigo, Comentario, Tag
+
+
+@pytest.fixture
+def artigos_fixture():
+    tag = baker.make(Tag, nome="django", slug="django")
+    artigos = []
+    for indice in range(4):
+        artigo = baker.make(
+            Artigo,
+            autor=baker.make(User, username=f"autor-{indice}"),
+            conteudo="<p>Conteúdo</p>",
+            resumo="<p>Resumo</p>",
+            publicado=True,
+        )
+        artigo.tags.add(tag)
+        baker.make(Comentario, artigo=artigo, texto="Comentário", _quantity=2)
+        artigos.append(artigo)
+    return artigos
+
+
+@pytest.mark.django_db
+def test_autor_carregado_no_loop_deve_falhar_com_a_linha_e_a_sugestao(
+    artigos_fixture,
+):
+    with pytest.raises(NMais1Detectado) as erro:
+        with detectar_n_mais_1(limite=3, acao="erro"):
+            for artigo in Artigo.objects.all():
+                artigo.autor.username
+
+    mensagem = str(erro.value)
+    assert "4 queries iguais" in mensagem
+    assert 'Artigo: select_related("autor")' in mensagem
+    assert "test_detector_n1.py" in mensagem
+    assert "artigo.autor.username" in mensagem
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "buscar",
+    [
+        lambda artigo: User.objects.get(pk=artigo.autor_id),
+        lambda item: item.autor.username,
+    ],
+    ids=["busca_direta", "variavel_ambigua"],
+)
+def test_busca_pela_pk_sem_fk_identificavel_nao_deve_sugerir_select_related(
+    artigos_fixture, buscar
+):
+    # User é o alvo de Artigo.autor e de Comentario.autor: sem ver na linha
+    # qual das duas foi acessada, não há o que sugerir
+    with detectar_n_mais_1(limite=3, acao="log") as deteccao:
+        for artigo in Artigo.objects.all():
+            buscar(artigo)
+
+    (relatorio,) = deteccao.relatorios
+    assert relatorio.sugestao is None
+
+
+@pytest.mark.django_db
+def test_select_related_nao_deve_gerar_relatorio(artigos_fixture):
+    with detectar_n_mais_1(limite=3, acao="erro") as deteccao:
+        for artigo in Artigo.objects.select_related("autor"):
+            artigo.autor.username
+
+    assert deteccao.relatorios == []
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "acessar, sugestao",
+    [
+        (lambda artigo: list(artigo.tags.all()), 'Artigo: prefetch_related("tags")'),
+        (
+            lambda artigo: list(artigo.comentarios.all()),
+            'Artigo: prefetch_related("comentarios")',
+        ),
+    ],
+    ids=["many_to_many", "fk_reversa"],
+)
+def test_relacoes_para_muitos_devem_sugerir_prefetch(
+    artigos_fixture, acessar, sugestao
+):
+    with detectar_n_mais_1(limite=3, acao="log") as deteccao:
+        for artigo in Artigo.objects.all():
+            acessar(artigo)
+
+    (relatorio,) = deteccao.relatorios
+    assert relatorio.repeticoes == 4
+    assert relatorio.sugestao == sugestao
+
+
+@pytest.mark.django_db
+def test_acao_log_deve_registrar_o_relatorio(artigos_fixture, caplog):
+    with caplog.at_level(logging.WARNING, logger="blog.detector_n1"):
+        with detectar_n_mais_1(limite=3, acao="log"):
+            for artigo in Artigo.objects.all():
+                artigo.autor.username
+
+    assert "N+1: 4 queries iguais" in caplog.text
+
+
+@pytest.mark.django_db
+def test_acao_avisar_deve_emitir_warning(artigos_fixture):
+    with pytest.warns(AvisoNMais1, match="select_related"):
+        with detectar_n_mais_1(limite=3, acao="avisar"):
+            for artigo in Artigo.objects.all():
+                artigo.autor.username
+
+
+def test_normalizacao_deve_juntar_listas_de_in_e_literais():
+    assert normalizar_sql(
+        "SELECT *  FROM blog_tag\n WHERE id IN (%s, %s, %s) AND nome = 'x' LIMIT 21"
+    ) == normalizar_sql(
+        "SELECT * FROM blog_tag WHERE id IN (%s) AND nome = 'y' LIMIT 5"
+    )
+
+
+@pytest.mark.django_db
+def test_middleware_deve_verificar_cada_request(settings, artigos_fixture):
+    settings.BLOG_N1_ACAO = "erro"
+    settings.BLOG_N1_LIMITE = 3
+
+    def view_com_n_mais_1(request):
+        autores = [artigo.autor.username for artigo in Artigo.objects.all()]
+        return HttpResponse(", ".join(autores))
+
+    middleware = DetectorNMais1Middleware(view_com_n_mais_1)
+
+    with pytest.raises(NMais1Detectado, match=r"test_detector_n1.py:\d+ em "):
+        middleware(RequestFactory().get("/"))
+
+
+def test_middleware_deve_sair_da_pilha_quando_desligado(settings):
+    settings.BLOG_N1_ACAO = None
+
+    with pytest.raises(MiddlewareNotUsed):
+        DetectorNMais1Middleware(lambda request: HttpResponse())
@@ -0,0 +1,171 @@
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from model_bakery import baker
+
+from blog.models import Artigo, Comentario
+from blog.services.artigo_service import TAMANHO_PAGINA_ARTIGOS
+
+
+@pytest.fixture
+def artigos_fixture():
+    def _wrapper(quantidade: int):
+        autor = baker.make(User, username="autor")
+        return [
+            baker.make(
+                Artigo,
+                titulo=f"Artigo {indice}",
+                slug=f"artigo-{indice}",
+                autor=autor,
+                conteudo=f"<p>Conteúdo {indice}</p>",
+                resumo="<p>Resumo</p>",
+                publicado=True,
+            )
+            for indice in range(quantidade)
+        ]
+
+    return _wrapper
+
+
+def _exportar(destino, *argumentos: str) -> str:
+    saida = StringIO()
+    call_command(
+        "export_static",
+        str(destino),
+        "--processos=1",
+        "--lote=2",
+        *argumentos,
+        stdout=saida,
+    )
+    return saida.getvalue()
+
+
+@pytest.mark.django_db
+def test_export_deve_gravar_a_lista_e_o_detalhe(tmp_path, artigos_fixture):
+    artigos_fixture(3)
+
+    saida = _exportar(tmp_path)
+
+    assert "4 páginas renderizadas" in saida
+    assert "Artigo 2" in (tmp_path / "index.html").read_text()
+    assert "Conteúdo 1" in (tmp_path / "artigo-1" / "index.html").read_text()
+    manifesto = json.loads((tmp_path / ".manifesto.json").read_text())
+    assert sorted(manifesto["artigos"]) == ["artigo-0", "artigo-1", "artigo-2"]
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+@pytest.mark.django_db
+def test_export_sem_mudancas_nao_deve_renderizar_nada(tmp_path, artigos_fixture):
+    artigos_fixture(3)
+    _exportar(tmp_path)
+
+    saida = _exportar(tmp_path)
+
+    assert "0 páginas renderizadas, 3 sem mudanças" in saida
+
+
+@pytest.mark.django_db
+def test_export_deve_renderizar_so_o_artigo_alterado_e_a_lista(
+    tmp_path, artigos_fixture
+):
+    artigo = artigos_fixture(3)[0]
+    _exportar(tmp_path)
+    outro = tmp_path / "artigo-1" / "index.html"
+    modificado_antes = outro.stat().st_mtime_ns
+
+    artigo.conteudo = "<p>Versão 2</p>"
+    artigo.save()
+    saida = _exportar(tmp_path)
+
+    assert "2 páginas renderizadas, 2 sem mudanças" in saida
+    assert "Versão 2" in (tmp_path / "artigo-0" / "index.html").read_text()
+    assert outro.stat().st_mtime_ns == modificado_antes
+
+
+@pytest.mark.django_db
+def test_export_deve_renderizar_o_artigo_com_novo_comentario_aprovado(
+    tmp_path, artigos_fixture
+):
+    artigo = artigos_fixture(2)[0]
+    _exportar(tmp_path)
+
+    baker.make(
+        Comentario,
+        artigo=artigo,
+        autor=artigo.autor,
+        texto="<p>Comentário novo</p>",
+        aprovado=True,
+    )
+    saida = _exportar(tmp_path)
+
+    assert "2 páginas renderizadas, 1 sem mudanças" in saida
+    assert "Comentário novo" in (tmp_path / "artigo-0" / "index.html").read_text()
+
+
+@pytest.mark.django_db
+def test_export_deve_remover_o_artigo_despublicado(tmp_path, artigos_fixture):
+    artigo = artigos_fixture(2)[0]
+    _exportar(tmp_path)
+
+    artigo.publicado = False
+    artigo.save()
+    saida = _exportar(tmp_path)
+
+    assert "1 removidas" in saida
+    assert not (tmp_path / "artigo-0").exists()
+    assert "Artigo 0" not in (tmp_path / "index.html").read_text()
+
+
+@pytest.mark.django_db
+def test_export_com_tudo_deve_ignorar_o_manifesto(tmp_path, artigos_fixture):
+    artigos_fixture(2)
+    _exportar(tmp_path)
+
+    saida = _exportar(tmp_path, "--tudo")
+
+    assert "3 páginas renderizadas, 0 sem mudanças" in saida
+
+
+@pytest.mark.django_db
+def test_export_deve_gravar_as_paginas_da_lista_em_caminhos(tmp_path, artigos_fixture):
+    artigos = artigos_fixture(TAMANHO_PAGINA_ARTIGOS + 1)
+
+    saida = _exportar(tmp_path)
+
+    assert f"{TAMANHO_PAGINA_ARTIGOS + 3} páginas renderizadas" in saida
+    primeira = (tmp_path / "index.html").read_text()
+    segunda = tmp_path / "artigos" / "pagina" / "2" / "index.html"
+    # Um CDN ignora a query string: ?cursor= serviria sempre a primeira página
+    assert "?cursor=" not in primeira + segunda.read_text()
+    assert 'href="/artigos/pagina/2/"' in primeira
+    assert 'href="/"' in segunda.read_text()
+    assert "Mais antigos" not in segunda.read_text()
+
+    artigos[0].delete()
+    _exportar(tmp_path)
+
+    assert not segunda.parent.exists()
+    assert "Mais antigos" not in (tmp_path / "index.html").read_text()
+
+
+@pytest.mark.django_db
+def test_export_do_detalhe_nao_deve_apontar_para_o_endpoint_de_comentarios(
+    tmp_path, artigos_fixture, mocker
+):
+    artigo = artigos_fixture(1)[0]
+    baker.make(
+        Comentario,
+        artigo=artigo,
+        autor=artigo.autor,
+        texto="<p>Comentário</p>",
+        aprovado=True,
+        _quantity=3,
+    )
+    mocker.patch("blog.services.artigo_service.TAMANHO_PAGINA_COMENTARIOS", 2)
+
+    _exportar(tmp_path)
+
+    assert "/comentarios/" not in (tmp_path / "artigo-0" / "index.html").read_text()
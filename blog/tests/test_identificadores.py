@@ -0,0 +1,85 @@
+import random
+from datetime import datetime, timezone
+
+import pytest
+from django.contrib.auth.models import User
+from freezegun import freeze_time
+from model_bakery import baker
+
+from blog import identificadores
+from blog.identificadores import uuid7, uuid7_em
+from blog.models import Artigo, Comentario, Tag
+
+
+@pytest.fixture(autouse=True)
+def estado_do_gerador(monkeypatch):
+    # Sem isso o último timestamp de outro teste (relógio real) valeria aqui
+    monkeypatch.setattr(identificadores, "_ultimo_ms", 0)
+    monkeypatch.setattr(identificadores, "_contador", 0)
+
+
+def test_uuid7_deve_ter_versao_variante_e_timestamp():
+    with freeze_time("2026-01-02 03:04:05"):
+        identificador = uuid7()
+
+    assert identificador.version == 7
+    assert identificador.variant == "specified in RFC 4122"
+    milissegundos = identificador.int >> 80
+    assert milissegundos == int(
+        datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc).timestamp() * 1000
+    )
+
+
+def test_uuid7_deve_crescer_dentro_do_mesmo_milissegundo():
+    # Mais ids do que cabem no contador: o timestamp avança sem quebrar a ordem
+    with freeze_time("2026-01-02 03:04:05"):
+        gerados = [uuid7() for _ in range(5000)]
+
+    assert gerados == sorted(gerados)
+    assert len(set(gerados)) == 5000
+    assert gerados[-1].int >> 80 > gerados[0].int >> 80
+    # A ordem do texto hexadecimal (como o SQLite guarda) é a mesma
+    assert [g.hex for g in gerados] == sorted(g.hex for g in gerados)
+
+
+def test_uuid7_deve_crescer_mesmo_com_o_relogio_voltando():
+    with freeze_time("2026-01-02 03:04:05") as relogio:
+        primeiro = uuid7()
+        relogio.move_to("2026-01-02 03:04:04")
+        segundo = uuid7()
+
+    assert segundo > primeiro
+
+
+def test_uuid7_em_deve_ser_reproduzivel():
+    momento = datetime(2026, 1, 2, tzinfo=timezone.utc)
+
+    primeiro = uuid7_em(momento, random.Random(1))
+    segundo = uuid7_em(momento, random.Random(1))
+
+    assert primeiro == segundo
+    assert primeiro.version == 7
+    assert primeiro.int >> 80 == int(momento.timestamp() * 1000)
+
+
+@pytest.mark.django_db
+def test_novas_linhas_devem_receber_uuid7():
+    tag = baker.make(Tag, nome="Python", slug="python")
+    artigo = baker.make(
+        Artigo,
+        slug="artigo",
+        autor=baker.make(User),
+        conteudo="<p>Conteúdo</p>",
+        resumo="<p>Resumo</p>",
+    )
+    comentarios = [
+        baker.make(
+            Comentario, artigo=artigo, autor=artigo.autor, texto="<p>Comentário</p>"
+        )
+        for _ in range(3)
+    ]
+
+    assert {tag.pk.version, artigo.pk.version} == {7}
+    assert [comentario.pk for comentario in comentarios] == sorted(
+        Comentario.objects.values_list("pk", flat=True)
+    )
@@ -0,0 +1,220 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import Client
+from django.urls import reverse
+from model_bakery import baker
+
+from blog import metricas
+from blog.metricas import BALDES, Serie, coletar, formatar_prometheus, observar
+from blog.models import Artigo
+from blog.services.artigo_service import (
+    aobter_lista_artigos_dto,
+    obter_lista_artigos_dto,
+)
+
+
+@pytest.fixture(autouse=True)
+def limpar_metricas():
+    metricas.limpar()
+    yield
+    metricas.limpar()
+
+
+@pytest.fixture
+def artigos_fixture():
+    def _wrapper(quantidade: int):
+        autor = baker.make(User, username="autor")
+        return baker.make(
+            Artigo,
+            autor=autor,
+            conteudo="<p>Conteúdo</p>",
+            resumo="<p>Resumo</p>",
+            publicado=True,
+            _quantity=quantidade,
+        )
+
+    return _wrapper
+
+
+@pytest.mark.django_db
+def test_funcao_de_servico_deve_registrar_chamadas_queries_e_linhas(artigos_fixture):
+    artigos_fixture(3)
+
+    obter_lista_artigos_dto()
+    obter_lista_artigos_dto()
+
+    serie = coletar()[("servico", "artigo_service.obter_lista_artigos_dto")]
+    assert serie.chamadas == 2
+    assert serie.queries == 4
+    # Três artigos com autor por chamada; o prefetch de tags não traz linhas
+    assert serie.linhas == 6
+    assert serie.soma > 0
+
+
+@pytest.mark.django_db
+def test_funcao_async_deve_contar_as_queries_das_threads_do_orm(artigos_fixture):
+    artigos_fixture(2)
+
+    async_to_sync(aobter_lista_artigos_dto)()
+
+    serie = coletar()[("servico", "artigo_service.aobter_lista_artigos_dto")]
+    assert serie.chamadas == 1
+    assert serie.queries == 2
+    assert serie.linhas == 2
+
+
+@pytest.mark.django_db
+def test_view_deve_registrar_a_serie_da_rota_e_das_funcoes_chamadas(artigos_fixture):
+    artigos_fixture(2)
+
+    Client().get(reverse("blog:artigo_list"))
+
+    series = coletar()
+    view = series[("view", "blog:artigo_list")]
+    servico = series[("servico", "artigo_service.obter_pagina_artigos_dto")]
+    assert view.chamadas == servico.chamadas == 1
+    # A view conta também a query dos validadores do GET condicional
+    assert view.queries > servico.queries
+    assert view.linhas >= servico.linhas == 2
+
+
+@pytest.mark.django_db
+def test_request_sem_rota_deve_ir_para_uma_serie_so():
+    Client().get("/nao/existe/mesmo/")
+
+    assert coletar()[("view", "sem_rota")].chamadas == 1
+
+
+def test_observacao_deve_cair_no_primeiro_balde_que_a_comporta():
+    observar("servico", "teste", 0.003, queries=1, linhas=5)
+    observar("servico", "teste", 60.0, queries=0, linhas=0)
+
+    serie = coletar()[("servico", "teste")]
+    assert serie.baldes[BALDES.index(0.005)] == 1
+    assert serie.baldes[-1] == 1
+
+
+def test_formato_prometheus_deve_ter_baldes_acumulados():
+    serie = Serie()
+    serie.baldes[0] = 2
+    serie.baldes[3] = 1
+    serie.soma, serie.queries, serie.linhas = 0.012, 6, 40
+
+    texto = formatar_prometheus({("servico", 'modulo."funcao"'): serie})
+
+    assert "# TYPE blog_servico_duracao_segundos histogram" in texto
+    rotulo = 'funcao="modulo.\\"funcao\\""'
+    assert f'blog_servico_duracao_segundos_bucket{{{rotulo},le="0.001"}} 2' in texto
+    assert f'blog_servico_duracao_segundos_bucket{{{rotulo},le="0.005"}} 2' in texto
+    assert f'blog_servico_duracao_segundos_bucket{{{rotulo},le="0.01"}} 3' in texto
+    assert f'blog_servico_duracao_segundos_bucket{{{rotulo},le="+Inf"}} 3' in texto
+    assert f"blog_servico_duracao_segundos_count{{{rotulo}}} 3" in texto
+    assert f"blog_servico_queries_total{{{rotulo}}} 6" in texto
+    assert f"blog_servico_linhas_total{{{rotulo}}} 40" in texto
+    assert "# TYPE blog_view_duracao_segundos histogram" in texto
+
+
+@pytest.mark.django_db
+def test_endpoint_deve_somar_os_arquivos_de_todos_os_workers(settings, tmp_path):
+    settings.BLOG_METRICAS_DIRETORIO = str(tmp_path)
+    baldes = [0] * (len(BALDES) + 1)
+    baldes[0] = 5
+    (tmp_path / "outro-worker.json").write_text(
+        json.dumps(
+            [
+                {
+                    "tipo": "servico",
+                    "nome": "artigo_service.obter_lista_artigos_dto",
+                    "baldes": baldes,
+                    "soma": 0.004,
+                    "queries": 10,
+                    "linhas": 50,
+                }
+            ]
+        )
+    )
+    observar("servico", "artigo_service.obter_lista_artigos_dto", 0.5, 2, 3)
+
+    response = Client().get(reverse("blog:metricas"))
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    texto = response.content.decode()
+    rotulo = 'funcao="artigo_service.obter_lista_artigos_dto"'
+    assert f"blog_servico_duracao_segundos_count{{{rotulo}}} 6" in texto
+    assert f"blog_servico_queries_total{{{rotulo}}} 12" in texto
+    assert f"blog_servico_linhas_total{{{rotulo}}} 53" in texto
+    # O próprio processo gravou o seu arquivo para os outros workers
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+
+def _arquivo_de_worker(caminho, queries: int):
+    baldes = [0] * (len(BALDES) + 1)
+    baldes[0] = 1
+    caminho.write_text(
+        json.dumps(
+            [
+                {
+                    "tipo": "view",
+                    "nome": "blog:artigo_list",
+                    "baldes": baldes,
+                    "soma": 0.001,
+                    "queries": queries,
+                    "linhas": 0,
+                }
+            ]
+        )
+    )
+
+
+@pytest.fixture
+def pid_encerrado():
+    processo = subprocess.Popen([sys.executable, "-c", "pass"])
+    processo.wait()
+    return processo.pid
+
+
+def test_arquivos_de_workers_encerrados_devem_ser_consolidados(
+    settings, tmp_path, pid_encerrado
+):
+    settings.BLOG_METRICAS_DIRETORIO = str(tmp_path)
+    _arquivo_de_worker(tmp_path / f"{pid_encerrado}-antigo.json", queries=7)
+    _arquivo_de_worker(tmp_path / f"{os.getppid()}-vivo.json", queries=3)
+
+    primeira = coletar()[("view", "blog:artigo_list")]
+    segunda = coletar()[("view", "blog:artigo_list")]
+
+    assert primeira.queries == segunda.queries == 10
+    assert segunda.chamadas == 2
+    assert not (tmp_path / f"{pid_encerrado}-antigo.json").exists()
+    assert (tmp_path / f"{os.getppid()}-vivo.json").exists()
+    assert (tmp_path / metricas.ARQUIVO_ENCERRADOS).exists()
+
+
+def test_consolidacao_interrompida_nao_deve_somar_duas_vezes(
+    settings, tmp_path, pid_encerrado
+):
+    settings.BLOG_METRICAS_DIRETORIO = str(tmp_path)
+    nome = f"{pid_encerrado}-antigo.json"
+    _arquivo_de_worker(tmp_path / nome, queries=7)
+    metricas.consolidar_processos_encerrados(tmp_path)
+    # Como se o processo tivesse parado entre gravar a soma e apagar o arquivo
+    _arquivo_de_worker(tmp_path / nome, queries=7)
+
+    assert coletar()[("view", "blog:artigo_list")].queries == 7
+    assert not (tmp_path / nome).exists()
+
+
+@pytest.mark.django_db
+def test_endpoint_deve_recusar_enderecos_fora_das_redes_permitidas(settings):
+    settings.BLOG_METRICAS_REDES = ["127.0.0.1/32", "10.1.0.0/16"]
+    url = reverse("blog:metricas")
+
+    assert Client(REMOTE_ADDR="10.1.2.3").get(url).status_code == 200
+    assert Client(REMOTE_ADDR="10.2.0.1").get(url).status_code == 403
@@ -0,0 +1,130 @@
+from datetime import datetime, timezone
+
+import pytest
+from freezegun import freeze_time
+
+from blog.models import Artigo, Comentario
+from blog.services import moderacao_service
+from blog.services.moderacao_service import (
+    aprovar_comentarios,
+    despublicar_artigos,
+    publicar_artigos,
+    rejeitar_comentarios,
+)
+
+
+@pytest.mark.django_db
+def test_aprovar_comentarios_em_lotes_ajusta_contadores(
+    artigo_fixture, comentario_fixture, total_aprovados
+):
+    primeiro = artigo_fixture("primeiro")
+    segundo = artigo_fixture("segundo")
+    comentario_fixture(primeiro, aprovado=False, quantity=3)
+    comentario_fixture(segundo, aprovado=False, quantity=2)
+    comentario_fixture(segundo, aprovado=True)
+
+    quantidade = aprovar_comentarios(Comentario.objects.all(), tamanho_lote=2)
+
+    assert quantidade == 5
+    assert not Comentario.objects.filter(aprovado=False).exists()
+    assert total_aprovados(primeiro) == 3
+    assert total_aprovados(segundo) == 3
+
+
+@pytest.mark.django_db
+def test_rejeitar_comentarios_so_altera_os_aprovados(
+    artigo_fixture, comentario_fixture, total_aprovados
+):
+    artigo = artigo_fixture()
+    comentario_fixture(artigo, aprovado=True, quantity=3)
+    comentario_fixture(artigo, aprovado=False)
+
+    quantidade = rejeitar_comentarios(Comentario.objects.all())
+
+    assert quantidade == 3
+    assert total_aprovados(artigo) == 0
+
+
+@pytest.mark.django_db
+def test_moderacao_respeita_o_queryset_selecionado(
+    artigo_fixture, comentario_fixture, total_aprovados
+):
+    primeiro = artigo_fixture("primeiro")
+    segundo = artigo_fixture("segundo")
+    comentario_fixture(primeiro, quantity=2)
+    comentario_fixture(segundo, quantity=2)
+
+    rejeitar_comentarios(
+        Comentario.objects.filter(artigo=primeiro).select_related("autor")
+    )
+
+    assert total_aprovados(primeiro) == 0
+    assert total_aprovados(segundo) == 2
+
+
+@pytest.mark.django_db
+def test_moderacao_invalida_o_cache_uma_vez_por_lote(
+    artigo_fixture, comentario_fixture, mocker
+):
+    artigo = artigo_fixture()
+    comentario_fixture(artigo, aprovado=False, quantity=5)
+    invalidar = mocker.spy(moderacao_service, "invalidar_artigos")
+
+    aprovar_comentarios(Comentario.objects.all(), tamanho_lote=2)
+
+    assert invalidar.call_count == 3
+
+
+@pytest.mark.django_db
+def test_moderacao_invalida_o_dto_em_cache(
+    artigo_fixture, comentario_fixture, obter_cacheado
+):
+    artigo = artigo_fixture()
+    comentario_fixture(artigo, aprovado=False, quantity=2)
+    assert obter_cacheado(artigo.slug).comentarios == []
+
+    aprovar_comentarios(Comentario.objects.all())
+
+    assert len(obter_cacheado(artigo.slug).comentarios) == 2
+
+
+@pytest.mark.django_db
+def test_publicar_artigos_define_data_de_publicacao(artigo_fixture):
+    with freeze_time("2024-01-01"):
+        ja_publicado = artigo_fixture("ja-publicado")
+        ja_publicado.publicar()
+        rascunho = artigo_fixture("rascunho", publicado=False)
+
+    with freeze_time("2024-02-01"):
+        quantidade = publicar_artigos(Artigo.objects.all())
+
+    ja_publicado.refresh_from_db()
+    rascunho.refresh_from_db()
+    assert quantidade == 1
+    assert rascunho.publicado
+    assert rascunho.data_publicacao == datetime(2024, 2, 1, tzinfo=timezone.utc)
+    assert rascunho.data_atualizacao == datetime(2024, 2, 1, tzinfo=timezone.utc)
+    # Quem já estava publicado não muda de data
+    assert ja_publicado.data_publicacao == datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.django_db
+def test_despublicar_artigos_tira_do_ar_e_do_cache(artigo_fixture, obter_cacheado):
+    artigo = artigo_fixture()
+    artigo.publicar()
+    obter_cacheado(artigo.slug)
+
+    quantidade = despublicar_artigos(Artigo.objects.filter(pk=artigo.pk))
+
+    artigo.refresh_from_db()
+    assert quantidade == 1
+    assert not artigo.publicado
+    assert artigo.data_publicacao is None
+    with pytest.raises(Artigo.DoesNotExist):
+        obter_cacheado(artigo.slug)
+
+
+@pytest.mark.django_db
+def test_tamanho_de_lote_invalido():
+    with pytest.raises(ValueError):
+        publicar_artigos(Artigo.objects.all(), tamanho_lote=0)
@@ -0,0 +1,46 @@
+import pytest
+
+from blog.plugin_orcamento import (
+    TAMANHOS,
+    limite_de_queries,
+    relatorio_de_queries,
+)
+from blog.services.orcamento import ORCAMENTOS, orcamento_queries
+
+
+def test_funcao_respeita_orcamento(orcamento, medir_orcamento):
+    medicoes = {tamanho: medir_orcamento(orcamento, tamanho) for tamanho in TAMANHOS}
+    pequeno, grande = TAMANHOS
+
+    if orcamento.cresce_com is None and len(medicoes[grande]) > len(medicoes[pequeno]):
+        pytest.fail(
+            f"{orcamento.nome}: queries crescem com os dados "
+            f"({len(medicoes[pequeno])} com {pequeno}, "
+            f"{len(medicoes[grande])} com {grande}), provável N+1:\n"
+            + relatorio_de_queries(medicoes[grande])
+        )
+    for tamanho, queries in medicoes.items():
+        limite = limite_de_queries(orcamento, tamanho)
+        if len(queries) > limite:
+            pytest.fail(
+                f"{orcamento.nome}: {len(queries)} queries com {tamanho} "
+                f"registros, orçamento de {limite}:\n" + relatorio_de_queries(queries)
+            )
+
+
+def test_decorator_registra_sem_envolver_a_funcao():
+    def funcao_qualquer():
+        return 42
+
+    decorada = orcamento_queries(maximo=1)(funcao_qualquer)
+
+    try:
+        assert decorada is funcao_qualquer
+        assert ORCAMENTOS[decorada.orcamento_queries.nome].maximo == 1
+    finally:
+        ORCAMENTOS.pop(decorada.orcamento_queries.nome)
+
+
+def test_decorator_recusa_orcamento_nao_positivo():
+    with pytest.raises(ValueError):
+        orcamento_queries(maximo=0)
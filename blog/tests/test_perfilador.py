@@ -0,0 +1,124 @@
+import json
+
+import pytest
+from django.contrib.auth.models import User
+from django.test import Client
+from django.urls import reverse
+from freezegun import freeze_time
+from model_bakery import baker
+
+from blog.models import Artigo
+from blog.perfilador import em_andamento, gerar_token, gravador, perfilar
+
+
+@pytest.fixture
+def perfilador_fixture(settings, tmp_path):
+    settings.BLOG_PERFIL_DIRETORIO = tmp_path
+    settings.BLOG_PERFIL_AMOSTRAGEM = 0.0
+
+    def _relatorios() -> list[dict]:
+        gravador.esvaziar()
+        return [
+            json.loads(caminho.read_text())
+            for caminho in sorted(tmp_path.glob("*.json"))
+        ]
+
+    return _relatorios
+
+
+@pytest.fixture
+def artigo_fixture():
+    return baker.make(
+        Artigo,
+        titulo="Artigo perfilado",
+        slug="artigo-perfilado",
+        autor=baker.make(User, username="autor"),
+        conteudo="<p>Conteúdo</p>",
+        resumo="<p>Resumo</p>",
+        publicado=True,
+    )
+
+
+@pytest.mark.django_db
+def test_request_nao_sorteado_nao_deve_gerar_relatorio(
+    perfilador_fixture, artigo_fixture
+):
+    response = Client().get(reverse("blog:artigo_list"))
+
+    assert response.status_code == 200
+    assert perfilador_fixture() == []
+
+
+@pytest.mark.django_db
+def test_request_sorteado_deve_gravar_perfil_e_queries(
+    settings, perfilador_fixture, artigo_fixture
+):
+    settings.BLOG_PERFIL_AMOSTRAGEM = 1.0
+    url = reverse("blog:artigo_detail", kwargs={"slug": artigo_fixture.slug})
+
+    Client().get(url)
+
+    (relatorio,) = perfilador_fixture()
+    assert relatorio["caminho"] == url
+    assert relatorio["status"] == 200
+    assert relatorio["motivo"] == "amostragem"
+    assert relatorio["requests_simultaneos"] == 0
+    assert relatorio["total_queries"] == len(relatorio["queries"]) > 0
+    assert any('"blog_artigo"' in query["sql"] for query in relatorio["queries"])
+    assert "views.py" in relatorio["perfil"]
+    assert "cumulative" in relatorio["perfil"]
+
+
+@pytest.mark.django_db
+def test_cabecalho_assinado_deve_perfilar_o_request(perfilador_fixture):
+    Client().get(reverse("blog:artigo_list"), HTTP_X_BLOG_PERFIL=gerar_token())
+
+    (relatorio,) = perfilador_fixture()
+    assert relatorio["motivo"] == "cabecalho"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("token", ["perfilar", "perfilar:adulterado:x"])
+def test_cabecalho_com_token_invalido_deve_ser_ignorado(perfilador_fixture, token):
+    Client().get(reverse("blog:artigo_list"), HTTP_X_BLOG_PERFIL=token)
+
+    assert perfilador_fixture() == []
+
+
+@pytest.mark.django_db
+def test_cabecalho_com_token_expirado_deve_ser_ignorado(perfilador_fixture):
+    with freeze_time("2025-10-04 10:00:00"):
+        token = gerar_token()
+
+    with freeze_time("2025-10-04 11:00:01"):
+        Client().get(reverse("blog:artigo_list"), HTTP_X_BLOG_PERFIL=token)
+
+    assert perfilador_fixture() == []
+
+
+@pytest.mark.django_db
+def test_relatorios_devem_formar_um_anel_limitado(settings, perfilador_fixture):
+    settings.BLOG_PERFIL_AMOSTRAGEM = 1.0
+    settings.BLOG_PERFIL_MAXIMO_RELATORIOS = 2
+    cliente = Client()
+
+    for pagina in ("/?a=1", "/?a=2", reverse("blog:busca")):
+        cliente.get(pagina)
+
+    relatorios = perfilador_fixture()
+    assert [relatorio["caminho"] for relatorio in relatorios] == [
+        "/",
+        reverse("blog:busca"),
+    ]
+
+
+def test_relatorio_deve_contar_os_requests_simultaneos(perfilador_fixture):
+    # Um request já em andamento e outro que chega durante a amostra
+    with em_andamento(), em_andamento():
+        with perfilar("GET", "/", "amostragem") as amostra:
+            with em_andamento():
+                pass
+
+    assert amostra.requests_simultaneos == 2
+    (relatorio,) = perfilador_fixture()
+    assert relatorio["requests_simultaneos"] == 2
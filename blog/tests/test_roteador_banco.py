@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory
+from model_bakery import baker
+
+from blog import views
+from blog.middleware import COOKIE_LER_DO_PRIMARIO, LerPropriasEscritasMiddleware
+from blog.models import Artigo
+from blog.roteador_banco import (
+    RoteadorReplicas,
+    banco_leitura,
+    ler_do_primario,
+    sessao_de_leitura,
+)
+from blog.services import artigo_service
+from blog.services.cache_artigo import CacheArtigoDTO
+from blog.views import ArtigoListStreamView
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.BLOG_REPLICAS_LEITURA = ["replica_1", "replica_2"]
+    settings.BLOG_JANELA_LEITURA_PRIMARIO = 5
+    return settings.BLOG_REPLICAS_LEITURA
+
+
+def test_sem_replicas_deve_ler_do_primario(settings):
+    settings.BLOG_REPLICAS_LEITURA = []
+
+    assert banco_leitura() == "default"
+
+
+def test_servicos_devem_ler_de_uma_replica(replicas):
+    assert banco_leitura() in replicas
+    assert artigo_service._artigos_publicados_qs().db in replicas
+    assert artigo_service._artigo_detalhe_qs().db in replicas
+    assert artigo_service._comentarios_aprovados_qs().db in replicas
+
+
+def test_queries_comuns_devem_ficar_no_primario(replicas):
+    # O admin e o resto do projeto não pedem réplica
+    assert Artigo.objects.all().db == "default"
+
+
+def test_ler_do_primario_deve_forcar_o_primario(replicas):
+    with ler_do_primario():
+        assert banco_leitura() == "default"
+    assert banco_leitura() in replicas
+
+
+def test_sessao_deve_usar_uma_unica_replica(replicas):
+    with sessao_de_leitura():
+        bancos = {banco_leitura() for _ in range(20)}
+
+    assert len(bancos) == 1
+
+
+def test_depois_de_uma_escrita_a_sessao_deve_ler_do_primario(replicas):
+    with sessao_de_leitura() as sessao:
+        assert RoteadorReplicas().db_for_write(Artigo) == "default"
+        assert sessao.escreveu
+        assert banco_leitura() == "default"
+
+
+@pytest.mark.django_db
+def test_dentro_de_uma_transacao_deve_ler_do_primario(replicas):
+    # O teste já roda dentro de um atomic
+    assert banco_leitura() == "default"
+
+
+def test_replicas_nao_devem_receber_migracoes(replicas):
+    roteador = RoteadorReplicas()
+
+    assert roteador.allow_migrate("replica_1", "blog") is False
+    assert roteador.allow_migrate("default", "blog") is None
+
+
+def test_middleware_deve_abrir_a_janela_de_leitura_no_primario_apos_escrita(
+    replicas,
+):
+    bancos = []
+
+    def view(request):
+        bancos.append(banco_leitura())
+        if request.method == "POST":
+            RoteadorReplicas().db_for_write(Artigo)
+        return HttpResponse()
+
+    middleware = LerPropriasEscritasMiddleware(view)
+    rf = RequestFactory()
+
+    leitura = middleware(rf.get("/"))
+    escrita = middleware(rf.post("/"))
+    request = rf.get("/")
+    request.COOKIES[COOKIE_LER_DO_PRIMARIO] = "1"
+    middleware(request)
+
+    assert COOKIE_LER_DO_PRIMARIO not in leitura.cookies
+    assert escrita.cookies[COOKIE_LER_DO_PRIMARIO]["max-age"] == 5
+    assert bancos[0] in replicas
+    assert bancos[2] == "default"
+
+
+def test_middleware_async_deve_registrar_escritas(replicas):
+    async def view(request):
+        RoteadorReplicas().db_for_write(Artigo)
+        return HttpResponse()
+
+    middleware = LerPropriasEscritasMiddleware(view)
+
+    response = asyncio.run(middleware(RequestFactory().post("/")))
+
+    assert COOKIE_LER_DO_PRIMARIO in response.cookies
+
+
+def test_cache_deve_ser_preenchido_a_partir_do_primario(replicas):
+    cache_local = CacheArtigoDTO(tamanho_maximo=2, timeout=None)
+    bancos = []
+
+    def carregar(slug):
+        bancos.append(banco_leitura())
+        return slug
+
+    cache_local.obter_ou_carregar("artigo-sem-cache", carregar)
+
+    assert bancos == ["default"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_da_lista_deve_ler_do_primario_na_janela_apos_escrita(replicas, mocker):
+    # Fora de um atomic: dentro dele toda leitura já iria para o primário
+    baker.make(
+        Artigo,
+        titulo="Artigo recém-publicado",
+        autor=baker.make(User),
+        conteudo="<p>Conteúdo</p>",
+        resumo="<p>Resumo</p>",
+        publicado=True,
+    )
+    iterar = mocker.spy(views, "iterar_artigos_dto")
+    middleware = LerPropriasEscritasMiddleware(ArtigoListStreamView.as_view())
+    request = RequestFactory().get("/")
+    request.COOKIES[COOKIE_LER_DO_PRIMARIO] = "1"
+
+    response = middleware(request)
+    # O corpo só é gerado agora, depois que o middleware já retornou
+    conteudo = b"".join(response.streaming_content).decode()
+
+    assert iterar.call_args.kwargs["banco"] == "default"
+    assert "Artigo recém-publicado" in conteudo
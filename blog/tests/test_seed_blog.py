@@ -0,0 +1,72 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from blog.models import Artigo, Comentario, Tag
+from blog.services.busca_service import buscar_artigos
+from blog.services.contador_service import reconciliar_total_comentarios
+
+
+def _semear(*argumentos: str) -> str:
+    saida = StringIO()
+    call_command(
+        "seed_blog",
+        "--usuarios=5",
+        "--tags=8",
+        "--artigos=30",
+        "--comentarios=200",
+        "--lote=7",
+        *argumentos,
+        stdout=saida,
+    )
+    return saida.getvalue()
+
+
+@pytest.mark.django_db
+def test_gera_volumes_pedidos_com_contadores_corretos():
+    saida = _semear()
+
+    assert Artigo.objects.count() == 30
+    assert Tag.objects.count() == 8
+    assert Artigo.tags.through.objects.count() == 90
+    assert Comentario.objects.exists()
+    assert reconciliar_total_comentarios(corrigir=False) == 0
+    assert "linhas/s" in saida
+
+
+@pytest.mark.django_db
+def test_preserva_datas_geradas():
+    _semear()
+
+    datas = set(Artigo.objects.values_list("data_criacao", flat=True))
+    assert len(datas) == 30
+
+
+@pytest.mark.django_db
+def test_mesma_seed_gera_mesmos_dados():
+    _semear("--prefixo=a")
+    _semear("--prefixo=b")
+
+    titulos_a = Artigo.objects.filter(slug__startswith="a-").order_by("data_criacao")
+    titulos_b = Artigo.objects.filter(slug__startswith="b-").order_by("data_criacao")
+    assert list(titulos_a.values_list("titulo", flat=True)) == list(
+        titulos_b.values_list("titulo", flat=True)
+    )
+
+
+@pytest.mark.django_db
+def test_recusa_prefixo_repetido():
+    _semear()
+
+    with pytest.raises(CommandError):
+        _semear()
+
+
+@pytest.mark.django_db
+def test_reconstroi_indice_de_busca():
+    _semear()
+    titulo = Artigo.objects.filter(publicado=True).values_list("titulo", flat=True)[0]
+
+    assert buscar_artigos(titulo)
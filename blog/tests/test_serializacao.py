@@ -0,0 +1,123 @@
+import dataclasses
+import json
+from datetime import datetime, timezone
+from uuid import UUID
+
+import pytest
+
+from blog.dto import (
+    ArtigoDTO,
+    ArtigoListDTO,
+    AutorDTO,
+    ComentarioDTO,
+    PaginaArtigosDTO,
+    TagDTO,
+)
+from blog.serializacao import CampoDesconhecido, codificador
+
+MOMENTO = datetime(2025, 10, 4, 14, 30, tzinfo=timezone.utc)
+
+
+def _padrao_json(valor):
+    return valor.isoformat() if isinstance(valor, datetime) else str(valor)
+
+
+@pytest.fixture
+def artigo_dto_fixture():
+    def _wrapper(**campos):
+        valores = {
+            "titulo": 'Aspas " e acentuação',
+            "conteudo": "<p>Conteúdo\ncom quebra</p>",
+            "data_publicacao": MOMENTO,
+            "autor": AutorDTO(username="ana", first_name="Ana", last_name=""),
+            "tags": [TagDTO(nome="Python"), TagDTO(nome="Django")],
+            "comentarios": [
+                ComentarioDTO(
+                    texto="<p>Oi</p>",
+                    data_criacao=MOMENTO,
+                    autor=AutorDTO(username="bia", first_name="", last_name=""),
+                )
+            ],
+            "id": UUID("0199a1b2-c3d4-7e5f-8a9b-0c1d2e3f4a5b"),
+            "data_atualizacao": MOMENTO,
+            "total_comentarios": 1,
+            "proximo_cursor_comentarios": None,
+        }
+        return ArtigoDTO(**{**valores, **campos})
+
+    return _wrapper
+
+
+def test_codificador_deve_gerar_o_mesmo_json_que_asdict(artigo_dto_fixture):
+    artigo = artigo_dto_fixture()
+
+    resultado = json.loads(codificador(ArtigoDTO)(artigo))
+
+    assert resultado == json.loads(
+        json.dumps(dataclasses.asdict(artigo), default=_padrao_json)
+    )
+    assert resultado["data_atualizacao"] == "2025-10-04T14:30:00+00:00"
+    assert resultado["proximo_cursor_comentarios"] is None
+
+
+def test_codificador_deve_escrever_none_como_null(artigo_dto_fixture):
+    artigo = artigo_dto_fixture(data_publicacao=None, tags=[])
+
+    resultado = json.loads(codificador(ArtigoDTO)(artigo))
+
+    assert resultado["data_publicacao"] is None
+    assert resultado["tags"] == []
+
+
+def test_codificador_com_campos_deve_escrever_so_os_campos_pedidos(
+    artigo_dto_fixture,
+):
+    codificar = codificador(ArtigoDTO, ["titulo", "id"])
+
+    resultado = json.loads(codificar(artigo_dto_fixture()))
+
+    assert resultado == {
+        "titulo": 'Aspas " e acentuação',
+        "id": "0199a1b2-c3d4-7e5f-8a9b-0c1d2e3f4a5b",
+    }
+
+
+def test_codificador_deve_ser_reaproveitado_para_a_mesma_selecao():
+    assert codificador(ArtigoDTO, ["titulo", "id"]) is codificador(
+        ArtigoDTO, ("id", "titulo")
+    )
+
+
+def test_codificador_com_campo_desconhecido_deve_levantar_erro():
+    with pytest.raises(CampoDesconhecido, match="senha"):
+        codificador(ArtigoDTO, ["titulo", "senha"])
+
+
+def test_codificador_com_campos_aninhados_deve_filtrar_os_itens():
+    artigo = ArtigoListDTO(
+        titulo="Título",
+        slug="titulo",
+        resumo="<p>Resumo</p>",
+        data_publicacao=MOMENTO,
+        data_criacao=MOMENTO,
+        autor=AutorDTO(username="ana", first_name="", last_name=""),
+        tags=[],
+        id=UUID("0199a1b2-c3d4-7e5f-8a9b-0c1d2e3f4a5b"),
+        data_atualizacao=MOMENTO,
+    )
+    pagina = PaginaArtigosDTO(
+        artigos=[artigo], proximo_cursor="abc", cursor_anterior=None
+    )
+
+    codificar = codificador(PaginaArtigosDTO, aninhados={"artigos": ["slug"]})
+
+    assert json.loads(codificar(pagina)) == {
+        "artigos": [{"slug": "titulo"}],
+        "proximo_cursor": "abc",
+        "cursor_anterior": None,
+    }
+
+
+def test_codificador_com_campos_aninhados_em_campo_simples_deve_levantar_erro():
+    with pytest.raises(CampoDesconhecido):
+        codificador(PaginaArtigosDTO, aninhados={"proximo_cursor": ["x"]})
@@ -0,0 +1,42 @@
+import pytest
+from django.db import connection
+
+from blog.signals import configurar_sqlite
+from config.sqlite import banco_sqlite_producao
+
+
+def _pragma(nome):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {nome}")
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+def test_configurar_sqlite_deve_aplicar_os_pragmas_dos_settings(settings):
+    # O teste roda dentro de uma transação, onde journal_mode e temp_store
+    # não mudam; numa conexão nova o receiver roda antes de qualquer BEGIN
+    settings.BLOG_SQLITE_PRAGMAS = {"cache_size": -1234, "busy_timeout": 4321}
+
+    configurar_sqlite(sender=None, connection=connection)
+
+    assert _pragma("cache_size") == -1234
+    assert _pragma("busy_timeout") == 4321
+
+
+@pytest.mark.django_db
+def test_configurar_sqlite_sem_pragmas_nao_deve_executar_nada(settings):
+    settings.BLOG_SQLITE_PRAGMAS = {}
+    antes = _pragma("cache_size")
+
+    configurar_sqlite(sender=None, connection=connection)
+
+    assert _pragma("cache_size") == antes
+
+
+def test_banco_de_producao_deve_usar_transacoes_immediate_e_conexao_persistente():
+    banco = banco_sqlite_producao("/tmp/blog.sqlite3")
+
+    assert banco["NAME"] == "/tmp/blog.sqlite3"
+    assert banco["OPTIONS"]["transaction_mode"] == "IMMEDIATE"
+    assert banco["CONN_MAX_AGE"] > 0
+    assert banco["CONN_HEALTH_CHECKS"] is True
@@ -1,11 +1,25 @@
+from datetime import timedelta
+
 import pytest
+from asgiref.sync import async_to_sync, sync_to_async
 from django.contrib.auth.models import User
-from django.test import Client
+from django.db import connection
+from django.http import Http404
+from django.test import AsyncRequestFactory, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from freezegun import freeze_time
 from model_bakery import baker
 
-from blog.dto import ArtigoDTO, AutorDTO
+from blog.dto import ArtigoDTO, AutorDTO, PaginaArtigosDTO
 from blog.models import Artigo, Comentario, Tag
+from blog.services.artigo_service import obter_artigo_dto_por_slug
+from blog.views import (
+    ArtigoDetailAsyncView,
+    ArtigoListAsyncView,
+    ArtigoListStreamAsyncView,
+)
 
 
 @pytest.fixture
@@ -212,6 +226,8 @@ def test_artigo_detail_view_chama_servico_correto(client, artigo_fixture, mocker
         ),
         tags=[],
         comentarios=[],
+        id=artigo.id,
+        data_atualizacao=artigo.data_atualizacao,
     )
 
     response = client.get(url)
@@ -224,10 +240,482 @@ def test_artigo_detail_view_chama_servico_correto(client, artigo_fixture, mocker
 def test_artigo_list_view_chama_servico_correto(client, mocker):
     url = reverse("blog:artigo_list")
 
-    mock_service = mocker.patch("blog.views.obter_lista_artigos_dto")
-    mock_service.return_value = []
+    mock_service = mocker.patch("blog.views.obter_pagina_artigos_dto")
+    mock_service.return_value = PaginaArtigosDTO(
+        artigos=[], proximo_cursor=None, cursor_anterior=None
+    )
+
+    response = client.get(url)
+
+    assert response.status_code == 200
+    mock_service.assert_called_once_with(None)
+
+
+@pytest.mark.django_db
+def test_artigo_list_view_repassa_cursor_para_servico(client, mocker):
+    url = reverse("blog:artigo_list")
+
+    mock_service = mocker.patch("blog.views.obter_pagina_artigos_dto")
+    mock_service.return_value = PaginaArtigosDTO(
+        artigos=[], proximo_cursor=None, cursor_anterior=None
+    )
+
+    response = client.get(url, {"cursor": "abc"})
+
+    assert response.status_code == 200
+    mock_service.assert_called_once_with("abc")
+
+
+@pytest.mark.django_db
+def test_obter_lista_artigos_quando_cursor_invalido_deve_retornar_404(client):
+    url = reverse("blog:artigo_list")
+
+    response = client.get(url, {"cursor": "nao-e-um-cursor"})
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_obter_lista_artigos_em_stream_deve_enviar_cards_em_fragmentos(
+    client, artigo_fixture
+):
+    artigo_fixture()
+    url = reverse("blog:artigo_list_stream")
+
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.streaming
+    fragmentos = [fragmento.decode() for fragmento in response.streaming_content]
+    assert len(fragmentos) == 3
+    assert "Artigo de Teste" in fragmentos[1]
+    assert fragmentos[-1].rstrip().endswith("</html>")
+
+
+@pytest.mark.django_db
+def test_obter_lista_artigos_em_stream_quando_nao_ha_artigos_deve_retornar_200(
+    client,
+):
+    url = reverse("blog:artigo_list_stream")
+
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert (
+        "Nenhum artigo publicado ainda."
+        in b"".join(response.streaming_content).decode()
+    )
+
+
+@pytest.mark.django_db
+def test_obter_lista_artigos_deve_enviar_validadores(client, artigo_fixture):
+    artigo_fixture()
+    url = reverse("blog:artigo_list")
+
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.has_header("ETag")
+    assert response.has_header("Last-Modified")
+
+
+@pytest.mark.django_db
+def test_obter_lista_artigos_com_etag_igual_deve_retornar_304_sem_chamar_servico(
+    client, artigo_fixture, mocker
+):
+    artigo_fixture()
+    url = reverse("blog:artigo_list")
+    etag = client.get(url).headers["ETag"]
+    mock_service = mocker.patch("blog.views.obter_pagina_artigos_dto")
+
+    response = client.get(url, headers={"if-none-match": etag})
+
+    assert response.status_code == 304
+    mock_service.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_obter_lista_com_if_modified_since_apos_apagar_artigo_deve_retornar_200(
+    client, artigo_fixture
+):
+    primeiro = artigo_fixture(slug="primeiro")
+    segundo = artigo_fixture(
+        slug="segundo", autor_param=primeiro.autor, tags=list(primeiro.tags.all())
+    )
+    url = reverse("blog:artigo_list")
+    last_modified = client.get(url).headers["Last-Modified"]
+
+    # Last-Modified tem resolução de segundos
+    with freeze_time(timezone.now() + timedelta(seconds=2)):
+        segundo.delete()
+        response = client.get(url, headers={"if-modified-since": last_modified})
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_obter_detalhe_artigo_com_last_modified_igual_deve_retornar_304(
+    client, artigo_fixture, mocker
+):
+    artigo = artigo_fixture()
+    url = reverse("blog:artigo_detail", kwargs={"slug": artigo.slug})
+    last_modified = client.get(url).headers["Last-Modified"]
+    mock_service = mocker.patch("blog.views.obter_artigo_dto_por_slug")
+
+    response = client.get(url, headers={"if-modified-since": last_modified})
+
+    assert response.status_code == 304
+    mock_service.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_obter_detalhe_artigo_apos_novo_comentario_aprovado_deve_retornar_200(
+    client, artigo_fixture, comentario_fixture
+):
+    artigo = artigo_fixture()
+    url = reverse("blog:artigo_detail", kwargs={"slug": artigo.slug})
+    etag = client.get(url).headers["ETag"]
+    comentario_fixture(
+        texto="<p>Comentário</p>",
+        aprovado=True,
+        artigo_param=artigo,
+        autor_param=artigo.autor,
+    )
+
+    response = client.get(url, headers={"if-none-match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_buscar_artigos_deve_retornar_200_com_resultados(client, artigo_fixture):
+    artigo_fixture()
+    url = reverse("blog:busca")
+
+    response = client.get(url, {"q": "teste"})
+
+    assert response.status_code == 200
+    assert len(response.context["resultados"]) == 1
+
+
+@pytest.mark.django_db
+def test_buscar_artigos_sem_termo_deve_retornar_200(client):
+    url = reverse("blog:busca")
 
     response = client.get(url)
 
     assert response.status_code == 200
-    mock_service.assert_called_once()
+    assert response.context["resultados"] == []
+
+
+@pytest.mark.django_db
+def test_obter_detalhe_artigo_com_muitos_comentarios_deve_oferecer_proxima_pagina(
+    client, artigo_fixture, comentario_fixture
+):
+    artigo = artigo_fixture()
+    comentario_fixture(
+        texto="<p>Comentário</p>",
+        quantity=21,
+        artigo_param=artigo,
+        autor_param=artigo.autor,
+    )
+
+    response = client.get(reverse("blog:artigo_detail", kwargs={"slug": artigo.slug}))
+
+    conteudo = response.content.decode()
+    assert "21 comentários" in conteudo
+    assert conteudo.count("<p>Comentário</p>") == 20
+    assert reverse("blog:comentarios", kwargs={"slug": artigo.slug}) in conteudo
+
+
+@pytest.mark.django_db
+def test_obter_comentarios_deve_retornar_fragmento_da_proxima_pagina(
+    client, artigo_fixture, comentario_fixture
+):
+    artigo = artigo_fixture()
+    comentario_fixture(
+        texto="<p>Comentário</p>",
+        quantity=21,
+        artigo_param=artigo,
+        autor_param=artigo.autor,
+    )
+    cursor = obter_artigo_dto_por_slug(artigo.slug).proximo_cursor_comentarios
+    url = reverse("blog:comentarios", kwargs={"slug": artigo.slug})
+
+    response = client.get(url, {"cursor": cursor})
+
+    assert response.status_code == 200
+    conteudo = response.content.decode()
+    assert conteudo.count("<p>Comentário</p>") == 1
+    assert "data-mais-comentarios" not in conteudo
+    assert "<html" not in conteudo
+
+
+@pytest.mark.django_db
+def test_obter_comentarios_quando_slug_nao_existe_deve_retornar_404(client):
+    url = reverse("blog:comentarios", kwargs={"slug": "inexistente"})
+
+    assert client.get(url).status_code == 404
+
+
+@pytest.mark.django_db
+def test_obter_comentarios_quando_cursor_invalido_deve_retornar_404(
+    client, artigo_fixture
+):
+    artigo = artigo_fixture()
+    url = reverse("blog:comentarios", kwargs={"slug": artigo.slug})
+
+    assert client.get(url, {"cursor": "lixo"}).status_code == 404
+
+
+def _chamar_view_async(view_class, url: str, headers: dict | None = None, **kwargs):
+    request = AsyncRequestFactory().get(url, headers=headers)
+    return async_to_sync(view_class.as_view())(request, **kwargs)
+
+
+@pytest.mark.django_db
+def test_view_async_da_lista_deve_retornar_200_com_validadores(artigo_fixture):
+    artigo_fixture()
+
+    response = _chamar_view_async(ArtigoListAsyncView, "/")
+
+    assert response.status_code == 200
+    assert "Artigo de Teste" in response.content.decode()
+    assert response.has_header("ETag")
+
+
+@pytest.mark.django_db
+def test_view_async_da_lista_com_etag_igual_deve_retornar_304(artigo_fixture, mocker):
+    artigo_fixture()
+    etag = _chamar_view_async(ArtigoListAsyncView, "/").headers["ETag"]
+    mock_service = mocker.patch("blog.views.aobter_pagina_artigos_dto")
+
+    response = _chamar_view_async(
+        ArtigoListAsyncView, "/", headers={"if-none-match": etag}
+    )
+
+    assert response.status_code == 304
+    mock_service.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_stream_async_deve_enviar_o_primeiro_card_antes_de_ler_todos_os_artigos(
+    artigo_fixture, mocker
+):
+    primeiro = artigo_fixture(slug="artigo-0")
+    for indice in range(1, 6):
+        artigo_fixture(
+            slug=f"artigo-{indice}",
+            autor_param=primeiro.autor,
+            tags=list(primeiro.tags.all()),
+        )
+    mocker.patch.object(ArtigoListStreamAsyncView, "chunk_size", 2)
+
+    def lotes_lidos(contexto) -> int:
+        # Um prefetch das tags por lote de artigos
+        return sum("blog_tag" in query["sql"] for query in contexto.captured_queries)
+
+    async def ler_em_partes(contexto):
+        response = await ArtigoListStreamAsyncView.as_view()(
+            AsyncRequestFactory().get("/artigos/stream/")
+        )
+        fragmentos = aiter(response.streaming_content)
+        await anext(fragmentos)
+        primeiro_card = (await anext(fragmentos)).decode()
+        # As queries ficam na conexão da thread do teste
+        lidos_no_primeiro_card = await sync_to_async(lotes_lidos)(contexto)
+        restantes = [fragmento async for fragmento in fragmentos]
+        return response, primeiro_card, lidos_no_primeiro_card, restantes
+
+    with CaptureQueriesContext(connection) as contexto:
+        response, primeiro_card, lidos_no_primeiro_card, restantes = async_to_sync(
+            ler_em_partes
+        )(contexto)
+
+    assert response.is_async
+    assert "Artigo de Teste" in primeiro_card
+    assert lidos_no_primeiro_card == 1
+    assert lotes_lidos(contexto) == 3
+    assert len(restantes) == 6
+
+
+@pytest.mark.django_db
+def test_view_async_do_detalhe_deve_retornar_200(artigo_fixture, comentario_fixture):
+    artigo = artigo_fixture()
+    comentario_fixture(
+        texto="<p>Comentário async</p>",
+        artigo_param=artigo,
+        autor_param=artigo.autor,
+    )
+
+    response = _chamar_view_async(
+        ArtigoDetailAsyncView, f"/{artigo.slug}/", slug=artigo.slug
+    )
+
+    assert response.status_code == 200
+    assert "Comentário async" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_view_async_do_detalhe_quando_slug_nao_existe_deve_levantar_404():
+    with pytest.raises(Http404):
+        _chamar_view_async(ArtigoDetailAsyncView, "/inexistente/", slug="inexistente")
+
+
+@pytest.mark.django_db
+def test_card_da_lista_deve_vir_do_cache_ate_o_artigo_mudar(client, artigo_fixture):
+    artigo = artigo_fixture(titulo="Título original")
+    url = reverse("blog:artigo_list")
+    client.get(url)
+
+    # update() não toca em data_atualizacao: a chave do card não muda
+    Artigo.objects.filter(pk=artigo.pk).update(titulo="Título sem save")
+    em_cache = client.get(url).content.decode()
+    artigo.titulo = "Título novo"
+    artigo.save()
+    atualizado = client.get(url).content.decode()
+
+    assert "Título original" in em_cache
+    assert "Título novo" in atualizado
+
+
+@pytest.mark.django_db
+def test_card_da_lista_deve_mostrar_o_total_de_comentarios_atualizado(
+    client, artigo_fixture, comentario_fixture
+):
+    artigo = artigo_fixture()
+    url = reverse("blog:artigo_list")
+    client.get(url)
+
+    comentario_fixture(
+        texto="<p>Comentário</p>",
+        artigo_param=artigo,
+        autor_param=artigo.autor,
+    )
+
+    assert "1 comentário" in client.get(url).content.decode()
+
+
+@pytest.mark.django_db
+def test_corpo_do_artigo_deve_ser_renderizado_de_novo_apos_salvar(
+    client, artigo_fixture
+):
+    artigo = artigo_fixture(conteudo="<p>Versão 1</p>")
+    url = reverse("blog:artigo_detail", kwargs={"slug": artigo.slug})
+    client.get(url)
+
+    artigo.conteudo = "<p>Versão 2</p>"
+    artigo.save()
+    conteudo = client.get(url).content.decode()
+
+    assert "Versão 2" in conteudo
+    assert "<title>Artigo de Teste - Blog</title>" in conteudo
+
+
+@pytest.mark.django_db
+def test_api_de_artigos_deve_retornar_json_da_pagina(client, artigo_fixture):
+    artigo = artigo_fixture()
+
+    response = client.get(reverse("blog:api_artigos"))
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/json"
+    assert response.has_header("ETag")
+    dados = response.json()
+    assert dados["proximo_cursor"] is None
+    assert dados["artigos"][0]["slug"] == artigo.slug
+    assert dados["artigos"][0]["id"] == str(artigo.id)
+    assert dados["artigos"][0]["autor"]["username"] == artigo.autor.username
+
+
+@pytest.mark.django_db
+def test_api_de_artigos_deve_paginar_por_cursor(client, user_fixture):
+    autor = user_fixture()
+    baker.make(
+        Artigo,
+        autor=autor,
+        conteudo="<p>Conteúdo</p>",
+        resumo="<p>Resumo</p>",
+        publicado=True,
+        _quantity=21,
+    )
+    url = reverse("blog:api_artigos")
+
+    primeira = client.get(url).json()
+    segunda = client.get(url, {"cursor": primeira["proximo_cursor"]}).json()
+
+    assert len(primeira["artigos"]) == 20
+    assert len(segunda["artigos"]) == 1
+    assert segunda["cursor_anterior"] is not None
+
+
+@pytest.mark.django_db
+def test_api_de_artigos_com_campos_deve_retornar_so_os_campos(client, artigo_fixture):
+    artigo_fixture()
+
+    response = client.get(reverse("blog:api_artigos"), {"campos": "titulo,slug"})
+
+    assert response.json()["artigos"] == [
+        {"titulo": "Artigo de Teste", "slug": "artigo-de-teste"}
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("parametros", [{"campos": "titulo,senha"}, {"cursor": "lixo"}])
+def test_api_de_artigos_com_parametro_invalido_deve_retornar_400(
+    client, artigo_fixture, parametros
+):
+    artigo_fixture()
+
+    response = client.get(reverse("blog:api_artigos"), parametros)
+
+    assert response.status_code == 400
+    assert "erro" in response.json()
+
+
+@pytest.mark.django_db
+def test_api_do_artigo_sem_conteudo_deve_omitir_o_corpo(
+    client, artigo_fixture, comentario_fixture
+):
+    artigo = artigo_fixture()
+    comentario_fixture(
+        texto="<p>Comentário</p>", artigo_param=artigo, autor_param=artigo.autor
+    )
+    url = reverse("blog:api_artigo", kwargs={"slug": artigo.slug})
+
+    completo = client.get(url).json()
+    resumido = client.get(url, {"campos": "titulo,total_comentarios"}).json()
+
+    assert completo["conteudo"] == "<p>Conteúdo do artigo</p>"
+    assert completo["comentarios"][0]["texto"] == "<p>Comentário</p>"
+    assert resumido == {"titulo": "Artigo de Teste", "total_comentarios": 1}
+
+
+@pytest.mark.django_db
+def test_api_do_artigo_quando_slug_nao_existe_deve_retornar_404(client):
+    url = reverse("blog:api_artigo", kwargs={"slug": "inexistente"})
+
+    response = client.get(url)
+
+    assert response.status_code == 404
+    assert response["Content-Type"] == "application/json"
+
+
+@pytest.mark.django_db
+def test_api_de_comentarios_deve_retornar_a_proxima_pagina(
+    client, artigo_fixture, comentario_fixture
+):
+    artigo = artigo_fixture()
+    comentario_fixture(
+        texto="<p>Comentário</p>",
+        quantity=21,
+        artigo_param=artigo,
+        autor_param=artigo.autor,
+    )
+    cursor = obter_artigo_dto_por_slug(artigo.slug).proximo_cursor_comentarios
+    url = reverse("blog:api_comentarios", kwargs={"slug": artigo.slug})
+
+    dados = client.get(url, {"cursor": cursor}).json()
+
+    assert len(dados["comentarios"]) == 1
+    assert dados["proximo_cursor"] is None
@@ -1,10 +1,44 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import api, views
 
 app_name = "blog"
 
+# Sob ASGI (config/asgi.py liga BLOG_VIEWS_ASYNC) lista, stream, detalhe e
+# comentários usam as views async; sob WSGI as síncronas, que não pagam a ponte
+# async_to_sync
+if settings.BLOG_VIEWS_ASYNC:
+    ArtigoListView = views.ArtigoListAsyncView
+    ArtigoListStreamView = views.ArtigoListStreamAsyncView
+    ArtigoDetailView = views.ArtigoDetailAsyncView
+    ComentariosView = views.ComentariosAsyncView
+else:
+    ArtigoListView = views.ArtigoListView
+    ArtigoListStreamView = views.ArtigoListStreamView
+    ArtigoDetailView = views.ArtigoDetailView
+    ComentariosView = views.ComentariosView
+
 urlpatterns = [
-    path("", views.ArtigoListView.as_view(), name="artigo_list"),
-    path("<slug:slug>/", views.ArtigoDetailView.as_view(), name="artigo_detail"),
+    path("", ArtigoListView.as_view(), name="artigo_list"),
+    path(
+        "artigos/stream/",
+        ArtigoListStreamView.as_view(),
+        name="artigo_list_stream",
+    ),
+    path("artigos/busca/", views.BuscaView.as_view(), name="busca"),
+    path("metrics", views.MetricasView.as_view(), name="metricas"),
+    path("api/artigos/", api.ArtigosApiView.as_view(), name="api_artigos"),
+    path("api/artigos/<slug:slug>/", api.ArtigoApiView.as_view(), name="api_artigo"),
+    path(
+        "api/artigos/<slug:slug>/comentarios/",
+        api.ComentariosApiView.as_view(),
+        name="api_comentarios",
+    ),
+    path("<slug:slug>/", ArtigoDetailView.as_view(), name="artigo_detail"),
+    path(
+        "<slug:slug>/comentarios/",
+        ComentariosView.as_view(),
+        name="comentarios",
+    ),
 ]
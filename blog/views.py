@@ -1,29 +1,306 @@
-from django.http import Http404, HttpRequest, HttpResponse
+import ipaddress
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from functools import wraps
+from inspect import iscoroutinefunction
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseForbidden,
+    StreamingHttpResponse,
+)
 from django.shortcuts import render
+from django.template.loader import get_template, render_to_string
+from django.utils.decorators import method_decorator
 from django.views import View
+from django.views.decorators.http import condition
 
+from .dto import PaginaArtigosDTO, PaginaComentariosDTO, ValidadoresDTO
+from .metricas import coletar, formatar_prometheus
 from .models import Artigo
-from .services.artigo_service import obter_artigo_dto_por_slug, obter_lista_artigos_dto
+from .roteador_banco import banco_leitura
+from .services.artigo_service import (
+    TAMANHO_LOTE_STREAMING,
+    aiterar_artigos_dto,
+    aobter_artigo_dto_por_slug,
+    aobter_pagina_artigos_dto,
+    aobter_pagina_comentarios_dto,
+    aobter_validadores_artigo,
+    aobter_validadores_lista_artigos,
+    iterar_artigos_dto,
+    obter_artigo_dto_por_slug,
+    obter_pagina_artigos_dto,
+    obter_pagina_comentarios_dto,
+    obter_validadores_artigo,
+    obter_validadores_lista_artigos,
+)
+from .services.busca_service import buscar_artigos
+from .services.cache_artigo import cache_artigo_dto
+from .services.cursor import CursorInvalido
+
+
+def condicional(
+    calcular: Callable[..., ValidadoresDTO | None],
+    acalcular: Callable[..., Awaitable[ValidadoresDTO | None]] | None = None,
+):
+    # O ETag e o Last-Modified saem da mesma query, calculada uma vez por
+    # request; se baterem, o Django responde 304 sem chamar a view. Em views
+    # async a query é aguardada antes, porque o condition() chama as funções
+    # de validação de forma síncrona
+    def validadores(request: HttpRequest, **kwargs) -> ValidadoresDTO | None:
+        if not hasattr(request, "_validadores_blog"):
+            request._validadores_blog = calcular(**kwargs)
+        return request._validadores_blog
+
+    def etag(request: HttpRequest, **kwargs) -> str | None:
+        resultado = validadores(request, **kwargs)
+        return resultado.etag if resultado else None
+
+    def ultima_modificacao(request: HttpRequest, **kwargs):
+        resultado = validadores(request, **kwargs)
+        return resultado.ultima_modificacao if resultado else None
+
+    condicional_get = condition(etag_func=etag, last_modified_func=ultima_modificacao)
+
+    def decorar(get):
+        if not iscoroutinefunction(get):
+            return condicional_get(get)
+
+        get_condicional = condicional_get(get)
+
+        @wraps(get)
+        async def carregar_validadores(request: HttpRequest, *args, **kwargs):
+            if not hasattr(request, "_validadores_blog"):
+                request._validadores_blog = await acalcular(**kwargs)
+            return await get_condicional(request, *args, **kwargs)
 
+        return carregar_validadores
 
+    return method_decorator(decorar, name="get")
+
+
+@condicional(obter_validadores_lista_artigos)
 class ArtigoListView(View):
     template_name = "blog/artigo_list.html"
 
     def get(self, request: HttpRequest) -> HttpResponse:
-        artigos = obter_lista_artigos_dto()
+        try:
+            pagina = obter_pagina_artigos_dto(request.GET.get("cursor"))
+        except CursorInvalido:
+            raise Http404("Página não encontrada")
+
+        return render(request, self.template_name, _contexto_lista(pagina))
+
+
+@condicional(obter_validadores_lista_artigos, aobter_validadores_lista_artigos)
+class ArtigoListAsyncView(View):
+    # Versão para ASGI: as queries rodam no ORM async em vez de ocupar uma
+    # thread do servidor durante o request inteiro
+    template_name = ArtigoListView.template_name
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        try:
+            pagina = await aobter_pagina_artigos_dto(request.GET.get("cursor"))
+        except CursorInvalido:
+            raise Http404("Página não encontrada")
+
+        return render(request, self.template_name, _contexto_lista(pagina))
 
-        return render(request, self.template_name, context={"artigos": artigos})
 
+@condicional(obter_validadores_lista_artigos)
+class ArtigoListStreamView(View):
+    template_name = "blog/artigo_list_stream.html"
+    card_template_name = "blog/_artigo_card.html"
+    vazio_template_name = "blog/_sem_artigos.html"
+    marcador_artigos = "<!-- artigos -->"
+    chunk_size = TAMANHO_LOTE_STREAMING
 
+    def get(self, request: HttpRequest) -> StreamingHttpResponse:
+        return self._responder(request, self._fragmentos)
+
+    def _responder(self, request: HttpRequest, fragmentos) -> StreamingHttpResponse:
+        pagina = render_to_string(self.template_name, request=request)
+        cabecalho, rodape = pagina.split(self.marcador_artigos, 1)
+
+        # Os fragmentos são gerados depois que os middlewares já retornaram,
+        # fora da sessão de leitura: o banco (primário na janela depois de
+        # uma escrita) é escolhido aqui, ainda dentro dela
+        return StreamingHttpResponse(
+            fragmentos(cabecalho, rodape, banco_leitura()),
+            content_type="text/html; charset=utf-8",
+        )
+
+    def _fragmentos(self, cabecalho: str, rodape: str, banco: str) -> Iterator[str]:
+        # O cabeçalho sai antes da primeira query; cada card é enviado assim
+        # que o seu lote chega do banco
+        yield cabecalho
+
+        card = get_template(self.card_template_name)
+        algum_artigo = False
+        for artigo in iterar_artigos_dto(chunk_size=self.chunk_size, banco=banco):
+            algum_artigo = True
+            yield card.render({"artigo": artigo})
+
+        if not algum_artigo:
+            yield render_to_string(self.vazio_template_name)
+
+        yield rodape
+
+
+@condicional(obter_validadores_lista_artigos, aobter_validadores_lista_artigos)
+class ArtigoListStreamAsyncView(ArtigoListStreamView):
+    # Versão para ASGI: com um iterador síncrono o Django juntaria a resposta
+    # inteira em memória antes de enviá-la; o gerador async manda cada card
+    # assim que o seu lote chega do banco
+
+    async def get(self, request: HttpRequest) -> StreamingHttpResponse:
+        return self._responder(request, self._afragmentos)
+
+    async def _afragmentos(
+        self, cabecalho: str, rodape: str, banco: str
+    ) -> AsyncIterator[str]:
+        yield cabecalho
+
+        card = get_template(self.card_template_name)
+        algum_artigo = False
+        async for artigo in aiterar_artigos_dto(
+            chunk_size=self.chunk_size, banco=banco
+        ):
+            algum_artigo = True
+            yield card.render({"artigo": artigo})
+
+        if not algum_artigo:
+            yield render_to_string(self.vazio_template_name)
+
+        yield rodape
+
+
+@condicional(obter_validadores_artigo)
 class ArtigoDetailView(View):
     template_name = "blog/artigo_detail.html"
 
     def get(self, request: HttpRequest, slug: str) -> HttpResponse:
         try:
-            artigo_dto = obter_artigo_dto_por_slug(slug)
+            artigo_dto = cache_artigo_dto.obter_ou_carregar(
+                slug, obter_artigo_dto_por_slug
+            )
         except Artigo.DoesNotExist:
             raise Http404("Artigo não encontrado")
 
-        context = {"artigo": artigo_dto, "comentarios": artigo_dto.comentarios}
+        context = {
+            "artigo": artigo_dto,
+            "comentarios": artigo_dto.comentarios,
+            "slug": slug,
+        }
 
         return render(request, self.template_name, context)
+
+
+@condicional(obter_validadores_artigo, aobter_validadores_artigo)
+class ArtigoDetailAsyncView(View):
+    template_name = ArtigoDetailView.template_name
+
+    async def get(self, request: HttpRequest, slug: str) -> HttpResponse:
+        try:
+            artigo_dto = await cache_artigo_dto.aobter_ou_carregar(
+                slug, aobter_artigo_dto_por_slug
+            )
+        except Artigo.DoesNotExist:
+            raise Http404("Artigo não encontrado")
+
+        context = {
+            "artigo": artigo_dto,
+            "comentarios": artigo_dto.comentarios,
+            "slug": slug,
+        }
+
+        return render(request, self.template_name, context)
+
+
+@condicional(obter_validadores_artigo)
+class ComentariosView(View):
+    # Fragmento HTML com a próxima página de comentários do artigo
+    template_name = "blog/_comentarios.html"
+
+    def get(self, request: HttpRequest, slug: str) -> HttpResponse:
+        try:
+            pagina = obter_pagina_comentarios_dto(slug, request.GET.get("cursor"))
+        except (Artigo.DoesNotExist, CursorInvalido):
+            raise Http404("Comentários não encontrados")
+
+        return render(request, self.template_name, _contexto_comentarios(pagina, slug))
+
+
+@condicional(obter_validadores_artigo, aobter_validadores_artigo)
+class ComentariosAsyncView(View):
+    template_name = ComentariosView.template_name
+
+    async def get(self, request: HttpRequest, slug: str) -> HttpResponse:
+        try:
+            pagina = await aobter_pagina_comentarios_dto(
+                slug, request.GET.get("cursor")
+            )
+        except (Artigo.DoesNotExist, CursorInvalido):
+            raise Http404("Comentários não encontrados")
+
+        return render(request, self.template_name, _contexto_comentarios(pagina, slug))
+
+
+def _contexto_lista(pagina: PaginaArtigosDTO) -> dict:
+    # O export_static troca os links por caminhos (/artigos/pagina/2/): um CDN
+    # ignora a query string
+    return {
+        "artigos": pagina.artigos,
+        "pagina": pagina,
+        "url_anterior": _url_do_cursor(pagina.cursor_anterior),
+        "url_proxima": _url_do_cursor(pagina.proximo_cursor),
+    }
+
+
+def _url_do_cursor(cursor: str | None) -> str | None:
+    return f"?{urlencode({'cursor': cursor})}" if cursor else None
+
+
+def _contexto_comentarios(pagina: PaginaComentariosDTO, slug: str) -> dict:
+    return {
+        "comentarios": pagina.comentarios,
+        "proximo_cursor": pagina.proximo_cursor,
+        "slug": slug,
+    }
+
+
+class BuscaView(View):
+    template_name = "blog/busca.html"
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        termo = request.GET.get("q", "").strip()
+        resultados = buscar_artigos(termo) if termo else []
+
+        context = {"termo": termo, "resultados": resultados}
+
+        return render(request, self.template_name, context)
+
+
+class MetricasView(View):
+    # Formato texto do Prometheus; com BLOG_METRICAS_DIRETORIO, a soma de
+    # todos os workers. Só para os endereços de BLOG_METRICAS_REDES
+    def get(self, request: HttpRequest) -> HttpResponse:
+        if not _endereco_permitido(
+            request.META.get("REMOTE_ADDR", ""), settings.BLOG_METRICAS_REDES
+        ):
+            return HttpResponseForbidden()
+        return HttpResponse(
+            formatar_prometheus(coletar()),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+
+def _endereco_permitido(endereco: str, redes: list[str]) -> bool:
+    try:
+        ip = ipaddress.ip_address(endereco)
+    except ValueError:
+        return False
+    return any(ip in ipaddress.ip_network(rede) for rede in redes)
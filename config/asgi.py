@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+# Sob ASGI a lista e o detalhe do blog usam as views async (blog/urls.py)
+os.environ.setdefault("BLOG_VIEWS_ASYNC", "1")
 
 application = get_asgi_application()
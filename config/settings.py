@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
+from .sqlite import bancos_replicas
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -49,15 +53,25 @@ MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     # Django Debug Toolbar Middleware - Desabilitado para usar apenas Django Silk
     # "debug_toolbar.middleware.DebugToolbarMiddleware",
-    "silk.middleware.SilkyMiddleware",
+    "blog.middleware.MetricasMiddleware",
+    "blog.middleware.PerfilAmostradoMiddleware",
+    "blog.middleware.DetectorNMais1Middleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "blog.middleware.LerPropriasEscritasMiddleware",
 ]
 
+# Silk grava cada request e cada query no banco: só para investigar em
+# desenvolvimento (BLOG_SILK=1). No dia a dia fica o perfilador amostrado
+BLOG_SILK = os.environ.get("BLOG_SILK", "0") == "1"
+
+if BLOG_SILK:
+    MIDDLEWARE.insert(1, "silk.middleware.SilkyMiddleware")
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -89,6 +103,102 @@ DATABASES = {
 }
 
 
+# Réplicas de leitura da camada de serviço (blog/roteador_banco.py), uma por
+# caminho em BLOG_DB_REPLICAS (separados por vírgula). Depois de uma escrita,
+# o navegador lê do primário por BLOG_JANELA_LEITURA_PRIMARIO segundos
+
+DATABASES.update(
+    bancos_replicas(
+        [
+            caminho
+            for caminho in os.environ.get("BLOG_DB_REPLICAS", "").split(",")
+            if caminho
+        ]
+    )
+)
+
+BLOG_REPLICAS_LEITURA = [alias for alias in DATABASES if alias != "default"]
+
+BLOG_JANELA_LEITURA_PRIMARIO = 5
+
+DATABASE_ROUTERS = ["blog.roteador_banco.RoteadorReplicas"]
+
+
+# PRAGMAs aplicados a cada conexão SQLite nova (blog/signals.py); o perfil de
+# produção fica em config/sqlite.py
+
+BLOG_SQLITE_PRAGMAS = {}
+
+
+# Fragmentos de template ({% cache %} nos cards da lista e no corpo do
+# artigo) num cache próprio, para não despejarem os DTOs do cache padrão. As
+# chaves levam id e data_atualizacao: versões antigas só expiram
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "template_fragments": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "fragmentos",
+        "OPTIONS": {"MAX_ENTRIES": 10_000},
+    },
+}
+
+
+# Cache do ArtigoDTO por slug (LRU em memória + framework de cache do Django)
+
+BLOG_CACHE_ARTIGO_TAMANHO_LRU = 256
+
+BLOG_CACHE_ARTIGO_TIMEOUT = 300
+
+# Perfilador amostrado (blog/perfilador.py): cProfile e linha do tempo do SQL
+# de uma fração dos requests, ou dos que trazem o cabeçalho com um token de
+# manage.py token_perfil. Os relatórios JSON formam um anel no diretório
+
+BLOG_PERFIL_AMOSTRAGEM = float(os.environ.get("BLOG_PERFIL_AMOSTRAGEM", "0"))
+
+BLOG_PERFIL_CABECALHO = "X-Blog-Perfil"
+
+BLOG_PERFIL_VALIDADE_TOKEN = 3600
+
+BLOG_PERFIL_DIRETORIO = Path(
+    os.environ.get("BLOG_PERFIL_DIRETORIO", Path(tempfile.gettempdir()) / "blog-perfis")
+)
+
+BLOG_PERFIL_MAXIMO_RELATORIOS = 200
+
+BLOG_PERFIL_LINHAS = 40
+
+# Métricas por função de serviço e por view (blog/metricas.py), em /metrics.
+# Com um diretório compartilhado, cada worker grava as suas séries lá a cada
+# BLOG_METRICAS_INTERVALO segundos e o /metrics soma todos
+
+BLOG_METRICAS_DIRETORIO = os.environ.get("BLOG_METRICAS_DIRETORIO") or None
+
+BLOG_METRICAS_INTERVALO = 5
+
+# Redes que podem ler o /metrics (o Prometheus); as outras recebem 403
+
+BLOG_METRICAS_REDES = [
+    rede
+    for rede in os.environ.get("BLOG_METRICAS_REDES", "127.0.0.1/32,::1/128").split(",")
+    if rede
+]
+
+# Detector de N+1 (blog/detector_n1.py): uma query que se repete mais de
+# BLOG_N1_LIMITE vezes num request gera um relatório com a linha que a
+# disparou. BLOG_N1_ACAO: "avisar" (warnings), "log", "erro" ou None (desligado)
+
+BLOG_N1_LIMITE = 5
+
+BLOG_N1_ACAO = "avisar" if DEBUG else None
+
+# Views async para lista e detalhe; ligado por config/asgi.py
+
+BLOG_VIEWS_ASYNC = os.environ.get("BLOG_VIEWS_ASYNC", "0") == "1"
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -0,0 +1,33 @@
+"""
+Settings para os benchmarks com servidor real (manage.py bench_asgi).
+
+Mesma configuração do projeto, sem DEBUG e sem o middleware do Silk, usando o
+banco SQLite indicado em BLOG_BENCH_DB. Com BLOG_BENCH_SQLITE=producao o banco
+usa o perfil de produção de config/sqlite.py (manage.py bench_sqlite).
+"""
+
+import os
+
+from .settings import *  # noqa: F403
+from .sqlite import PRAGMAS_PRODUCAO, banco_sqlite_producao
+
+DEBUG = False
+
+ALLOWED_HOSTS = ["127.0.0.1", "localhost"]
+
+MIDDLEWARE = [m for m in MIDDLEWARE if not m.startswith("silk.")]  # noqa: F405
+
+BLOG_N1_ACAO = None
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.environ["BLOG_BENCH_DB"],
+    }
+}
+
+BLOG_REPLICAS_LEITURA = []
+
+if os.environ.get("BLOG_BENCH_SQLITE") == "producao":
+    DATABASES = {"default": banco_sqlite_producao(os.environ["BLOG_BENCH_DB"])}
+    BLOG_SQLITE_PRAGMAS = PRAGMAS_PRODUCAO
@@ -0,0 +1,85 @@
+"""
+Settings de produção com SQLite: WAL, PRAGMAs de desempenho, transações
+IMMEDIATE e conexões persistentes (ver config/sqlite.py).
+
+Exige DJANGO_SECRET_KEY; DJANGO_ALLOWED_HOSTS é uma lista separada por
+vírgulas, BLOG_DB o caminho do banco, BLOG_DB_REPLICAS os caminhos das
+réplicas de leitura e BLOG_CACHE_DIRETORIO a pasta do cache compartilhado
+pelos workers.
+"""
+
+import os
+
+from .settings import *  # noqa: F403
+from .sqlite import PRAGMAS_PRODUCAO, banco_sqlite_producao, bancos_replicas
+
+DEBUG = False
+
+SECRET_KEY = os.environ["DJANGO_SECRET_KEY"]
+
+ALLOWED_HOSTS = [
+    host for host in os.environ.get("DJANGO_ALLOWED_HOSTS", "").split(",") if host
+]
+
+MIDDLEWARE = [m for m in MIDDLEWARE if not m.startswith("silk.")]  # noqa: F405
+
+BLOG_N1_ACAO = None
+
+# Cache padrão compartilhado pelos workers do gunicorn: as versões que
+# invalidam o LRU de ArtigoDTO de cada processo (blog/services/cache_artigo.py)
+# precisam ser vistas por todos. Com o LocMemCache do desenvolvimento, cada
+# worker teria as suas e serviria o DTO de antes de uma edição para sempre.
+# Os fragmentos de template continuam em memória: as chaves já mudam com
+# data_atualizacao
+
+CACHES = {
+    **CACHES,  # noqa: F405
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get(
+            "BLOG_CACHE_DIRETORIO",
+            str(BASE_DIR / "cache"),  # noqa: F405
+        ),
+        "OPTIONS": {"MAX_ENTRIES": 10_000},
+    },
+}
+
+# Loader com cache explícito: cada template é lido e compilado uma vez por
+# processo (o Django já o usa quando "loaders" não é informado; aqui fica
+# garantido mesmo que os settings de desenvolvimento mudem)
+TEMPLATES = [
+    {
+        **TEMPLATES[0],  # noqa: F405
+        "APP_DIRS": False,
+        "OPTIONS": {
+            **TEMPLATES[0]["OPTIONS"],  # noqa: F405
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
+        },
+    }
+]
+
+DATABASES = {
+    "default": banco_sqlite_producao(
+        os.environ.get("BLOG_DB", str(BASE_DIR / "db.sqlite3"))  # noqa: F405
+    ),
+    **bancos_replicas(
+        [
+            caminho
+            for caminho in os.environ.get("BLOG_DB_REPLICAS", "").split(",")
+            if caminho
+        ],
+        banco_sqlite_producao,
+    ),
+}
+
+BLOG_REPLICAS_LEITURA = [alias for alias in DATABASES if alias != "default"]
+
+BLOG_SQLITE_PRAGMAS = PRAGMAS_PRODUCAO
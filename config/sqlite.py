@@ -0,0 +1,52 @@
+"""
+Perfil do SQLite para produção, usado por config/settings_producao.py e pelo
+benchmark bench_sqlite.
+
+Os PRAGMAs são aplicados em cada conexão nova pelo receiver de
+connection_created em blog/signals.py (setting BLOG_SQLITE_PRAGMAS).
+"""
+
+PRAGMAS_PRODUCAO = {
+    # Leitores não bloqueiam o escritor nem o escritor bloqueia os leitores
+    "journal_mode": "WAL",
+    # Em WAL, NORMAL só perde as últimas transações numa queda de energia,
+    # nunca corrompe o banco
+    "synchronous": "NORMAL",
+    # Espera pelo lock em vez de falhar com "database is locked" (ms)
+    "busy_timeout": 5000,
+    # Leitura por mmap em vez de read(): 256 MiB
+    "mmap_size": 256 * 1024 * 1024,
+    # Negativo é em KiB: 64 MiB de cache de páginas por conexão
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+}
+
+
+def banco_sqlite_producao(nome) -> dict:
+    return {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": nome,
+        # Conexões persistentes: o custo de abrir a conexão e aplicar os
+        # PRAGMAs fica fora do caminho de cada request
+        "CONN_MAX_AGE": 600,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            # BEGIN IMMEDIATE: o lock de escrita é pedido no início da
+            # transação, quando o busy_timeout ainda pode esperar por ele
+            "transaction_mode": "IMMEDIATE",
+            # Timeout do módulo sqlite3, em segundos
+            "timeout": 5,
+        },
+    }
+
+
+def bancos_replicas(caminhos, configurar=None) -> dict[str, dict]:
+    # Réplicas de leitura: localmente, cópias do banco principal atualizadas
+    # por manage.py sincronizar_replicas. Nos testes viram espelhos do default
+    configurar = configurar or (
+        lambda nome: {"ENGINE": "django.db.backends.sqlite3", "NAME": nome}
+    )
+    return {
+        f"replica_{indice}": {**configurar(caminho), "TEST": {"MIRROR": "default"}}
+        for indice, caminho in enumerate(caminhos, start=1)
+    }
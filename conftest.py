@@ -3,6 +3,7 @@
 import os
 
 import django
+import pytest
 from django.conf import settings
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
@@ -19,3 +20,24 @@ if "silk.middleware.SilkyMiddleware" in settings.MIDDLEWARE:
     settings.MIDDLEWARE = [
         m for m in settings.MIDDLEWARE if m != "silk.middleware.SilkyMiddleware"
     ]
+
+# Detector de N+1 explícito nos testes, sem depender do DEBUG do ambiente: um
+# N+1 num request de teste é falha, não um warning perdido no resumo
+settings.BLOG_N1_ACAO = "erro"
+
+# Verifica os orçamentos declarados com @orcamento_queries
+pytest_plugins = ["blog.plugin_orcamento"]
+
+
+@pytest.fixture(autouse=True)
+def limpar_cache_artigo():
+    # O cache de DTOs vive no processo e sobreviveria entre os testes
+    from django.core.cache import cache
+
+    from blog.services.cache_artigo import cache_artigo_dto
+
+    cache.clear()
+    cache_artigo_dto.limpar()
+    yield
+    cache.clear()
+    cache_artigo_dto.limpar()